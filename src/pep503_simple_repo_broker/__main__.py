@@ -1,12 +1,11 @@
 """PEP503 Simple Repo Broker."""
 
-from .application import Application
+from .application import run
 
 
 def main() -> None:
     """Main function."""
-    application = Application()
-    application.run()
+    run()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,93 @@
 """PEP503 Simple Repo Broker API."""
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
 
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from .artifact_cache import ArtifactCache, ArtifactFill
+from .distributions import WHEEL_EXTENSION
 from .html_renderer import HtmlListItem, HtmlListRenderer
+from .index import PackageIndexRegistry, PackageIndexSnapshot
+from .index_store import IndexRefreshRequests
 from .integrations.abstracts import (
     AbstractIntegration,
+    IntegrationIndexError,
+    IntegrationPackageDownload,
+    IntegrationPackageFile,
     IntegrationPackageIndex,
     PackageName,
     PackageVersion,
+    normalize_package_name,
+)
+from .json_renderer import (
+    JsonFileItem,
+    JsonProjectItem,
+    JsonProjectListRenderer,
+    JsonProjectRenderer,
+)
+from .metrics import (
+    CACHE_REQUESTS,
+    DOWNLOAD_REDIRECTS,
+    InstrumentedRoute,
+    count_download,
+    count_file_download,
+    render_metrics,
+)
+from .page_cache import RenderedPage, RenderedPageCache, parse_quality_values
+from .ranges import (
+    ByteRange,
+    RangeNotSatisfiableError,
+    RangeSpec,
+    format_content_range,
+    get_multipart_length,
+    if_range_matches,
+    iter_multipart,
+    parse_content_range_start,
+    parse_range_header,
+    resolve_ranges,
+    slice_content,
 )
+from .readiness import Readiness, get_readiness
+from .wheel_metadata import (
+    WheelMetadataCache,
+    WheelMetadataError,
+    parse_content_range,
+    read_metadata_from_ranges,
+    read_metadata_from_zip,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+INDEX_ERRORS_HEADER: str = "X-Index-Errors"
+GITHUB_SIGNATURE_HEADER: str = "X-Hub-Signature-256"
+GITHUB_EVENT_HEADER: str = "X-GitHub-Event"
+
+TEXT_HTML_MEDIA_TYPE: str = "text/html"
+SIMPLE_HTML_MEDIA_TYPE: str = "application/vnd.pypi.simple.v1+html"
+SIMPLE_JSON_MEDIA_TYPE: str = "application/vnd.pypi.simple.v1+json"
+# Requested media types and the media type served for them, in order of preference
+SIMPLE_MEDIA_TYPES: dict[str, str] = {
+    SIMPLE_JSON_MEDIA_TYPE: SIMPLE_JSON_MEDIA_TYPE,
+    "application/vnd.pypi.simple.latest+json": SIMPLE_JSON_MEDIA_TYPE,
+    SIMPLE_HTML_MEDIA_TYPE: SIMPLE_HTML_MEDIA_TYPE,
+    "application/vnd.pypi.simple.latest+html": SIMPLE_HTML_MEDIA_TYPE,
+    TEXT_HTML_MEDIA_TYPE: TEXT_HTML_MEDIA_TYPE,
+}
 
 api_router: APIRouter = APIRouter()
-api_router_simple: APIRouter = APIRouter()
+api_router_simple: APIRouter = APIRouter(route_class=InstrumentedRoute)
+api_router_hooks: APIRouter = APIRouter()
 
 
 @api_router.get("/health")
@@ -21,98 +96,565 @@ async def get_health() -> str:
     return "OK"
 
 
+@api_router.get("/livez")
+async def get_livez() -> str:
+    """Get liveness, the process is able to answer."""
+    return "OK"
+
+
 def dependency_integrations(request: Request) -> list[AbstractIntegration]:
     """Dependency integrations."""
     return getattr(request.app.state, "integrations", [])
 
 
-@api_router_simple.get("/")
+@api_router.get("/metrics", response_class=Response)
+async def get_metrics(integrations: list[AbstractIntegration] = Depends(dependency_integrations)) -> Response:
+    """Get the metrics in the Prometheus text format."""
+    return render_metrics(integrations)
+
+
+def dependency_index_registry(request: Request) -> PackageIndexRegistry:
+    """Dependency index registry."""
+    index_registry: PackageIndexRegistry | None = getattr(request.app.state, "index_registry", None)
+    if index_registry is None:
+        index_registry = PackageIndexRegistry(dependency_integrations(request))
+        setattr(request.app.state, "index_registry", index_registry)
+    return index_registry
+
+
+def dependency_artifact_cache(request: Request) -> ArtifactCache | None:
+    """Dependency artifact cache, `None` when disabled."""
+    return getattr(request.app.state, "artifact_cache", None)
+
+
+def dependency_page_cache(request: Request) -> RenderedPageCache:
+    """Dependency rendered page cache."""
+    page_cache: RenderedPageCache | None = getattr(request.app.state, "page_cache", None)
+    if page_cache is None:
+        page_cache = RenderedPageCache()
+        setattr(request.app.state, "page_cache", page_cache)
+    return page_cache
+
+
+def dependency_wheel_metadata_cache(request: Request) -> WheelMetadataCache:
+    """Dependency wheel metadata cache."""
+    wheel_metadata_cache: WheelMetadataCache | None = getattr(request.app.state, "wheel_metadata_cache", None)
+    if wheel_metadata_cache is None:
+        wheel_metadata_cache = WheelMetadataCache()
+        setattr(request.app.state, "wheel_metadata_cache", wheel_metadata_cache)
+    return wheel_metadata_cache
+
+
+def dependency_github_webhook_secret(request: Request) -> str | None:
+    """Dependency Github webhook secret, `None` when webhooks are disabled."""
+    return getattr(request.app.state, "github_webhook_secret", None)
+
+
+def dependency_index_refresh_requests(request: Request) -> IndexRefreshRequests | None:
+    """Dependency refresh requests forwarded to the publisher, `None` when sources are refreshed in process."""
+    return getattr(request.app.state, "index_refresh_requests", None)
+
+
+def dependency_readiness_max_index_age(request: Request) -> float | None:
+    """Dependency maximum index age for readiness, `None` for no limit."""
+    return getattr(request.app.state, "readiness_max_index_age", None)
+
+
+@api_router.get("/readyz", response_model=None)
+async def get_readyz(
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    max_index_age: float | None = Depends(dependency_readiness_max_index_age),
+) -> JSONResponse:
+    """Get readiness, with the detail of each integration.
+
+    Ready once every integration has a populated index no older than the maximum
+    index age. While not ready, the index is warmed in the background.
+    """
+    readiness: Readiness = get_readiness(index_registry.integrations, max_index_age)
+    if not readiness["ready"]:
+        index_registry.warm()
+    return JSONResponse(
+        jsonable_encoder(readiness),
+        status_code=200 if readiness["ready"] else 503,
+    )
+
+
+def mark_index_errors(response: Response, errors: list[IntegrationIndexError]) -> Response:
+    """Mark a response built from a partial index."""
+    if errors:
+        response.headers[INDEX_ERRORS_HEADER] = ", ".join(sorted({error["source"] for error in errors}))
+    return response
+
+
+def build_etag(digest: str | None) -> str | None:
+    """Build the strong entity tag of a package file from its digest, `None` without digest."""
+    return f'"{digest}"' if digest else None
+
+
+def build_file_headers(filename: str, etag: str | None = None) -> dict[str, str]:
+    """Build the headers shared by all responses serving a package file."""
+    headers: dict[str, str] = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+    }
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+
+def build_download_headers(package_download: IntegrationPackageDownload, etag: str | None = None) -> dict[str, str]:
+    """Build the headers of a package download response."""
+    headers: dict[str, str] = build_file_headers(package_download["filename"], etag)
+    if package_download["content_length"] is not None:
+        headers["Content-Length"] = str(package_download["content_length"])
+    return headers
+
+
+def negotiate_simple_media_type(accept: str | None) -> str:
+    """Select the media type of a simple API response, as defined by PEP 691.
+
+    Explicitly requested media types are preferred in server order (JSON first),
+    wildcards fall back to `text/html` for browsers and older clients.
+    """
+    if not accept:
+        return TEXT_HTML_MEDIA_TYPE
+    qualities: dict[str, float] = parse_quality_values(accept)
+    best_media_type: str | None = None
+    best_quality: float = 0.0
+    for requested_media_type, media_type in SIMPLE_MEDIA_TYPES.items():
+        quality: float = qualities.get(requested_media_type, 0.0)
+        if quality > best_quality:
+            best_media_type, best_quality = media_type, quality
+    if best_media_type is not None:
+        return best_media_type
+    if qualities.get("*/*", 0.0) > 0 or qualities.get("text/*", 0.0) > 0:
+        return TEXT_HTML_MEDIA_TYPE
+    raise HTTPException(status_code=406, detail="Not Acceptable")
+
+
+def dependency_simple_media_type(request: Request) -> str:
+    """Dependency simple API response media type."""
+    return negotiate_simple_media_type(request.headers.get("Accept"))
+
+
+def render_page(
+    renderer: HtmlListRenderer | JsonProjectListRenderer | JsonProjectRenderer, media_type: str
+) -> RenderedPage:
+    """Render a page."""
+    charset: str = "; charset=utf-8" if media_type == TEXT_HTML_MEDIA_TYPE else ""
+    return RenderedPage(renderer.build().encode(), media_type=f"{media_type}{charset}")
+
+
+def build_file_hashes(package_file: IntegrationPackageFile | None) -> dict[str, str]:
+    """Build the hashes of a package file from its digest."""
+    if package_file is None or package_file["digest"] is None or ":" not in package_file["digest"]:
+        return {}
+    algorithm, value = package_file["digest"].split(":", 1)
+    return {algorithm: value}
+
+
+def has_core_metadata(filename: str) -> bool:
+    """Check if the core metadata of a file is served, as defined by PEP 658."""
+    return filename.endswith(WHEEL_EXTENSION)
+
+
+def build_html_file_item(
+    package_name: PackageName, package_version: PackageVersion, package_file: IntegrationPackageFile | None
+) -> HtmlListItem:
+    """Build the HTML item of a package file, with its hash fragment and metadata attributes."""
+    url: str = f"/simple/{package_name}/{package_version}"
+    for algorithm, value in build_file_hashes(package_file).items():
+        url = f"{url}#{algorithm}={value}"
+    item: HtmlListItem = HtmlListItem(name=package_version, url=url)
+    if has_core_metadata(package_version):
+        item["attributes"] = {"data-dist-info-metadata": "true", "data-core-metadata": "true"}
+    return item
+
+
+def build_json_file_item(package_name: PackageName, package_file: IntegrationPackageFile) -> JsonFileItem:
+    """Build the JSON item of a package file."""
+    item: JsonFileItem = {
+        "filename": package_file["filename"],
+        "url": f"/simple/{package_name}/{package_file['filename']}",  # pylint: disable=inconsistent-quotes
+        "hashes": build_file_hashes(package_file),
+    }
+    if package_file["size"] is not None:
+        item["size"] = package_file["size"]
+    if has_core_metadata(package_file["filename"]):
+        item["core-metadata"] = True
+        item["dist-info-metadata"] = True
+    return item
+
+
+@api_router_simple.get("/", response_class=HTMLResponse)
 async def get_index(
-    integrations: list[AbstractIntegration] = Depends(dependency_integrations),
-) -> HTMLResponse:
+    request: Request,
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    page_cache: RenderedPageCache = Depends(dependency_page_cache),
+    media_type: str = Depends(dependency_simple_media_type),
+) -> Response:
     """Get simple repo index."""
-    index: list[IntegrationPackageIndex] = []
-    for integration in integrations:
-        index.extend(await integration.get_index())
-    packages: list[PackageName] = [
-        package_index["package_name"] for package_index in index
-    ]
-    items: list[HtmlListItem] = [
-        HtmlListItem(name=package, url=f"/simple/{package}") for package in packages
-    ]
-    return HtmlListRenderer(title="Index").add_items(items).render()
-
-
-@api_router_simple.get("/{package_name}")
+    snapshot: PackageIndexSnapshot = await index_registry.get_snapshot()
+
+    def _render() -> RenderedPage:
+        if media_type == SIMPLE_JSON_MEDIA_TYPE:
+            return render_page(
+                JsonProjectListRenderer().add_projects(
+                    [JsonProjectItem(name=package_name) for package_name in snapshot.lookup.packages]
+                ),
+                media_type,
+            )
+        items: list[HtmlListItem] = [
+            HtmlListItem(name=package_index["package_name"], url=f"/simple/{package_name}")
+            for package_name, package_index in snapshot.lookup.packages.items()
+        ]
+        return render_page(HtmlListRenderer(title="Index").add_items(items), media_type)
+
+    page: RenderedPage = page_cache.get(snapshot.generation, (media_type,), _render)
+    return mark_index_errors(page.to_response(request), snapshot.errors)
+
+
+@api_router_simple.get("/{package_name}", response_class=HTMLResponse)
 async def get_index_package(
+    request: Request,
     package_name: PackageName,
-    integrations: list[AbstractIntegration] = Depends(dependency_integrations),
-) -> HTMLResponse:
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    page_cache: RenderedPageCache = Depends(dependency_page_cache),
+    media_type: str = Depends(dependency_simple_media_type),
+) -> Response:
     """Get simple repo index package."""
-    index: list[IntegrationPackageIndex] = []
-    for integration in integrations:
-        index.extend(await integration.get_index())
-    package_index: IntegrationPackageIndex | None = next(
-        (
-            package_index
-            for package_index in index
-            if package_index["package_name"] == package_name
-        ),
-        None,
+    snapshot: PackageIndexSnapshot = await index_registry.get_package_snapshot(package_name)
+    package_index: IntegrationPackageIndex | None = snapshot.lookup.get_package(package_name)
+    if package_index is None:
+        raise HTTPException(status_code=404, detail="Package not found")
+
+    normalized_package_name: PackageName = normalize_package_name(package_name)
+
+    def _render() -> RenderedPage:
+        if media_type == SIMPLE_JSON_MEDIA_TYPE:
+            files: list[JsonFileItem] = [
+                build_json_file_item(normalized_package_name, package_file)
+                for package_file in package_index["package_file_list"]
+            ]
+            return render_page(JsonProjectRenderer(name=normalized_package_name).add_files(files), media_type)
+        items: list[HtmlListItem] = [
+            build_html_file_item(
+                normalized_package_name,
+                package_version,
+                snapshot.lookup.get_file(normalized_package_name, package_version),
+            )
+            for package_version in package_index["package_version_list"]
+        ]
+        return render_page(HtmlListRenderer(title=package_index["package_name"]).add_items(items), media_type)
+
+    page: RenderedPage = page_cache.get(
+        snapshot.generation, (media_type, normalized_package_name), _render, revision=snapshot.revision
     )
+    return mark_index_errors(page.to_response(request), snapshot.errors)
+
+
+@api_router_simple.get("/{package_name}/{package_version}.metadata")
+async def get_package_metadata(
+    package_name: PackageName,
+    package_version: PackageVersion,
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    artifact_cache: ArtifactCache | None = Depends(dependency_artifact_cache),
+    wheel_metadata_cache: WheelMetadataCache = Depends(dependency_wheel_metadata_cache),
+) -> Response:
+    """Get the core metadata of a wheel, as defined by PEP 658.
+
+    The metadata is read from the cached artifact when available, otherwise only the
+    zip central directory and the METADATA entry are fetched with range requests.
+    """
+    snapshot: PackageIndexSnapshot = await index_registry.get_package_snapshot(package_name)
+    package_index: IntegrationPackageIndex | None = snapshot.lookup.get_package(package_name)
     if package_index is None:
         raise HTTPException(status_code=404, detail="Package not found")
 
-    items: list[HtmlListItem] = [
-        HtmlListItem(
-            name=package_version, url=f"/simple/{package_name}/{package_version}"
+    package_file: IntegrationPackageFile | None = snapshot.lookup.get_file(package_name, package_version)
+    if package_file is None or not has_core_metadata(package_file["filename"]):
+        raise HTTPException(status_code=404, detail="Package metadata not found")
+
+    integration: AbstractIntegration | None = index_registry.get_integration(package_index["integration_id"])
+    if integration is None:
+        raise HTTPException(status_code=404, detail="Integration not found")
+
+    async def _read_range(range_header: str) -> tuple[bytes, int, int]:
+        package_download: IntegrationPackageDownload = await integration.get_download_package(
+            package_index["package_name"], package_version, range_header
         )
-        for package_version in package_index["package_version_list"]
-    ]
+        data: bytes = b"".join([chunk async for chunk in package_download["content"]])
+        return parse_content_range(package_download.get("content_range"), data)
+
+    async def _extract() -> bytes:
+        digest: str | None = package_file["digest"]
+        artifact: Path | None = artifact_cache.get(digest) if artifact_cache is not None and digest else None
+        if artifact is not None:
+            return await asyncio.to_thread(read_metadata_from_zip, artifact)
+        return await read_metadata_from_ranges(_read_range)
+
+    try:
+        metadata: bytes = await wheel_metadata_cache.get(package_file["digest"] or package_file["url"], _extract)
+    except WheelMetadataError as exception:
+        raise HTTPException(status_code=502, detail=f"Invalid wheel: {exception}") from exception
+    return Response(content=metadata, media_type="text/plain")
+
+
+async def get_download_package_ranges(
+    integration: AbstractIntegration,
+    package_file: IntegrationPackageFile,
+    package_name: PackageName,
+    range_specs: list[RangeSpec],
+    etag: str | None,
+) -> Response | None:
+    """Serve byte ranges of a package file from its integration, `None` when the whole file must be served.
+
+    The ranges are resolved against the size of the file in the index and each one is
+    forwarded upstream, the part of the content out of the range being skipped when the
+    upstream ignores it. When the size is unknown, a single range is forwarded as is and
+    several ranges are ignored.
+    """
+    package_version: PackageVersion = package_file["filename"]
+    content_type: str = package_file["content_type"] or "application/octet-stream"
+    size: int | None = package_file["size"]
+
+    async def _open_range(byte_range: ByteRange) -> tuple[AsyncIterator[bytes], int]:
+        package_download: IntegrationPackageDownload = await integration.get_download_package(
+            package_name, package_version, f"bytes={byte_range[0]}-{byte_range[1]}"
+        )
+        return package_download["content"], parse_content_range_start(package_download.get("content_range")) or 0
+
+    if size is None:
+        if len(range_specs) > 1:
+            return None
+        start, end = range_specs[0]
+        package_download: IntegrationPackageDownload = await integration.get_download_package(
+            package_name, package_version, f"bytes={'' if start is None else start}-{'' if end is None else end}"
+        )
+        content_range: str | None = package_download.get("content_range")
+        if content_range is None:
+            # The range is ignored upstream, the whole file is served
+            return StreamingResponse(
+                count_download(package_download["content"], "upstream"),
+                headers=build_download_headers(package_download, etag),
+                media_type=package_download["content_type"] or content_type,
+            )
+        return StreamingResponse(
+            count_download(package_download["content"], "upstream"),
+            status_code=206,
+            headers={**build_download_headers(package_download, etag), "Content-Range": content_range},
+            media_type=package_download["content_type"] or content_type,
+        )
+
+    try:
+        byte_ranges: list[ByteRange] = resolve_ranges(range_specs, size)
+    except RangeNotSatisfiableError as exception:
+        raise HTTPException(
+            status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{exception.size}"}
+        ) from exception
+    headers: dict[str, str] = build_file_headers(package_version, etag)
+    if len(byte_ranges) == 1:
+        byte_range: ByteRange = byte_ranges[0]
+        content, content_start = await _open_range(byte_range)
+        return StreamingResponse(
+            count_download(slice_content(content, content_start, byte_range), "upstream"),
+            status_code=206,
+            headers={
+                **headers,
+                "Content-Range": format_content_range(byte_range, size),
+                "Content-Length": str(byte_range[1] - byte_range[0] + 1),
+            },
+            media_type=content_type,
+        )
+    boundary: str = uuid.uuid4().hex
+    return StreamingResponse(
+        count_download(iter_multipart(boundary, content_type, byte_ranges, size, _open_range), "upstream"),
+        status_code=206,
+        headers={**headers, "Content-Length": str(get_multipart_length(boundary, content_type, byte_ranges, size))},
+        media_type=f"multipart/byteranges; boundary={boundary}",
+    )
+
 
-    return HtmlListRenderer(title=package_name).add_items(items).render()
+def serve_artifact(
+    artifact: Path, package_file: IntegrationPackageFile, range_specs: list[RangeSpec] | None, etag: str | None
+) -> FileResponse:
+    """Serve a cached artifact, the `Range` and `If-Range` headers being handled by the file response."""
+    CACHE_REQUESTS.labels("artifact", "hit").inc()
+    size: int = artifact.stat().st_size
+    if range_specs is not None:
+        try:
+            size = sum(end - start + 1 for start, end in resolve_ranges(range_specs, size))
+        except RangeNotSatisfiableError:
+            size = 0
+    count_file_download(size, "artifact_cache")
+    return FileResponse(
+        artifact,
+        filename=package_file["filename"],
+        media_type=package_file["content_type"] or "application/octet-stream",
+        headers={"ETag": etag} if etag is not None else None,
+    )
 
 
 @api_router_simple.get("/{package_name}/{package_version}")
 async def get_download_package(
+    request: Request,
     package_name: PackageName,
     package_version: PackageVersion,
-    integrations: list[AbstractIntegration] = Depends(dependency_integrations),
-) -> StreamingResponse:
-    """Get download package."""
-    index: list[IntegrationPackageIndex] = []
-    for integration in integrations:
-        index.extend(await integration.get_index())
-
-    package_index: IntegrationPackageIndex | None = next(
-        (
-            package_index
-            for package_index in index
-            if package_index["package_name"] == package_name
-        ),
-        None,
-    )
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    artifact_cache: ArtifactCache | None = Depends(dependency_artifact_cache),
+) -> Response:
+    """Get download package.
+
+    With an artifact cache, a cached artifact is served from disk and a missing one is
+    stored while it is streamed to the client.
+
+    Single and multiple byte ranges are served with `206 Partial Content`, from the cached
+    artifact if any, from the integration otherwise without storing the artifact. An
+    `If-Range` not matching the entity tag of the file, its digest, serves the whole file.
+
+    An integration offloading downloads redirects the client to a signed upstream URL
+    instead, which serves the byte ranges itself.
+    """
+    snapshot: PackageIndexSnapshot = await index_registry.get_package_snapshot(package_name)
+    package_index: IntegrationPackageIndex | None = snapshot.lookup.get_package(package_name)
     if package_index is None:
         raise HTTPException(status_code=404, detail="Package not found")
 
-    package_version_list: list[PackageVersion] = package_index["package_version_list"]
-    if package_version not in package_version_list:
+    package_file: IntegrationPackageFile | None = snapshot.lookup.get_file(package_name, package_version)
+    if package_file is None:
         raise HTTPException(status_code=404, detail="Package version not found")
 
-    integration: AbstractIntegration | None = next(
-        (
-            integration
-            for integration in integrations
-            if integration.id == package_index["integration_id"]
-        ),
-        None,
-    )
+    integration: AbstractIntegration | None = index_registry.get_integration(package_index["integration_id"])
     if integration is None:
         raise HTTPException(status_code=404, detail="Integration not found")
 
+    redirect_url: str | None = await integration.get_download_redirect(package_index["package_name"], package_version)
+    if redirect_url is not None:
+        DOWNLOAD_REDIRECTS.inc()
+        # The signed URL expires shortly, the redirect must not be stored
+        return RedirectResponse(redirect_url, status_code=302, headers={"Cache-Control": "no-store"})
+
+    digest: str | None = package_file["digest"]
+    etag: str | None = build_etag(digest)
+    range_specs: list[RangeSpec] | None = (
+        parse_range_header(request.headers.get("Range"))
+        if if_range_matches(request.headers.get("If-Range"), etag)
+        else None
+    )
+    if range_specs is not None:
+        cached: Path | None = (
+            artifact_cache.get(digest)
+            if artifact_cache is not None and digest is not None and artifact_cache.accepts(digest)
+            else None
+        )
+        if cached is not None:
+            return serve_artifact(cached, package_file, range_specs, etag)
+        # A partial download is not worth filling the artifact cache
+        ranges_response: Response | None = await get_download_package_ranges(
+            integration, package_file, package_index["package_name"], range_specs, etag
+        )
+        if ranges_response is not None:
+            return ranges_response
+
+    if artifact_cache is None or digest is None or not artifact_cache.accepts(digest):
+        package_download: IntegrationPackageDownload = await integration.get_download_package(
+            package_index["package_name"], package_version
+        )
+        return StreamingResponse(
+            count_download(package_download["content"], "upstream"),
+            headers=build_download_headers(package_download, etag),
+            media_type=package_download["content_type"] or "application/octet-stream",
+        )
+
+    artifact: Path | ArtifactFill = await artifact_cache.acquire(digest)
+    if isinstance(artifact, Path):
+        return serve_artifact(artifact, package_file, None, etag)
+    CACHE_REQUESTS.labels("artifact", "miss").inc()
+    try:
+        package_download = await integration.get_download_package(package_index["package_name"], package_version)
+    except BaseException:
+        artifact.release()
+        raise
     return StreamingResponse(
-        await integration.get_download_package(package_name, package_version)
+        count_download(artifact.tee(package_download["content"]), "upstream"),
+        headers=build_download_headers(package_download, etag),
+        media_type=package_download["content_type"] or "application/octet-stream",
+        # Release the fill even if the client leaves before the stream starts
+        background=BackgroundTask(artifact.release),
+    )
+
+
+def verify_github_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Verify the `X-Hub-Signature-256` of a Github webhook delivery."""
+    if signature is None or not signature.startswith("sha256="):
+        return False
+    expected: str = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+async def refresh_sources(integrations: list[tuple[AbstractIntegration, str]]) -> None:
+    """Refresh sources of integrations, failures are logged."""
+    for integration, source in integrations:
+        try:
+            await integration.refresh_source(source)
+        except Exception:  # pylint: disable=broad-exception-caught
+            _logger.warning("Failed to refresh source %s", source, exc_info=True)
+
+
+@api_router_hooks.post("/github")
+async def post_github_hook(
+    request: Request,
+    index_registry: PackageIndexRegistry = Depends(dependency_index_registry),
+    webhook_secret: str | None = Depends(dependency_github_webhook_secret),
+    refresh_requests: IndexRefreshRequests | None = Depends(dependency_index_refresh_requests),
+) -> Response:
+    """Receive a Github webhook delivery.
+
+    A `release` event refreshes only the repository it belongs to, configured or discovered
+    in an organization, in background once the delivery is acknowledged. A worker of the
+    multi-worker mode forwards the refresh to the publisher instead.
+    """
+    if webhook_secret is None:
+        raise HTTPException(status_code=404, detail="Webhook not configured")
+    body: bytes = await request.body()
+    if not verify_github_signature(webhook_secret, body, request.headers.get(GITHUB_SIGNATURE_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    event: str | None = request.headers.get(GITHUB_EVENT_HEADER)
+    if event == "ping":
+        return Response(content="pong", media_type="text/plain")
+    if event != "release":
+        return Response(content="ignored", media_type="text/plain")
+    try:
+        payload: Any = json.loads(body)
+        full_name: str = str(payload["repository"]["full_name"])
+    except (ValueError, KeyError, TypeError) as exception:
+        raise HTTPException(status_code=400, detail="Invalid payload") from exception
+
+    # A repository discovered in an organization is refreshed alone, by its own slug
+    slug: str = full_name.lower()
+    organization_source: str = f"{slug.split('/', 1)[0]}/*"
+    owners: list[tuple[AbstractIntegration, str]] = []
+    for integration in index_registry.integrations:
+        sources: list[str] = integration.get_sources()
+        source: str | None = next((source for source in sources if source.lower() == slug), None)
+        if source is not None:
+            owners.append((integration, source))
+        elif any(source.lower() == organization_source for source in sources):
+            owners.append((integration, full_name))
+    if not owners:
+        return Response(content="ignored", media_type="text/plain")
+    return Response(
+        content="accepted",
+        status_code=202,
+        media_type="text/plain",
+        background=(
+            BackgroundTask(refresh_sources, owners)
+            if refresh_requests is None
+            else BackgroundTask(refresh_requests.request, [source for _, source in owners])
+        ),
     )
 
 
 api_router.include_router(api_router_simple, prefix="/simple")
+api_router.include_router(api_router_hooks, prefix="/hooks")
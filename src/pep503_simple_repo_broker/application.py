@@ -1,55 +1,396 @@
 """Application."""
 
+import asyncio
+import logging
+import multiprocessing
 import os
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import StrEnum
+from pathlib import Path
 from typing import Any
 
 import uvicorn
 from fastapi import FastAPI
 
+from .artifact_cache import ArtifactCache
+from .concurrency import gather_with_concurrency
+from .config import IntegrationConfigFile, IntegrationConfigWatcher
+from .index import PackageIndexRegistry
+from .index_store import (
+    IndexRefreshRequests,
+    IndexRefreshRequestWatcher,
+    IndexSnapshotStore,
+    IndexSnapshotWatcher,
+    StoredPackageIndex,
+    restore_source_indexes,
+)
 from .integrations.abstracts import AbstractIntegration, PackageName
+from .integrations.cache import CachedIntegration
 from .integrations.github import (
     GithubIntegration,
     GithubNamespace,
     GithubRepositoryName,
 )
+from .integrations.github.rate_limit import GithubRateLimitSettings
+from .integrations.github.session import GithubSessionSettings
+from .integrations.github.types import (
+    GithubDownloadMode,
+    GithubOrganizationReference,
+    GithubRepositoryReference,
+)
+from .page_cache import RenderedPageCache
+from .refresher import IndexRefresher
+from .shared_cache import RedisSharedCache, SharedCache
+from .wheel_metadata import WheelMetadataCache
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+class ApplicationRole(StrEnum):
+    """Role of an application process."""
+
+    # Single process refreshing the index and serving requests
+    STANDALONE = "standalone"
+    # Process refreshing the index and publishing snapshots to the workers, serving no requests
+    PUBLISHER = "publisher"
+    # Process serving requests from the snapshots of the publisher
+    WORKER = "worker"
+
+
+def get_default_index_snapshot_path() -> Path:
+    """Get the path of the snapshot shared by the processes, in memory when available."""
+    shared_memory: Path = Path("/dev/shm")
+    directory: Path = shared_memory if shared_memory.is_dir() else Path(tempfile.gettempdir())
+    return directory / "pep503_simple_repo_broker" / "index.json"
 
 
 class Application:
     """Application."""
 
+    def setup_github_repositories(self) -> list[GithubRepositoryReference]:
+        """Setup the Github repositories, from the configuration file if any, from environment variables otherwise."""
+        if self._integration_config_file is not None:
+            return self._integration_config_file.load_github_repositories()
+        repositories: list[GithubRepositoryReference] = []
+        for suffix in ("", "_2"):
+            namespace: str = os.getenv(f"GITHUB_NAMESPACE{suffix}", "")
+            name: str = os.getenv(f"GITHUB_REPOSITORY_NAME{suffix}", "")
+            if namespace == "" or name == "":
+                continue
+            repositories.append(
+                {
+                    "namespace": GithubNamespace(namespace),
+                    "name": GithubRepositoryName(name),
+                    "package_name": PackageName(os.getenv(f"GITHUB_PACKAGE_NAME{suffix}", "")) or None,
+                }
+            )
+        return repositories
+
+    def setup_github_organizations(self) -> list[GithubOrganizationReference]:
+        """Setup the Github organizations whose repositories are discovered."""
+        if self._integration_config_file is not None:
+            return self._integration_config_file.load_github_organizations()
+        return [
+            {"namespace": GithubNamespace(namespace.strip())}
+            for namespace in os.getenv("GITHUB_DISCOVERY_NAMESPACES", "").split(",")
+            if namespace.strip() != ""
+        ]
+
+    def setup_github_integration(self) -> GithubIntegration:
+        """Setup the Github integration."""
+        return GithubIntegration(
+            self.setup_github_repositories(),
+            max_concurrency=int(os.getenv("GITHUB_MAX_CONCURRENCY", "8")),
+            session_settings=self.setup_github_session_settings(),
+            parallel_release_pages=os.getenv("GITHUB_PARALLEL_RELEASE_PAGES", "false").lower() == "true",
+            background_refresh=self._background_refresh,
+            rate_limit_settings=self.setup_github_rate_limit_settings(),
+            organizations=self.setup_github_organizations(),
+            download_mode=self.setup_github_download_mode(),
+            shared_cache=self._shared_cache,
+            shared_index_max_age=float(os.getenv("SHARED_INDEX_MAX_AGE", "0")),
+        )
+
+    def setup_github_download_mode(self) -> GithubDownloadMode:
+        """Setup how package files are downloaded from the `GITHUB_DOWNLOAD_MODE` environment variable."""
+        download_mode: str = os.getenv("GITHUB_DOWNLOAD_MODE", GithubDownloadMode.PROXY.value)
+        try:
+            return GithubDownloadMode(download_mode)
+        except ValueError as exception:
+            raise ValueError(
+                f"GITHUB_DOWNLOAD_MODE must be one of {', '.join(GithubDownloadMode)}, not {download_mode!r}"
+            ) from exception
+
+    def setup_shared_cache(self) -> SharedCache | None:
+        """Setup the cache shared by the replicas, disabled when no Redis URL is configured."""
+        shared_cache_url: str = os.getenv("SHARED_CACHE_URL", "")
+        if shared_cache_url == "":
+            return None
+        return RedisSharedCache(shared_cache_url, prefix=os.getenv("SHARED_CACHE_PREFIX", "pep503_simple_repo_broker:"))
+
     def setup_integrations(self) -> list[AbstractIntegration]:
-        """Setup integrations.
+        """Setup integrations."""
+        if self._background_refresh:
+            # Indexes are kept fresh by the refresher, requests never wait for Github
+            return [self._github_integration]
+        index_cache_max_stale: str | None = os.getenv("INDEX_CACHE_MAX_STALE", None)
+        return [
+            CachedIntegration(
+                self._github_integration,
+                ttl=float(os.getenv("INDEX_CACHE_TTL", "60")),
+                max_stale=float(index_cache_max_stale) if index_cache_max_stale is not None else None,
+            )
+        ]
+
+    def setup_github_session_settings(self) -> GithubSessionSettings:
+        """Setup Github HTTP session settings from environment variables."""
+        environment_settings: dict[str, str] = {
+            field: value
+            for field, variable in {
+                "limit": "GITHUB_HTTP_LIMIT",
+                "limit_per_host": "GITHUB_HTTP_LIMIT_PER_HOST",
+                "keepalive_timeout": "GITHUB_HTTP_KEEPALIVE_TIMEOUT",
+                "dns_cache_ttl": "GITHUB_HTTP_DNS_CACHE_TTL",
+                "connect_timeout": "GITHUB_HTTP_CONNECT_TIMEOUT",
+                "read_timeout": "GITHUB_HTTP_READ_TIMEOUT",
+                "read_bufsize": "GITHUB_HTTP_READ_BUFSIZE",
+                "download_chunk_size": "GITHUB_DOWNLOAD_CHUNK_SIZE",
+            }.items()
+            if (value := os.getenv(variable, "")) != ""
+        }
+        return GithubSessionSettings.model_validate(environment_settings)
 
-        TODO: Load integrations from configuration file or environment variables.
+    def setup_github_rate_limit_settings(self) -> GithubRateLimitSettings:
+        """Setup Github rate limit settings from environment variables."""
+        environment_settings: dict[str, str] = {
+            field: value
+            for field, variable in {
+                "max_retries": "GITHUB_RATE_LIMIT_MAX_RETRIES",
+                "backoff_base": "GITHUB_RATE_LIMIT_BACKOFF_BASE",
+                "max_backoff": "GITHUB_RATE_LIMIT_MAX_BACKOFF",
+                "max_wait": "GITHUB_RATE_LIMIT_MAX_WAIT",
+                "low_budget_ratio": "GITHUB_RATE_LIMIT_LOW_BUDGET_RATIO",
+                "max_spread_delay": "GITHUB_RATE_LIMIT_MAX_SPREAD_DELAY",
+            }.items()
+            if (value := os.getenv(variable, "")) != ""
+        }
+        return GithubRateLimitSettings.model_validate(environment_settings)
+
+    def setup_artifact_cache(self) -> ArtifactCache | None:
+        """Setup the artifact cache, disabled when no directory is configured."""
+        directory: str = os.getenv("ARTIFACT_CACHE_DIRECTORY", "")
+        if directory == "":
+            return None
+        return ArtifactCache(
+            Path(directory),
+            max_size=int(os.getenv("ARTIFACT_CACHE_MAX_SIZE", str(1024**3))),
+        )
+
+    def setup_index_refresher(self) -> IndexRefresher | None:
+        """Setup the background index refresher, disabled when no refresh interval is configured."""
+        if self._refresh_interval is None:
+            return None
+        return IndexRefresher(
+            self._integrations,
+            interval=self._refresh_interval,
+            jitter=float(os.getenv("INDEX_REFRESH_JITTER", "0.1")),
+            retry_delay=float(os.getenv("INDEX_REFRESH_RETRY_DELAY", "5")),
+            max_backoff=float(os.getenv("INDEX_REFRESH_MAX_BACKOFF", "600")),
+            max_concurrency=int(os.getenv("GITHUB_MAX_CONCURRENCY", "8")),
+            on_refresh=self._index_registry.get_snapshot,
+        )
+
+    def setup_index_snapshot_store(self) -> IndexSnapshotStore | None:
+        """Setup the index snapshot store, disabled when no path is configured in standalone mode.
+
+        The integrations are restored from the last snapshot, so a cold start serves the
+        last known index at once and keeps serving it while Github is unavailable.
         """
-        return [
-            GithubIntegration(
-                [
-                    {
-                        "namespace": GithubNamespace(os.getenv("GITHUB_NAMESPACE", "")),
-                        "name": GithubRepositoryName(os.getenv("GITHUB_REPOSITORY_NAME", "")),
-                        "package_name": PackageName(os.getenv("GITHUB_PACKAGE_NAME", "")),
-                    },
-                    {
-                        "namespace": GithubNamespace(os.getenv("GITHUB_NAMESPACE_2", "")),
-                        "name": GithubRepositoryName(os.getenv("GITHUB_REPOSITORY_NAME_2", "")),
-                        "package_name": PackageName(os.getenv("GITHUB_PACKAGE_NAME_2", "")),
-                    },
-                ]
+        path: str = os.getenv("INDEX_SNAPSHOT_PATH", "")
+        if path == "":
+            if self._role == ApplicationRole.STANDALONE:
+                return None
+            path = str(get_default_index_snapshot_path())
+        snapshot_store: IndexSnapshotStore = IndexSnapshotStore(Path(path))
+        sources: dict[str, StoredPackageIndex] | None = snapshot_store.load()
+        if sources is not None:
+            restore_source_indexes(self._integrations, sources, fetched_at=snapshot_store.get_saved_at())
+        return snapshot_store
+
+    def setup_index_snapshot_watcher(self) -> IndexSnapshotWatcher | None:
+        """Setup the watcher of the snapshots published to the workers."""
+        if self._role != ApplicationRole.WORKER or self._index_snapshot_store is None:
+            return None
+        return IndexSnapshotWatcher(
+            self._index_snapshot_store,
+            self._integrations,
+            interval=float(os.getenv("INDEX_SNAPSHOT_POLL_INTERVAL", "1")),
+        )
+
+    def setup_index_refresh_requests(self) -> IndexRefreshRequests | None:
+        """Setup the refresh requests the workers forward to the publisher, next to the published snapshot."""
+        if self._role == ApplicationRole.STANDALONE or self._index_snapshot_store is None:
+            return None
+        snapshot_path: Path = self._index_snapshot_store.path
+        return IndexRefreshRequests(snapshot_path.with_name(f"{snapshot_path.name}.refresh"))
+
+    def setup_index_refresh_request_watcher(self) -> IndexRefreshRequestWatcher | None:
+        """Setup the watcher of the refresh requests forwarded by the workers."""
+        if self._role != ApplicationRole.PUBLISHER or self._index_refresh_requests is None:
+            return None
+        return IndexRefreshRequestWatcher(
+            self._index_refresh_requests,
+            self.refresh_requested_sources,
+            interval=float(os.getenv("INDEX_SNAPSHOT_POLL_INTERVAL", "1")),
+        )
+
+    async def refresh_requested_sources(self, sources: list[str]) -> None:
+        """Refresh the sources requested by the workers, then publish the snapshot at once."""
+        for integration in self._integrations:
+            for source in sources:
+                try:
+                    await integration.refresh_source(source)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    _logger.warning("Failed to refresh requested source %s", source, exc_info=True)
+        await self._index_registry.get_snapshot()
+        await self._index_registry.flush_snapshot()
+
+    def setup_integration_config_watcher(self) -> IntegrationConfigWatcher | None:
+        """Setup the hot reload of the integrations configuration file, if any."""
+        if self._integration_config_file is None:
+            return None
+        return IntegrationConfigWatcher(
+            self._integration_config_file,
+            self._github_integration,
+            interval=float(os.getenv("INTEGRATIONS_CONFIG_POLL_INTERVAL", "5")),
+            on_reload=self.reload_sources,
+        )
+
+    async def reload_sources(self, sources: list[str]) -> None:
+        """Populate the sources added or changed by a configuration reload, then rebuild the index."""
+        if self._index_snapshot_watcher is not None:
+            # Restore the indexes the publisher already fetched for the added sources
+            await self._index_snapshot_watcher.reload(force=True)
+        elif self._index_refresher is not None:
+            self._index_refresher.sync(sources)
+        else:
+            await gather_with_concurrency(
+                [integration.refresh_source(source) for integration in self._integrations for source in sources],
+                max_concurrency=int(os.getenv("GITHUB_MAX_CONCURRENCY", "8")),
             )
+        await self._index_registry.get_snapshot()
+
+    @asynccontextmanager
+    async def lifespan(self, _: FastAPI) -> AsyncIterator[None]:
+        """Start the integrations and the refresher with the application and stop them on shutdown."""
+        for integration in self._integrations:
+            await integration.startup()
+        if self._index_refresher is not None:
+            self._index_refresher.start()
+        watchers: list[IndexSnapshotWatcher | IndexRefreshRequestWatcher | IntegrationConfigWatcher] = [
+            watcher
+            for watcher in (
+                self._index_snapshot_watcher,
+                self._index_refresh_request_watcher,
+                self._integration_config_watcher,
+            )
+            if watcher is not None
         ]
+        for watcher in watchers:
+            watcher.start()
+        if self._index_refresher is None and self._role != ApplicationRole.WORKER:
+            # Populate the index before the readiness probe lets traffic in
+            self._index_registry.warm()
+        try:
+            yield
+        finally:
+            for watcher in reversed(watchers):
+                await watcher.stop()
+            if self._index_refresher is not None:
+                await self._index_refresher.stop()
+            await self._index_registry.flush_snapshot()
+            for integration in self._integrations:
+                await integration.shutdown()
+            if self._shared_cache is not None:
+                await self._shared_cache.close()
+
+    def __init__(
+        self, host: str | None = None, port: int | None = None, role: ApplicationRole = ApplicationRole.STANDALONE
+    ) -> None:
+        """Initialize Application.
 
-    def __init__(self, host: str | None = None, port: int | None = None) -> None:
-        """Initialize Application."""
+        Args:
+            host: Host to listen on.
+            port: Port to listen on.
+            role: Role of the process, see `run` for the multi-worker mode.
+        """
         # Configurations
         self._host = host or "0.0.0.0"
         self._port = port or 8000
+        self._role: ApplicationRole = role
         # Integrations
+        index_refresh_interval: str | None = os.getenv("INDEX_REFRESH_INTERVAL", None)
+        if index_refresh_interval is None and role == ApplicationRole.PUBLISHER:
+            index_refresh_interval = "60"
+        self._refresh_interval: float | None = (
+            float(index_refresh_interval)
+            if index_refresh_interval is not None and role != ApplicationRole.WORKER
+            else None
+        )
+        self._background_refresh: bool = self._refresh_interval is not None or role == ApplicationRole.WORKER
+        integrations_config_path: str = os.getenv("INTEGRATIONS_CONFIG_PATH", "")
+        self._integration_config_file: IntegrationConfigFile | None = (
+            IntegrationConfigFile(Path(integrations_config_path)) if integrations_config_path != "" else None
+        )
+        self._shared_cache: SharedCache | None = self.setup_shared_cache()
+        self._github_integration: GithubIntegration = self.setup_github_integration()
         self._integrations: list[AbstractIntegration] = self.setup_integrations()
+        self._index_snapshot_store: IndexSnapshotStore | None = self.setup_index_snapshot_store()
+        self._index_registry: PackageIndexRegistry = PackageIndexRegistry(
+            self._integrations,
+            max_concurrency=int(os.getenv("INTEGRATION_MAX_CONCURRENCY", "8")),
+            # Only the process refreshing the index writes its snapshots
+            snapshot_store=self._index_snapshot_store if role != ApplicationRole.WORKER else None,
+            snapshot_save_delay=float(os.getenv("INDEX_SNAPSHOT_SAVE_DELAY", "5")),
+        )
+        self._index_refresher: IndexRefresher | None = self.setup_index_refresher()
+        self._index_snapshot_watcher: IndexSnapshotWatcher | None = self.setup_index_snapshot_watcher()
+        self._index_refresh_requests: IndexRefreshRequests | None = self.setup_index_refresh_requests()
+        self._index_refresh_request_watcher: IndexRefreshRequestWatcher | None = (
+            self.setup_index_refresh_request_watcher()
+        )
+        self._integration_config_watcher: IntegrationConfigWatcher | None = self.setup_integration_config_watcher()
         # Attributes
-        self._fastapi_app = FastAPI()
+        self._fastapi_app = FastAPI(lifespan=self.lifespan)
 
         setattr(self._fastapi_app.state, "integrations", self._integrations)
+        setattr(self._fastapi_app.state, "index_registry", self._index_registry)
+
+        setattr(self._fastapi_app.state, "artifact_cache", self.setup_artifact_cache())
+        setattr(self._fastapi_app.state, "page_cache", RenderedPageCache())
+        setattr(self._fastapi_app.state, "index_refresher", self._index_refresher)
+        # Workers forward the webhook refreshes to the publisher
+        setattr(
+            self._fastapi_app.state,
+            "index_refresh_requests",
+            self._index_refresh_requests if role == ApplicationRole.WORKER else None,
+        )
+        readiness_max_index_age: str = os.getenv("READINESS_MAX_INDEX_AGE", "3600")
+        setattr(
+            self._fastapi_app.state,
+            "readiness_max_index_age",
+            float(readiness_max_index_age) if readiness_max_index_age != "" else None,
+        )
+        setattr(self._fastapi_app.state, "github_webhook_secret", os.getenv("GITHUB_WEBHOOK_SECRET", None) or None)
+        setattr(
+            self._fastapi_app.state,
+            "wheel_metadata_cache",
+            WheelMetadataCache(
+                max_entries=int(os.getenv("WHEEL_METADATA_CACHE_MAX_ENTRIES", "4096")), shared_cache=self._shared_cache
+            ),
+        )
 
         from .api import (  # noqa: PLC0415 # pylint: disable=import-outside-toplevel
             api_router,
@@ -57,10 +398,62 @@ class Application:
 
         self._fastapi_app.include_router(api_router)
 
+    @property
+    def fastapi_app(self) -> FastAPI:
+        """Get the FastAPI application."""
+        return self._fastapi_app
+
     async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
         """Forward the call to the FastAPI app."""
         return await self._fastapi_app.__call__(scope=scope, receive=receive, send=send)
 
+    async def publish(self) -> None:
+        """Refresh the index and publish its snapshots until cancelled."""
+        async with self.lifespan(self._fastapi_app):
+            await asyncio.Event().wait()
+
     def run(self) -> None:
-        """Run Application."""
+        """Run Application in a single process, see `run` for the multi-worker mode."""
         uvicorn.run(self, host=self._host, port=self._port)
+
+
+def run(host: str | None = None, port: int | None = None) -> None:
+    """Run the broker.
+
+    With more than one `WORKERS`, a publisher process refreshes the index and writes
+    its snapshots to a file in shared memory, and the workers serve requests from the
+    snapshot, so Github is queried once whatever the number of workers. The parent
+    process only supervises them, it builds no application of its own.
+    """
+    workers: int = int(os.getenv("WORKERS", "1"))
+    if workers <= 1:
+        Application(host, port).run()
+        return
+    # Inherited by the publisher and the workers
+    os.environ.setdefault("INDEX_SNAPSHOT_PATH", str(get_default_index_snapshot_path()))
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Aggregates the metrics of all processes in `/metrics`
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="pep503_simple_repo_broker-metrics-")
+    publisher = multiprocessing.get_context("spawn").Process(target=run_publisher, name="index-publisher", daemon=True)
+    publisher.start()
+    try:
+        uvicorn.run(
+            f"{__name__}:create_worker_application",
+            factory=True,
+            host=host or "0.0.0.0",
+            port=port or 8000,
+            workers=workers,
+        )
+    finally:
+        publisher.terminate()
+        publisher.join()
+
+
+def run_publisher() -> None:
+    """Run the publisher process of the multi-worker mode."""
+    asyncio.run(Application(role=ApplicationRole.PUBLISHER).publish())
+
+
+def create_worker_application() -> Application:
+    """Create the application of a worker process of the multi-worker mode."""
+    return Application(role=ApplicationRole.WORKER)
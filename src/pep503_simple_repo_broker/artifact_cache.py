@@ -0,0 +1,196 @@
+"""Content-addressed artifact cache."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator
+from pathlib import Path
+from typing import BinaryIO
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+_DIGEST_PATTERN: re.Pattern[str] = re.compile(r"^(?P<algorithm>[a-z0-9]+):(?P<value>[0-9a-f]+)$")
+_TEMPORARY_SUFFIX: str = ".tmp"
+
+
+def parse_digest(digest: str) -> tuple[str, str] | None:
+    """Parse a `<algorithm>:<hex value>` digest, `None` if it is not usable as a cache key."""
+    match: re.Match[str] | None = _DIGEST_PATTERN.match(digest)
+    if match is None or match["algorithm"] not in hashlib.algorithms_available:
+        return None
+    return match["algorithm"], match["value"]
+
+
+class ArtifactFill:
+    """Right to fill the cache with an artifact, held by a single download at a time."""
+
+    def __init__(self, artifact_cache: "ArtifactCache", digest: str) -> None:
+        """Initialize artifact fill."""
+        self._artifact_cache: ArtifactCache = artifact_cache
+        self._digest: str = digest
+        self._done: asyncio.Event = asyncio.Event()
+
+    async def wait(self) -> None:
+        """Wait for the fill to complete or fail."""
+        await self._done.wait()
+
+    def release(self) -> None:
+        """Release the fill, waiting downloads will retry the cache."""
+        self._artifact_cache.release_fill(self._digest, self)
+        self._done.set()
+
+    async def tee(self, content: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+        """Yield the content while writing it to the cache.
+
+        The artifact is written to a temporary file and only moved in place once it is
+        complete and its digest matches, so a partial artifact is never served.
+        """
+        parsed_digest: tuple[str, str] | None = parse_digest(self._digest)
+        if parsed_digest is None:
+            self.release()
+            raise ValueError(f"Unsupported digest {self._digest}")
+        algorithm, expected_value = parsed_digest
+        hasher = hashlib.new(algorithm)
+        path: Path = self._artifact_cache.get_artifact_path(self._digest)
+        temporary_path: Path = path.with_name(f".{path.name}.{uuid.uuid4().hex}{_TEMPORARY_SUFFIX}")
+        file: BinaryIO = await asyncio.to_thread(temporary_path.open, "wb")
+        completed: bool = False
+        try:
+            async for chunk in content:
+                await asyncio.to_thread(file.write, chunk)
+                hasher.update(chunk)
+                yield chunk
+            completed = True
+        finally:
+            # Only synchronous calls here, the generator may be closed by a cancellation
+            try:
+                if completed and hasher.hexdigest() == expected_value:
+                    file.flush()
+                    os.fsync(file.fileno())
+                    file.close()
+                    os.replace(temporary_path, path)
+                    self._artifact_cache.register(self._digest, path.stat().st_size)
+                else:
+                    if completed:
+                        _logger.warning("Digest mismatch for artifact %s, not cached", self._digest)
+                    file.close()
+                    temporary_path.unlink(missing_ok=True)
+            except OSError:
+                _logger.warning("Failed to store artifact %s", self._digest, exc_info=True)
+                temporary_path.unlink(missing_ok=True)
+            finally:
+                self.release()
+
+
+class ArtifactCache:
+    """On-disk cache of artifacts keyed by their digest, with LRU eviction.
+
+    Concurrent downloads of the same missing artifact are collapsed: the first one
+    fills the cache while streaming to its client, the others wait and are served
+    from disk.
+    """
+
+    def __init__(self, directory: Path, max_size: int) -> None:
+        """Initialize artifact cache.
+
+        Args:
+            directory: Directory storing the artifacts, created if needed.
+            max_size: Maximum total size of the artifacts in bytes.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be positive")
+        self._directory: Path = directory
+        self._max_size: int = max_size
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._size: int = 0
+        self._fills: dict[str, ArtifactFill] = {}
+        self.load()
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the cached artifacts in bytes."""
+        return self._size
+
+    def get_artifact_path(self, digest: str) -> Path:
+        """Get the path of an artifact."""
+        return self._directory / digest.replace(":", "-")
+
+    def load(self) -> None:
+        """Load the artifacts already on disk, least recently used first."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        artifacts: list[tuple[float, str, int]] = []
+        for path in self._directory.iterdir():
+            if path.name.endswith(_TEMPORARY_SUFFIX):
+                path.unlink(missing_ok=True)
+                continue
+            digest: str = path.name.replace("-", ":", 1)
+            if not path.is_file() or parse_digest(digest) is None:
+                continue
+            stat: os.stat_result = path.stat()
+            artifacts.append((stat.st_mtime, digest, stat.st_size))
+        for _, digest, size in sorted(artifacts):
+            self._sizes[digest] = size
+            self._size += size
+        self.evict()
+
+    def accepts(self, digest: str | None) -> bool:
+        """Check if an artifact with this digest can be cached."""
+        return digest is not None and parse_digest(digest) is not None
+
+    def get(self, digest: str) -> Path | None:
+        """Get the path of a cached artifact and mark it as recently used."""
+        if digest not in self._sizes:
+            return None
+        path: Path = self.get_artifact_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.forget(digest)
+            return None
+        self._sizes.move_to_end(digest)
+        return path
+
+    async def acquire(self, digest: str) -> Path | ArtifactFill:
+        """Get a cached artifact, or the right to fill it.
+
+        Waits while another download is filling the same artifact.
+        """
+        while True:
+            path: Path | None = self.get(digest)
+            if path is not None:
+                return path
+            inflight: ArtifactFill | None = self._fills.get(digest)
+            if inflight is None:
+                fill: ArtifactFill = ArtifactFill(self, digest)
+                self._fills[digest] = fill
+                return fill
+            await inflight.wait()
+
+    def release_fill(self, digest: str, fill: ArtifactFill) -> None:
+        """Forget an in-flight fill."""
+        if self._fills.get(digest) is fill:
+            del self._fills[digest]
+
+    def register(self, digest: str, size: int) -> None:
+        """Register a stored artifact and evict the least recently used ones if needed."""
+        self.forget(digest)
+        self._sizes[digest] = size
+        self._size += size
+        self.evict()
+
+    def forget(self, digest: str) -> None:
+        """Forget an artifact without deleting it."""
+        size: int | None = self._sizes.pop(digest, None)
+        if size is not None:
+            self._size -= size
+
+    def evict(self) -> None:
+        """Delete the least recently used artifacts until the cache fits its maximum size."""
+        while self._size > self._max_size and self._sizes:
+            digest: str = next(iter(self._sizes))
+            self.forget(digest)
+            self.get_artifact_path(digest).unlink(missing_ok=True)
@@ -0,0 +1,25 @@
+"""Concurrency helpers."""
+
+import asyncio
+from collections.abc import Awaitable, Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_with_concurrency(
+    awaitables: Iterable[Awaitable[T]], max_concurrency: int
+) -> list[T | BaseException]:
+    """Await all awaitables concurrently with at most `max_concurrency` running at the same time.
+
+    Exceptions are returned in place of the results, in the same order as the awaitables.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be greater than 0")
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*[_run(awaitable) for awaitable in awaitables], return_exceptions=True)
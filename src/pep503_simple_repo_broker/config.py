@@ -0,0 +1,216 @@
+"""Integrations configuration file."""
+
+import asyncio
+import logging
+import os
+import tomllib
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from .integrations.github.config import parse_github_organizations, parse_github_repositories
+from .integrations.github.integration import GithubIntegration
+from .integrations.github.types import (
+    GithubNamespace,
+    GithubOrganizationReference,
+    GithubRepositoryReference,
+    GithubRepositorySlug,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+def load_config_document(path: Path) -> dict[str, Any]:
+    """Load a configuration document, TOML or YAML depending on its extension.
+
+    Raises:
+        OSError: The file cannot be read.
+        ValueError: The file is not a valid document.
+    """
+    content: str = path.read_text(encoding="utf-8")
+    document: Any
+    if path.suffix == ".toml":
+        document = tomllib.loads(content)
+    else:
+        try:
+            document = yaml.safe_load(content)
+        except yaml.YAMLError as exception:
+            raise ValueError(f"Invalid YAML document: {exception}") from exception
+    if document is None:
+        return {}
+    if not isinstance(document, dict):
+        raise ValueError("The configuration must be a mapping")
+    return document
+
+
+class IntegrationConfigFile:
+    """Configuration file of the integrations.
+
+    Only the structure of the document is checked when it is loaded, each repository
+    and organization is validated on its own, see `parse_github_repositories`.
+
+    ```yaml
+    github:
+      defaults:
+        asset_pattern: "*.whl"
+      repositories:
+        - namespace: miragecentury
+          name: pep503_simple_repo_broker
+          refresh_interval: 600
+      organizations:
+        - namespace: miragecentury
+    ```
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize integration configuration file."""
+        self._path: Path = path
+
+    @property
+    def path(self) -> Path:
+        """Get the path of the configuration."""
+        return self._path
+
+    def get_version(self) -> tuple[int, int, int] | None:
+        """Get the version of the configuration file, `None` if it does not exist."""
+        try:
+            stat: os.stat_result = self._path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load_github_section(self, key: str) -> tuple[list[Any], dict[str, Any]]:
+        """Load the entries of a list of the Github section, with the defaults.
+
+        Raises:
+            OSError: The file cannot be read.
+            ValueError: The file is not a valid document.
+        """
+        document: dict[str, Any] = load_config_document(self._path)
+        github: Any = document.get("github", {})
+        if not isinstance(github, dict):
+            raise ValueError("github must be a mapping")
+        defaults: Any = github.get("defaults", {})
+        if not isinstance(defaults, dict):
+            raise ValueError("github.defaults must be a mapping")
+        entries: Any = github.get(key, [])
+        if not isinstance(entries, list):
+            raise ValueError(f"github.{key} must be a list")
+        return entries, defaults
+
+    def load_github_repositories(
+        self, previous: dict[GithubRepositorySlug, GithubRepositoryReference] | None = None
+    ) -> list[GithubRepositoryReference]:
+        """Load the Github repositories.
+
+        Args:
+            previous: Repositories by slug as loaded before, kept for invalid entries.
+
+        Raises:
+            OSError: The file cannot be read.
+            ValueError: The file is not a valid document.
+        """
+        entries, defaults = self.load_github_section("repositories")
+        return parse_github_repositories(entries, defaults, previous)
+
+    def load_github_organizations(
+        self, previous: dict[GithubNamespace, GithubOrganizationReference] | None = None
+    ) -> list[GithubOrganizationReference]:
+        """Load the Github organizations whose repositories are discovered.
+
+        Args:
+            previous: Organizations by namespace as loaded before, kept for invalid entries.
+
+        Raises:
+            OSError: The file cannot be read.
+            ValueError: The file is not a valid document.
+        """
+        entries, defaults = self.load_github_section("organizations")
+        return parse_github_organizations(entries, defaults, previous)
+
+
+class IntegrationConfigWatcher:
+    """Hot reload of the configuration file of the integrations.
+
+    The file is polled with cheap `stat` calls. On change, only the repositories and
+    organizations added, removed or changed are updated, the others keep their index.
+    """
+
+    def __init__(
+        self,
+        config_file: IntegrationConfigFile,
+        github_integration: GithubIntegration,
+        interval: float = 5.0,
+        on_reload: Callable[[list[str]], Awaitable[Any]] | None = None,
+    ) -> None:
+        """Initialize integration configuration watcher.
+
+        Args:
+            config_file: Configuration file to watch.
+            github_integration: Integration to update the repositories of.
+            interval: Number of seconds between two checks of the configuration file.
+            on_reload: Coroutine function called with the sources added or changed by a reload.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self._config_file: IntegrationConfigFile = config_file
+        self._github_integration: GithubIntegration = github_integration
+        self._interval: float = interval
+        self._on_reload: Callable[[list[str]], Awaitable[Any]] | None = on_reload
+        self._version: tuple[int, int, int] | None = config_file.get_version()
+        self._task: asyncio.Task[None] | None = None
+
+    async def reload(self) -> bool:
+        """Reload the configuration if the file changed since the last reload."""
+        version: tuple[int, int, int] | None = self._config_file.get_version()
+        if version is None or version == self._version:
+            return False
+        self._version = version
+        try:
+            repositories: list[GithubRepositoryReference] = await asyncio.to_thread(
+                self._config_file.load_github_repositories, self._github_integration.repositories
+            )
+            organizations: list[GithubOrganizationReference] = await asyncio.to_thread(
+                self._config_file.load_github_organizations, self._github_integration.organizations
+            )
+        except (OSError, ValueError):
+            _logger.warning("Failed to reload configuration %s", self._config_file.path, exc_info=True)
+            return False
+        updated: list[GithubRepositorySlug] = self._github_integration.update_repositories(repositories)
+        updated_organizations: list[GithubRepositorySlug] = self._github_integration.update_organizations(
+            organizations
+        )
+        _logger.info(
+            "Reloaded configuration %s, %s repositories and %s organizations updated",
+            self._config_file.path,
+            len(updated),
+            len(updated_organizations),
+        )
+        updated.extend(updated_organizations)
+        if self._on_reload is not None:
+            await self._on_reload(list(updated))
+        return True
+
+    async def run(self) -> None:
+        """Reload the configuration forever."""
+        while True:
+            try:
+                await self.reload()
+            except Exception:  # pylint: disable=broad-exception-caught
+                _logger.warning("Failed to reload configuration %s", self._config_file.path, exc_info=True)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        """Start watching the configuration."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="integration-config-watcher")
+
+    async def stop(self) -> None:
+        """Stop watching the configuration."""
+        task: asyncio.Task[None] | None = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
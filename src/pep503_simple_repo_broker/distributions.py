@@ -0,0 +1,22 @@
+"""Distribution file names."""
+
+WHEEL_EXTENSION: str = ".whl"
+SDIST_EXTENSIONS: tuple[str, ...] = (".tar.gz", ".zip")
+
+
+def get_distribution_version(filename: str) -> str | None:
+    """Get the version of a wheel or source distribution from its file name.
+
+    Wheels are named `{name}-{version}(-{build})?-{python}-{abi}-{platform}.whl` and
+    source distributions `{name}-{version}.tar.gz`, `None` is returned for other files.
+    """
+    if filename.endswith(WHEEL_EXTENSION):
+        parts: list[str] = filename.removesuffix(WHEEL_EXTENSION).split("-")
+        return parts[1] if len(parts) >= 5 else None  # noqa: PLR2004
+    for extension in SDIST_EXTENSIONS:
+        if filename.endswith(extension):
+            stem: str = filename.removesuffix(extension)
+            if "-" not in stem:
+                return None
+            return stem.rsplit("-", 1)[1] or None
+    return None
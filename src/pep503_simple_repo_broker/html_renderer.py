@@ -1,7 +1,7 @@
 """HTML Renderer Package."""
 
 from abc import ABC
-from typing import Self, TypedDict
+from typing import NotRequired, Self, TypedDict
 
 from fastapi.responses import HTMLResponse
 
@@ -20,6 +20,8 @@ class HtmlListItem(TypedDict):
 
     name: str
     url: str
+    # Extra anchor attributes, like the PEP 658 `data-core-metadata`
+    attributes: NotRequired[dict[str, str]]
 
 
 class HtmlListRenderer(AbstractHtmlRenderer):
@@ -40,21 +42,31 @@ class HtmlListRenderer(AbstractHtmlRenderer):
         self.items.append(item)
         return self
 
+    @classmethod
+    def build_attributes(cls, item: HtmlListItem) -> str:
+        """Build the extra attributes of an item."""
+        return "".join(f" {key}='{value}'" for key, value in item.get("attributes", {}).items())
+
     def build_body(self) -> str:
         """Build HTML List Body."""
         return "".join(
-            [f"<a href='{item['url']}'>{item['name']}</a>" for item in self.items]  # pylint: disable=inconsistent-quotes
+            [
+                f"<a href='{item['url']}'{self.build_attributes(item)}>{item['name']}</a>"  # pylint: disable=inconsistent-quotes
+                for item in self.items
+            ]
         )
 
     def build_head(self) -> str:
         """Build HTML List Head."""
         return f"<title>{self.title}</title>" if self.title else ""
 
+    def build(self) -> str:
+        """Build HTML List."""
+        return self.build_html(
+            body=self.build_body(),
+            head=self.build_head(),
+        )
+
     def render(self) -> HTMLResponse:
         """Render HTML List Renderer."""
-        return HTMLResponse(
-            content=self.build_html(
-                body=self.build_body(),
-                head=self.build_head(),
-            )
-        )
+        return HTMLResponse(content=self.build())
@@ -0,0 +1,265 @@
+"""Package index of all integrations."""
+
+import asyncio
+import logging
+
+from .concurrency import gather_with_concurrency
+from .index_store import IndexSnapshotStore, collect_source_indexes
+from .integrations.abstracts import (
+    AbstractIntegration,
+    IntegrationId,
+    IntegrationIndexError,
+    IntegrationPackageIndex,
+    PackageName,
+    normalize_package_name,
+)
+from .integrations.lookup import PackageIndexLookup
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+def is_same_package_index(
+    package_index: IntegrationPackageIndex | None, other_package_index: IntegrationPackageIndex | None
+) -> bool:
+    """Check if two indexes of a package expose the same files from the same integration."""
+    if package_index is None or other_package_index is None:
+        return package_index is other_package_index
+    return (
+        package_index["integration_id"] == other_package_index["integration_id"]
+        and package_index["package_file_list"] == other_package_index["package_file_list"]
+    )
+
+
+class PackageIndexSnapshot:
+    """Merged index of all integrations at a given generation.
+
+    A package fetched on its own is served from a snapshot of that package alone, within
+    the same generation but with its own revision, so only its pages are rendered again.
+    """
+
+    __slots__ = ("errors", "generation", "lookup", "revision")
+
+    def __init__(
+        self, generation: int, lookup: PackageIndexLookup, errors: list[IntegrationIndexError], revision: int = 0
+    ) -> None:
+        """Initialize package index snapshot."""
+        self.generation: int = generation
+        self.lookup: PackageIndexLookup = lookup
+        self.errors: list[IntegrationIndexError] = errors
+        self.revision: int = revision
+
+
+class PackageIndexRegistry:
+    """Registry of the integrations and of the lookup of their merged index.
+
+    The lookup is only rebuilt when an integration returns a different index,
+    and is swapped atomically so readers always see a consistent snapshot.
+    """
+
+    def __init__(
+        self,
+        integrations: list[AbstractIntegration],
+        max_concurrency: int = 8,
+        snapshot_store: IndexSnapshotStore | None = None,
+        snapshot_save_delay: float = 5.0,
+    ) -> None:
+        """Initialize package index registry.
+
+        Args:
+            integrations: Integrations to merge the index of.
+            max_concurrency: Maximum number of integrations queried at the same time.
+            snapshot_store: Store persisting the indexes after the lookup is rebuilt.
+            snapshot_save_delay: Number of seconds the snapshot is saved after the lookup is rebuilt,
+                the rebuilds meanwhile being saved together.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        if snapshot_save_delay < 0:
+            raise ValueError("snapshot_save_delay must be positive")
+        self._integrations: list[AbstractIntegration] = integrations
+        self._integrations_by_id: dict[IntegrationId, AbstractIntegration] = {
+            integration.id: integration for integration in integrations
+        }
+        self._max_concurrency: int = max_concurrency
+        self._snapshot_store: IndexSnapshotStore | None = snapshot_store
+        self._snapshot_save_delay: float = snapshot_save_delay
+        self._snapshot_save: asyncio.Task[None] | None = None
+        self._sources: list[list[IntegrationPackageIndex] | None] = []
+        self._snapshot: PackageIndexSnapshot = PackageIndexSnapshot(0, PackageIndexLookup([]), [])
+        # Snapshots of the packages changed since the generation was built, by normalized name
+        self._package_snapshots: dict[PackageName, PackageIndexSnapshot] = {}
+        # Last revision of a package snapshot, never reused so a page is never served for another revision
+        self._revision: int = 0
+        self._warmup: asyncio.Task[PackageIndexSnapshot] | None = None
+
+    @property
+    def integrations(self) -> list[AbstractIntegration]:
+        """Get integrations."""
+        return self._integrations
+
+    @property
+    def snapshot(self) -> PackageIndexSnapshot:
+        """Get the last built snapshot, without refreshing the integrations."""
+        return self._snapshot
+
+    def get_integration(self, integration_id: IntegrationId) -> AbstractIntegration | None:
+        """Get an integration by id."""
+        return self._integrations_by_id.get(integration_id)
+
+    async def collect_index(
+        self,
+    ) -> tuple[list[list[IntegrationPackageIndex] | None], list[IntegrationIndexError]]:
+        """Collect the index of all integrations concurrently.
+
+        A failing integration is left out of the index (`None`) and reported as an error,
+        along with the errors reported by the integrations themselves.
+        """
+        results: list[list[IntegrationPackageIndex] | BaseException] = await gather_with_concurrency(
+            [integration.get_index() for integration in self._integrations],
+            max_concurrency=self._max_concurrency,
+        )
+        sources: list[list[IntegrationPackageIndex] | None] = []
+        errors: list[IntegrationIndexError] = []
+        for integration, result in zip(self._integrations, results, strict=True):
+            if isinstance(result, Exception):
+                _logger.warning("Failed to get index of integration %s", integration.id, exc_info=result)
+                sources.append(None)
+                errors.append(
+                    {
+                        "integration_id": integration.id,
+                        "source": str(integration.id),
+                        "message": str(result) or result.__class__.__name__,
+                    }
+                )
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            sources.append(result)
+            errors.extend(integration.get_index_errors())
+        return sources, errors
+
+    async def get_snapshot(self) -> PackageIndexSnapshot:
+        """Get the snapshot of the merged index, rebuilding the lookup if any index changed."""
+        sources: list[list[IntegrationPackageIndex] | None]
+        errors: list[IntegrationIndexError]
+        sources, errors = await self.collect_index()
+        snapshot: PackageIndexSnapshot = self._snapshot
+        unchanged: bool = len(sources) == len(self._sources) and all(
+            source is previous_source for source, previous_source in zip(sources, self._sources, strict=True)
+        )
+        if unchanged and snapshot.generation > 0:
+            if errors != snapshot.errors:
+                snapshot = PackageIndexSnapshot(snapshot.generation, snapshot.lookup, errors)
+                self._snapshot = snapshot
+            return snapshot
+        index: list[IntegrationPackageIndex] = [
+            package_index for source in sources if source is not None for package_index in source
+        ]
+        snapshot = PackageIndexSnapshot(snapshot.generation + 1, PackageIndexLookup(index), errors)
+        # Swap the references only once the new lookup is fully built
+        self._sources = sources
+        self._snapshot = snapshot
+        self._package_snapshots = {}
+        self.schedule_snapshot_save()
+        return snapshot
+
+    async def get_package_snapshot(self, package_name: str) -> PackageIndexSnapshot:
+        """Get the snapshot of the merged index, with a single package fetched from the integrations.
+
+        Integrations only refresh the source owning the package. The current snapshot is
+        kept while the package is unchanged, otherwise the package is served from a new
+        snapshot built from its index alone, and the snapshot is saved. A package is never
+        removed while an integration fails.
+        """
+        results: list[IntegrationPackageIndex | BaseException | None] = await gather_with_concurrency(
+            [integration.get_package(PackageName(package_name)) for integration in self._integrations],
+            max_concurrency=self._max_concurrency,
+        )
+        package_index: IntegrationPackageIndex | None = None
+        failed: bool = False
+        for integration, result in zip(self._integrations, results, strict=True):
+            if isinstance(result, Exception):
+                _logger.warning(
+                    "Failed to get package %s of integration %s", package_name, integration.id, exc_info=result
+                )
+                failed = True
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            if result is not None:
+                package_index = result
+                break
+        normalized_package_name: PackageName = normalize_package_name(package_name)
+        snapshot: PackageIndexSnapshot = self._snapshot
+        package_snapshot: PackageIndexSnapshot = self._package_snapshots.get(normalized_package_name, snapshot)
+        if (package_index is None and failed) or is_same_package_index(
+            package_snapshot.lookup.get_package(package_name), package_index
+        ):
+            if package_snapshot.errors is not snapshot.errors:
+                package_snapshot = PackageIndexSnapshot(
+                    package_snapshot.generation, package_snapshot.lookup, snapshot.errors, package_snapshot.revision
+                )
+                self._package_snapshots[normalized_package_name] = package_snapshot
+            return package_snapshot
+        self._revision += 1
+        package_snapshot = PackageIndexSnapshot(
+            snapshot.generation,
+            PackageIndexLookup([] if package_index is None else [package_index]),
+            snapshot.errors,
+            self._revision,
+        )
+        self._package_snapshots[normalized_package_name] = package_snapshot
+        # The integration refreshed the source of the package, persisted along with the other sources
+        self.schedule_snapshot_save()
+        return package_snapshot
+
+    def warm(self) -> None:
+        """Build the snapshot in the background, unless a previous warm-up is still running.
+
+        Integrations fetching their index on demand populate it, so the first requests
+        do not pay for it.
+        """
+        if self._warmup is not None and not self._warmup.done():
+            return
+        self._warmup = asyncio.create_task(self.get_snapshot(), name="index-warmup")
+        self._warmup.add_done_callback(self._on_warmup_done)
+
+    def _on_warmup_done(self, task: "asyncio.Task[PackageIndexSnapshot]") -> None:
+        """Log a failed warm-up."""
+        if not task.cancelled() and task.exception() is not None:
+            _logger.warning("Index warm-up failed", exc_info=task.exception())
+
+    def schedule_snapshot_save(self) -> None:
+        """Save the snapshot after `snapshot_save_delay` seconds, unless a save is already scheduled.
+
+        Sources refreshed one after the other are saved together, not once per source.
+        """
+        if self._snapshot_store is None or self._snapshot_save is not None:
+            return
+        self._snapshot_save = asyncio.create_task(self._save_snapshot_later(), name="index-snapshot-save")
+
+    async def _save_snapshot_later(self) -> None:
+        """Save the snapshot once the delay elapsed."""
+        await asyncio.sleep(self._snapshot_save_delay)
+        # Rebuilds from now on are saved by the next scheduled save
+        self._snapshot_save = None
+        await self.save_snapshot()
+
+    async def flush_snapshot(self) -> None:
+        """Save the scheduled snapshot at once, on shutdown or when the workers wait for it."""
+        task: asyncio.Task[None] | None = self._snapshot_save
+        if task is None:
+            return
+        self._snapshot_save = None
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await self.save_snapshot()
+
+    async def save_snapshot(self) -> None:
+        """Persist the indexes of the integrations, failures are logged."""
+        if self._snapshot_store is None:
+            return
+        try:
+            await asyncio.to_thread(self._snapshot_store.save, collect_source_indexes(self._integrations))
+        except OSError:
+            _logger.warning("Failed to save index snapshot %s", self._snapshot_store.path, exc_info=True)
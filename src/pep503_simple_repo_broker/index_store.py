@@ -0,0 +1,341 @@
+"""Persistent snapshot of the integration indexes."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypedDict
+
+from .integrations.abstracts import (
+    AbstractIntegration,
+    IntegrationId,
+    IntegrationPackageFile,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+INDEX_STORE_FORMAT: int = 1
+
+
+class StoredPackageIndex(TypedDict):
+    """Package index as stored, without the integration id which changes on every start."""
+
+    package_name: PackageName
+    package_version_list: list[PackageVersion]
+    package_file_list: list[IntegrationPackageFile]
+
+
+_STORED_FILE_KEYS: frozenset[str] = frozenset(IntegrationPackageFile.__annotations__)
+
+
+def is_stored_package_index(value: Any) -> bool:
+    """Check the structure of a stored package index."""
+    return (
+        isinstance(value, dict)
+        and isinstance(value.get("package_name"), str)
+        and isinstance(value.get("package_version_list"), list)
+        and all(isinstance(version, str) for version in value["package_version_list"])
+        and isinstance(value.get("package_file_list"), list)
+        and all(
+            isinstance(package_file, dict) and _STORED_FILE_KEYS <= package_file.keys()
+            for package_file in value["package_file_list"]
+        )
+    )
+
+
+def build_checksum(sources: Any) -> str:
+    """Build the checksum of the stored sources."""
+    content: bytes = json.dumps(sources, sort_keys=True, separators=(",", ":")).encode()
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+def to_stored_package_index(package_index: IntegrationPackageIndex) -> StoredPackageIndex:
+    """Strip a package index of its integration id."""
+    return {
+        "package_name": package_index["package_name"],
+        "package_version_list": package_index["package_version_list"],
+        "package_file_list": package_index["package_file_list"],
+    }
+
+
+def to_package_index(integration_id: IntegrationId, stored: StoredPackageIndex) -> IntegrationPackageIndex:
+    """Attach a stored package index to an integration."""
+    return {
+        "integration_id": integration_id,
+        "package_name": stored["package_name"],
+        "package_version_list": stored["package_version_list"],
+        "package_file_list": stored["package_file_list"],
+    }
+
+
+class IndexSnapshotStore:
+    """On-disk snapshot of the package indexes, by integration source.
+
+    The snapshot is a compact JSON document with a checksum of its content, written
+    atomically so a reader never sees a partial snapshot. A missing, corrupted or
+    incompatible snapshot is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize index snapshot store."""
+        self._path: Path = path
+
+    @property
+    def path(self) -> Path:
+        """Get the path of the snapshot."""
+        return self._path
+
+    def get_saved_at(self) -> float | None:
+        """Get the epoch seconds at which the snapshot was saved, `None` if it does not exist."""
+        try:
+            return self._path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def save(self, sources: dict[str, IntegrationPackageIndex]) -> None:
+        """Write the package indexes of the sources, replacing the previous snapshot."""
+        stored: dict[str, StoredPackageIndex] = {
+            source: to_stored_package_index(package_index) for source, package_index in sources.items()
+        }
+        content: bytes = json.dumps(
+            {"format": INDEX_STORE_FORMAT, "checksum": build_checksum(stored), "sources": stored},
+            separators=(",", ":"),
+        ).encode()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path: Path = self._path.with_name(f".{self._path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with temporary_path.open("wb") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self._path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+    def load(self) -> dict[str, StoredPackageIndex] | None:
+        """Read the package indexes of the sources, `None` if no valid snapshot exists."""
+        try:
+            document: Any = json.loads(self._path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            _logger.warning("Failed to read index snapshot %s", self._path, exc_info=True)
+            return None
+        if not isinstance(document, dict) or document.get("format") != INDEX_STORE_FORMAT:
+            _logger.warning("Ignoring index snapshot %s of an unsupported format", self._path)
+            return None
+        if document.get("checksum") != build_checksum(document.get("sources")):
+            _logger.warning("Ignoring index snapshot %s with an invalid checksum", self._path)
+            return None
+        sources: Any = document["sources"]
+        if not isinstance(sources, dict) or not all(is_stored_package_index(value) for value in sources.values()):
+            _logger.warning("Ignoring invalid index snapshot %s", self._path)
+            return None
+        return sources
+
+
+def collect_source_indexes(integrations: list[AbstractIntegration]) -> dict[str, IntegrationPackageIndex]:
+    """Collect the current package index of each source of the integrations."""
+    return {
+        source: package_index
+        for integration in integrations
+        for source, package_index in integration.get_source_indexes().items()
+    }
+
+
+def restore_source_indexes(
+    integrations: list[AbstractIntegration],
+    sources: dict[str, StoredPackageIndex],
+    overwrite: bool = False,
+    fetched_at: float | None = None,
+) -> None:
+    """Restore stored package indexes into the integrations owning their sources."""
+    for integration in integrations:
+        integration.restore_source_indexes(
+            {source: to_package_index(integration.id, stored) for source, stored in sources.items()},
+            overwrite,
+            fetched_at,
+        )
+
+
+class IndexSnapshotWatcher:
+    """Follower of a snapshot published by another process.
+
+    Workers serving requests do not query upstream: they poll the snapshot file, cheap
+    `stat` calls, and reload their integrations whenever the publisher replaces it.
+    """
+
+    def __init__(
+        self, snapshot_store: IndexSnapshotStore, integrations: list[AbstractIntegration], interval: float = 1.0
+    ) -> None:
+        """Initialize index snapshot watcher.
+
+        Args:
+            snapshot_store: Store of the published snapshot.
+            integrations: Integrations to reload.
+            interval: Number of seconds between two checks of the snapshot file.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self._snapshot_store: IndexSnapshotStore = snapshot_store
+        self._integrations: list[AbstractIntegration] = integrations
+        self._interval: float = interval
+        self._version: tuple[int, int, int] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def get_version(self) -> tuple[int, int, int] | None:
+        """Get the version of the snapshot file, `None` if it does not exist."""
+        try:
+            stat: os.stat_result = self._snapshot_store.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    async def reload(self, force: bool = False) -> bool:
+        """Reload the integrations if the snapshot changed since the last reload, or if forced."""
+        version: tuple[int, int, int] | None = self.get_version()
+        if version is None or (version == self._version and not force):
+            return False
+        sources: dict[str, StoredPackageIndex] | None = await asyncio.to_thread(self._snapshot_store.load)
+        self._version = version
+        if sources is None:
+            return False
+        # The snapshot is saved right after the indexes it holds are fetched
+        restore_source_indexes(self._integrations, sources, overwrite=True, fetched_at=version[1] / 1e9)
+        return True
+
+    async def run(self) -> None:
+        """Reload the integrations forever."""
+        while True:
+            try:
+                await self.reload()
+            except Exception:  # pylint: disable=broad-exception-caught
+                _logger.warning("Failed to reload index snapshot %s", self._snapshot_store.path, exc_info=True)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        """Start watching the snapshot."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="index-snapshot-watcher")
+
+    async def stop(self) -> None:
+        """Stop watching the snapshot."""
+        task: asyncio.Task[None] | None = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+class IndexRefreshRequests:
+    """Refreshes of sources requested by the workers to the publisher.
+
+    Workers receiving a webhook do not query upstream: each request is written atomically
+    as a JSON file in a directory shared with the publisher, which takes them when polling.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize index refresh requests."""
+        self._directory: Path = directory
+
+    @property
+    def directory(self) -> Path:
+        """Get the directory of the requests."""
+        return self._directory
+
+    def request(self, sources: list[str]) -> None:
+        """Request the refresh of sources."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        name: str = uuid.uuid4().hex
+        temporary_path: Path = self._directory / f".{name}.tmp"
+        try:
+            temporary_path.write_text(json.dumps(sources))
+            os.replace(temporary_path, self._directory / f"{name}.json")
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+    def take(self) -> list[str]:
+        """Take the sources requested since the last call, each one once."""
+        sources: dict[str, None] = {}
+        try:
+            paths: list[Path] = sorted(self._directory.glob("*.json"), key=lambda path: path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return []
+        for path in paths:
+            try:
+                requested: Any = json.loads(path.read_bytes())
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                _logger.warning("Ignoring invalid refresh request %s", path, exc_info=True)
+                path.unlink(missing_ok=True)
+                continue
+            if not isinstance(requested, list) or not all(isinstance(source, str) for source in requested):
+                _logger.warning("Ignoring invalid refresh request %s", path)
+                continue
+            sources.update(dict.fromkeys(requested))
+        return list(sources)
+
+
+class IndexRefreshRequestWatcher:
+    """Publisher side of the refresh requests, refreshing the requested sources as they arrive."""
+
+    def __init__(
+        self,
+        refresh_requests: IndexRefreshRequests,
+        on_request: Callable[[list[str]], Awaitable[Any]],
+        interval: float = 1.0,
+    ) -> None:
+        """Initialize index refresh request watcher.
+
+        Args:
+            refresh_requests: Requests written by the workers.
+            on_request: Coroutine function refreshing the requested sources.
+            interval: Number of seconds between two checks of the requests.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self._refresh_requests: IndexRefreshRequests = refresh_requests
+        self._on_request: Callable[[list[str]], Awaitable[Any]] = on_request
+        self._interval: float = interval
+        self._task: asyncio.Task[None] | None = None
+
+    async def poll(self) -> bool:
+        """Refresh the sources requested since the last poll, telling whether any was requested."""
+        sources: list[str] = await asyncio.to_thread(self._refresh_requests.take)
+        if not sources:
+            return False
+        await self._on_request(sources)
+        return True
+
+    async def run(self) -> None:
+        """Poll the requests forever."""
+        while True:
+            try:
+                await self.poll()
+            except Exception:  # pylint: disable=broad-exception-caught
+                _logger.warning(
+                    "Failed to take refresh requests from %s", self._refresh_requests.directory, exc_info=True
+                )
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        """Start watching the requests."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="index-refresh-request-watcher")
+
+    async def stop(self) -> None:
+        """Stop watching the requests."""
+        task: asyncio.Task[None] | None = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -1,14 +1,32 @@
 """Abstracts for integrations."""
 
+import re
 import uuid
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator
-from typing import NewType, TypedDict
+from collections.abc import AsyncIterator
+from typing import NewType, NotRequired, TypedDict
 
 PackageName = NewType("PackageName", str)
 PackageVersion = NewType("PackageVersion", str)
 IntegrationId = NewType("IntegrationId", uuid.UUID)
 
+_PACKAGE_NAME_SEPARATORS: re.Pattern[str] = re.compile(r"[-_.]+")
+
+
+def normalize_package_name(package_name: str) -> PackageName:
+    """Normalize a package name as defined by PEP 503."""
+    return PackageName(_PACKAGE_NAME_SEPARATORS.sub("-", package_name).lower())
+
+
+class IntegrationPackageFile(TypedDict):
+    """Integration package file."""
+
+    filename: PackageVersion
+    url: str
+    digest: str | None
+    content_type: str
+    size: int | None
+
 
 class IntegrationPackageIndex(TypedDict):
     """Integration index."""
@@ -16,6 +34,35 @@ class IntegrationPackageIndex(TypedDict):
     integration_id: IntegrationId
     package_name: PackageName
     package_version_list: list[PackageVersion]
+    package_file_list: list[IntegrationPackageFile]
+
+
+class IntegrationPackageDownload(TypedDict):
+    """Integration package download, the content is streamed in chunks."""
+
+    filename: PackageVersion
+    content: AsyncIterator[bytes]
+    content_length: int | None
+    content_type: str | None
+    # Set when the content is a part of the file, as `bytes <start>-<end>/<size>`
+    content_range: NotRequired[str | None]
+
+
+class IntegrationIndexError(TypedDict):
+    """Integration index error, marks a source missing or outdated in the index."""
+
+    integration_id: IntegrationId
+    source: str
+    message: str
+
+
+class IntegrationMetric(TypedDict):
+    """Integration metric, a gauge sampled when metrics are collected."""
+
+    name: str
+    description: str
+    labels: dict[str, str]
+    value: float
 
 
 class AbstractIntegration(ABC):
@@ -27,14 +74,103 @@ class AbstractIntegration(ABC):
         """Get integration id."""
         raise NotImplementedError("id not implemented")
 
+    async def startup(self) -> None:
+        """Acquire the resources of the integration, called once the application starts."""
+
+    async def shutdown(self) -> None:
+        """Release the resources of the integration, called once the application stops."""
+
     @abstractmethod
     async def get_index(self) -> list[IntegrationPackageIndex]:
         """Get index."""
         raise NotImplementedError("get_index not implemented")
 
+    async def get_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get the index of a single package, `None` if the integration does not expose it.
+
+        The whole index is searched by default, integrations knowing the source of a package
+        only fetch that source.
+        """
+        normalized_package_name: PackageName = normalize_package_name(package_name)
+        for package_index in await self.get_index():
+            if normalize_package_name(package_index["package_name"]) == normalized_package_name:
+                return package_index
+        return None
+
+    def get_index_errors(self) -> list[IntegrationIndexError]:
+        """Get errors of the last index population."""
+        return []
+
+    def get_metrics(self) -> list[IntegrationMetric]:
+        """Get the current metrics of the integration."""
+        return []
+
+    def get_sources(self) -> list[str]:
+        """Get the sources of the index which can be refreshed on their own, none by default."""
+        return []
+
+    def get_source_refresh_interval(self, source: str) -> float | None:  # pylint: disable=unused-argument
+        """Get the number of seconds between two background refreshes of a source, `None` for the default."""
+        return None
+
+    def get_source_indexes(self) -> dict[str, IntegrationPackageIndex]:
+        """Get the current package index of each source, as persisted in index snapshots."""
+        return {}
+
+    def get_index_age(self) -> float | None:
+        """Get the number of seconds since the stalest part of the index was fetched.
+
+        Returns:
+            `None` until the index is fully populated, or when the integration does not track it.
+        """
+        return None
+
+    def restore_source_indexes(
+        self, sources: dict[str, IntegrationPackageIndex], overwrite: bool = False, fetched_at: float | None = None
+    ) -> None:
+        """Restore the package indexes of a persisted snapshot, until the sources are refreshed.
+
+        Args:
+            sources: Package index by source, sources not owned by the integration are ignored.
+            overwrite: Whether to replace the indexes of sources already populated.
+            fetched_at: Epoch seconds at which the indexes were fetched, now if `None`.
+        """
+
+    async def refresh_source(self, source: str) -> bool:  # pylint: disable=unused-argument
+        """Refresh a single source of the index.
+
+        Args:
+            source: Source as returned by `get_sources`.
+
+        Returns:
+            Whether the source belongs to the integration and was refreshed.
+        """
+        return False
+
+    async def get_download_redirect(  # pylint: disable=unused-argument
+        self, package_name: PackageName, package_version: PackageVersion
+    ) -> str | None:
+        """Get a URL the download of a package file can be redirected to, instead of being proxied.
+
+        Args:
+            package_name: Name of the package.
+            package_version: File name of the package version.
+
+        Returns:
+            URL serving the file to any client, `None` when the file must be proxied.
+        """
+        return None
+
     @abstractmethod
     async def get_download_package(
-        self, package_name: PackageName, package_version: PackageVersion
-    ) -> AsyncGenerator[bytes, None]:
-        """Get download package."""
+        self, package_name: PackageName, package_version: PackageVersion, range_header: str | None = None
+    ) -> IntegrationPackageDownload:
+        """Get download package.
+
+        Args:
+            package_name: Name of the package.
+            package_version: File name of the package version.
+            range_header: HTTP `Range` header requesting a part of the file, integrations
+                may ignore it and return the whole file.
+        """
         raise NotImplementedError("get_download_package not implemented")
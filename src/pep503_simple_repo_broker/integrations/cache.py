@@ -0,0 +1,332 @@
+"""Index cache for integrations."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Generic, TypedDict, TypeVar
+
+from .abstracts import (
+    AbstractIntegration,
+    IntegrationId,
+    IntegrationIndexError,
+    IntegrationMetric,
+    IntegrationPackageDownload,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+    normalize_package_name,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CacheStatistics(TypedDict):
+    """Cache statistics."""
+
+    hits: int
+    stale_hits: int
+    misses: int
+    refreshes: int
+    refresh_errors: int
+
+
+class StaleWhileRevalidateCache(Generic[T]):
+    """Single value cache with TTL, stale-while-revalidate and single-flight loading.
+
+    A value younger than `ttl` is served as is. A value older than `ttl` but younger
+    than `ttl + max_stale` is served immediately while a refresh runs in the background.
+    Older values (or no value at all) make the caller wait for the refresh. Concurrent
+    callers always share the same in-flight refresh.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[T]],
+        ttl: float,
+        max_stale: float | None = None,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            loader: Coroutine function producing a fresh value.
+            ttl: Number of seconds a value is considered fresh.
+            max_stale: Number of seconds after `ttl` a stale value can still be served,
+                `None` means a stale value is always served while refreshing.
+        """
+        if ttl < 0:
+            raise ValueError("ttl must be positive")
+        if max_stale is not None and max_stale < 0:
+            raise ValueError("max_stale must be positive")
+        self._loader: Callable[[], Awaitable[T]] = loader
+        self._ttl: float = ttl
+        self._max_stale: float | None = max_stale
+        self._value: T | None = None
+        self._loaded_at: float | None = None
+        self._inflight: asyncio.Task[T] | None = None
+        self._statistics: CacheStatistics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """Get a copy of the cache statistics."""
+        return self._statistics.copy()
+
+    @property
+    def age(self) -> float | None:
+        """Get the age of the cached value in seconds, `None` if nothing is cached."""
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    @property
+    def value(self) -> T | None:
+        """Get the cached value, fresh or not, `None` if nothing is cached."""
+        return self._value
+
+    def seed(self, value: T, age: float) -> None:
+        """Store a value loaded elsewhere `age` seconds ago."""
+        self._value = value
+        self._loaded_at = time.monotonic() - age
+
+    def set_stale(self, value: T) -> None:
+        """Store a value already expired, served while the first refresh runs."""
+        self._value = value
+        self._loaded_at = time.monotonic() - self._ttl
+
+    def invalidate(self) -> None:
+        """Drop the cached value, the next `get` will wait for a refresh."""
+        self._value = None
+        self._loaded_at = None
+
+    async def _load(self) -> T:
+        """Load a fresh value and store it."""
+        self._statistics["refreshes"] += 1
+        try:
+            value: T = await self._loader()
+        except Exception:
+            self._statistics["refresh_errors"] += 1
+            raise
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
+
+    def _on_refresh_done(self, task: "asyncio.Task[T]") -> None:
+        """Release the in-flight task and log background failures."""
+        if self._inflight is task:
+            self._inflight = None
+        if not task.cancelled() and task.exception() is not None:
+            _logger.warning("Cache refresh failed", exc_info=task.exception())
+
+    def _start_refresh(self) -> "asyncio.Task[T]":
+        """Start a refresh unless one is already in flight."""
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._load())
+            self._inflight.add_done_callback(self._on_refresh_done)
+        return self._inflight
+
+    async def refresh(self) -> T:
+        """Refresh the value, joining the in-flight refresh if any."""
+        # Shield the shared task so a cancelled caller does not cancel other waiters.
+        return await asyncio.shield(self._start_refresh())
+
+    async def get(self) -> T:
+        """Get the cached value, loading or revalidating it when needed."""
+        age: float | None = self.age
+        if self._value is not None and age is not None:
+            if age < self._ttl:
+                self._statistics["hits"] += 1
+                return self._value
+            if self._max_stale is None or age < self._ttl + self._max_stale:
+                self._statistics["stale_hits"] += 1
+                self._start_refresh()
+                return self._value
+        self._statistics["misses"] += 1
+        return await self.refresh()
+
+
+class CachedIntegration(AbstractIntegration):
+    """Integration decorator caching the index of another integration.
+
+    Packages fetched on their own are cached separately, each one with its own freshness.
+    """
+
+    def __init__(
+        self,
+        integration: AbstractIntegration,
+        ttl: float,
+        max_stale: float | None = None,
+    ) -> None:
+        """Initialize cached integration.
+
+        Args:
+            integration: Integration to cache the index of.
+            ttl: Number of seconds the index is considered fresh.
+            max_stale: Number of seconds after `ttl` a stale index can still be served.
+        """
+        self._integration: AbstractIntegration = integration
+        self._cache: StaleWhileRevalidateCache[list[IntegrationPackageIndex]] = StaleWhileRevalidateCache(
+            loader=integration.get_index, ttl=ttl, max_stale=max_stale
+        )
+        self._ttl: float = ttl
+        self._max_stale: float | None = max_stale
+        # Caches of the packages fetched on their own, by normalized name
+        self._package_caches: dict[PackageName, StaleWhileRevalidateCache[IntegrationPackageIndex | None]] = {}
+        # Packages of the cached index by normalized name, rebuilt when the cached index changes
+        self._indexed: list[IntegrationPackageIndex] | None = None
+        self._indexed_packages: dict[PackageName, IntegrationPackageIndex] = {}
+
+    @property
+    def id(self) -> IntegrationId:
+        """Get integration id."""
+        return self._integration.id
+
+    @property
+    def integration(self) -> AbstractIntegration:
+        """Get the cached integration."""
+        return self._integration
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """Get index cache statistics."""
+        return self._cache.statistics
+
+    async def startup(self) -> None:
+        """Start the cached integration."""
+        await self._integration.startup()
+
+    async def shutdown(self) -> None:
+        """Stop the cached integration."""
+        await self._integration.shutdown()
+
+    async def get_index(self) -> list[IntegrationPackageIndex]:
+        """Get index."""
+        return await self._cache.get()
+
+    async def get_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get the index of a single package, cached on its own.
+
+        An integration without its own package lookup is searched through the cached index.
+        """
+        if type(self._integration).get_package is AbstractIntegration.get_package:
+            return await super().get_package(package_name)
+        normalized_package_name: PackageName = normalize_package_name(package_name)
+        cache: StaleWhileRevalidateCache[IntegrationPackageIndex | None] | None = self._package_caches.get(
+            normalized_package_name
+        )
+        if cache is None:
+            cache = StaleWhileRevalidateCache(
+                loader=partial(self._integration.get_package, normalized_package_name),
+                ttl=self._ttl,
+                max_stale=self._max_stale,
+            )
+            index_age: float | None = self._cache.age
+            if index_age is not None and index_age < self._ttl:
+                # The whole index was fetched recently, the package is as fresh as the index
+                indexed_package: IntegrationPackageIndex | None = self.get_indexed_package(normalized_package_name)
+                if indexed_package is not None:
+                    cache.seed(indexed_package, index_age)
+            self._package_caches[normalized_package_name] = cache
+        package_index: IntegrationPackageIndex | None = await cache.get()
+        if package_index is None:
+            # Unknown packages are asked again, they must not grow the caches
+            self._package_caches.pop(normalized_package_name, None)
+        return package_index
+
+    def get_indexed_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get a package of the cached index, fresh or not."""
+        index: list[IntegrationPackageIndex] | None = self._cache.value
+        if index is None:
+            return None
+        if index is not self._indexed:
+            self._indexed_packages = {}
+            for package_index in index:
+                self._indexed_packages.setdefault(normalize_package_name(package_index["package_name"]), package_index)
+            self._indexed = index
+        return self._indexed_packages.get(normalize_package_name(package_name))
+
+    def get_index_errors(self) -> list[IntegrationIndexError]:
+        """Get errors of the last index population."""
+        return self._integration.get_index_errors()
+
+    def get_metrics(self) -> list[IntegrationMetric]:
+        """Get the current metrics of the cached integration."""
+        return self._integration.get_metrics()
+
+    def get_sources(self) -> list[str]:
+        """Get the sources of the index which can be refreshed on their own."""
+        return self._integration.get_sources()
+
+    def get_source_refresh_interval(self, source: str) -> float | None:
+        """Get the number of seconds between two background refreshes of a source."""
+        return self._integration.get_source_refresh_interval(source)
+
+    def get_source_indexes(self) -> dict[str, IntegrationPackageIndex]:
+        """Get the current package index of each source."""
+        return self._integration.get_source_indexes()
+
+    def get_index_age(self) -> float | None:
+        """Get the age of the index, the age of the cached index when the integration does not track it."""
+        age: float | None = self._integration.get_index_age()
+        return age if age is not None else self._cache.age
+
+    def restore_source_indexes(
+        self, sources: dict[str, IntegrationPackageIndex], overwrite: bool = False, fetched_at: float | None = None
+    ) -> None:
+        """Restore the package indexes of a persisted snapshot, cached as stale."""
+        self._integration.restore_source_indexes(sources, overwrite, fetched_at)
+        restored: dict[str, IntegrationPackageIndex] = self._integration.get_source_indexes()
+        if restored:
+            self._cache.set_stale(list(restored.values()))
+
+    async def refresh_source(self, source: str) -> bool:
+        """Refresh a single source of the index, updating the cached index without fetching it again.
+
+        The cached index is rebuilt from the package index of each source, keeping its age, and
+        only the packages of the changed sources are dropped. An integration not tracking its
+        sources serves its cached index as stale while the whole index is fetched again.
+        """
+        previous: dict[str, IntegrationPackageIndex] = self._integration.get_source_indexes()
+        refreshed: bool = await self._integration.refresh_source(source)
+        if not refreshed:
+            return refreshed
+        sources: dict[str, IntegrationPackageIndex] = self._integration.get_source_indexes()
+        if not sources:
+            cached_index: list[IntegrationPackageIndex] | None = self._cache.value
+            if cached_index is not None:
+                self._cache.set_stale(cached_index)
+            self._package_caches = {}
+            return refreshed
+        changed: list[IntegrationPackageIndex] = [
+            package_index
+            for name, package_index in [*previous.items(), *sources.items()]
+            if previous.get(name) is not sources.get(name)
+        ]
+        if not changed:
+            return refreshed
+        age: float | None = self._cache.age
+        if age is None:
+            self._cache.set_stale(list(sources.values()))
+        else:
+            self._cache.seed(list(sources.values()), age)
+        for package_index in changed:
+            self._package_caches.pop(normalize_package_name(package_index["package_name"]), None)
+        return refreshed
+
+    async def get_download_redirect(self, package_name: PackageName, package_version: PackageVersion) -> str | None:
+        """Get the download redirect of the integration."""
+        return await self._integration.get_download_redirect(package_name, package_version)
+
+    async def get_download_package(
+        self, package_name: PackageName, package_version: PackageVersion, range_header: str | None = None
+    ) -> IntegrationPackageDownload:
+        """Get download package."""
+        return await self._integration.get_download_package(package_name, package_version, range_header)
@@ -0,0 +1,157 @@
+"""Github integration configuration."""
+
+import logging
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from ..abstracts import PackageName
+from .types import (
+    GithubNamespace,
+    GithubOrganizationReference,
+    GithubRepositoryName,
+    GithubRepositoryReference,
+    GithubRepositorySlug,
+    get_github_repository_slug,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+class GithubRepositorySettings(BaseModel):
+    """Github repository settings."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    namespace: str = Field(min_length=1, description="Owner of the repository.")
+    name: str = Field(min_length=1, description="Name of the repository.")
+    package_name: str | None = Field(default=None, description="Package name, the repository name if not set.")
+    asset_pattern: str | None = Field(default=None, description="Glob the release asset names must match.")
+    refresh_interval: float | None = Field(
+        default=None, gt=0, description="Seconds between two background refreshes, the default interval if not set."
+    )
+
+    def to_reference(self) -> GithubRepositoryReference:
+        """Get the repository reference."""
+        return {
+            "namespace": GithubNamespace(self.namespace),
+            "name": GithubRepositoryName(self.name),
+            "package_name": PackageName(self.package_name) if self.package_name is not None else None,
+            "asset_pattern": self.asset_pattern,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+class GithubOrganizationSettings(BaseModel):
+    """Github organization settings."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    namespace: str = Field(min_length=1, description="Organization, or user, whose repositories are discovered.")
+    asset_pattern: str | None = Field(default=None, description="Glob the release asset names must match.")
+    refresh_interval: float | None = Field(
+        default=None, gt=0, description="Seconds between two background refreshes, the default interval if not set."
+    )
+
+    def to_reference(self) -> GithubOrganizationReference:
+        """Get the organization reference."""
+        return {
+            "namespace": GithubNamespace(self.namespace),
+            "asset_pattern": self.asset_pattern,
+            "refresh_interval": self.refresh_interval,
+        }
+
+
+def get_entry_slug(entry: Any) -> GithubRepositorySlug | None:
+    """Get the slug of a repository entry, even an invalid one, `None` if it cannot be told."""
+    if not isinstance(entry, dict):
+        return None
+    namespace: Any = entry.get("namespace")
+    name: Any = entry.get("name")
+    if not isinstance(namespace, str) or not isinstance(name, str) or namespace == "" or name == "":
+        return None
+    return get_github_repository_slug(GithubNamespace(namespace), GithubRepositoryName(name))
+
+
+def parse_github_repositories(
+    entries: list[Any],
+    defaults: dict[str, Any] | None = None,
+    previous: dict[GithubRepositorySlug, GithubRepositoryReference] | None = None,
+) -> list[GithubRepositoryReference]:
+    """Validate the configured repositories one by one.
+
+    An invalid entry is logged and keeps the settings it had before, if any, so a
+    mistake in one repository leaves the others and itself serving.
+
+    Args:
+        entries: Repository entries of the configuration.
+        defaults: Settings applied to every entry not setting them.
+        previous: Repositories by slug, as configured before.
+    """
+    repositories: dict[GithubRepositorySlug, GithubRepositoryReference] = {}
+    for position, entry in enumerate(entries):
+        slug: GithubRepositorySlug | None = get_entry_slug(entry)
+        if slug is not None and slug in repositories:
+            _logger.warning("Ignoring repository %s configured twice", slug)
+            continue
+        try:
+            settings: GithubRepositorySettings = GithubRepositorySettings.model_validate(
+                {**(defaults or {}), **entry} if isinstance(entry, dict) else entry
+            )
+        except ValidationError as exception:
+            kept: GithubRepositoryReference | None = (previous or {}).get(slug) if slug is not None else None
+            _logger.warning(
+                "Invalid repository %s%s: %s",
+                slug or f"#{position}",
+                ", keeping its previous settings" if kept is not None else "",
+                exception,
+            )
+            if slug is not None and kept is not None:
+                repositories[slug] = kept
+            continue
+        reference: GithubRepositoryReference = settings.to_reference()
+        repositories[get_github_repository_slug(reference["namespace"], reference["name"])] = reference
+    return list(repositories.values())
+
+
+def parse_github_organizations(
+    entries: list[Any],
+    defaults: dict[str, Any] | None = None,
+    previous: dict[GithubNamespace, GithubOrganizationReference] | None = None,
+) -> list[GithubOrganizationReference]:
+    """Validate the configured organizations one by one, see `parse_github_repositories`.
+
+    Args:
+        entries: Organization entries of the configuration.
+        defaults: Settings applied to every entry not setting them, those unknown to organizations are skipped.
+        previous: Organizations by namespace, as configured before.
+    """
+    organization_fields: set[str] = set(GithubOrganizationSettings.model_fields)
+    organization_defaults: dict[str, Any] = {
+        key: value for key, value in (defaults or {}).items() if key in organization_fields
+    }
+    organizations: dict[GithubNamespace, GithubOrganizationReference] = {}
+    for position, entry in enumerate(entries):
+        namespace: Any = entry.get("namespace") if isinstance(entry, dict) else None
+        known: GithubNamespace | None = GithubNamespace(namespace) if isinstance(namespace, str) and namespace else None
+        if known is not None and known in organizations:
+            _logger.warning("Ignoring organization %s configured twice", known)
+            continue
+        try:
+            settings: GithubOrganizationSettings = GithubOrganizationSettings.model_validate(
+                {**organization_defaults, **entry} if isinstance(entry, dict) else entry
+            )
+        except ValidationError as exception:
+            kept: GithubOrganizationReference | None = (previous or {}).get(known) if known is not None else None
+            _logger.warning(
+                "Invalid organization %s%s: %s",
+                known or f"#{position}",
+                ", keeping its previous settings" if kept is not None else "",
+                exception,
+            )
+            if known is not None and kept is not None:
+                organizations[known] = kept
+            continue
+        reference: GithubOrganizationReference = settings.to_reference()
+        organizations[reference["namespace"]] = reference
+    return list(organizations.values())
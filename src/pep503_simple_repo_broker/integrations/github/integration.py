@@ -1,35 +1,117 @@
 """Github integration."""
 
+import asyncio
+import logging
 import os
+import time
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 from fastapi import HTTPException
 
+from ...concurrency import gather_with_concurrency
+from ...index_store import StoredPackageIndex, is_stored_package_index, to_package_index, to_stored_package_index
+from ...metrics import INDEX_REFRESH_DURATION
+from ...shared_cache import SharedCache
 from ..abstracts import (
     AbstractIntegration,
     IntegrationId,
+    IntegrationIndexError,
+    IntegrationMetric,
+    IntegrationPackageDownload,
+    IntegrationPackageFile,
     IntegrationPackageIndex,
     PackageName,
     PackageVersion,
+    normalize_package_name,
 )
+from ..lookup import PackageIndexLookup
+from .organization import GithubOrganization
+from .rate_limit import GithubRateLimitGovernor, GithubRateLimitSettings
 from .repository import GithubRepository
+from .session import GithubSessionPool, GithubSessionSettings
 from .types import (
+    GithubDownloadMode,
+    GithubNamespace,
+    GithubOrganizationReference,
+    GithubRepositoryName,
     GithubRepositoryReference,
     GithubRepositorySlug,
     GithubToken,
+    get_github_organization_source,
     get_github_repository_slug,
 )
 
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+def is_same_repository_index(index: IntegrationPackageIndex, previous_index: IntegrationPackageIndex | None) -> bool:
+    """Check if a refreshed repository index exposes the same package and files as the previous one.
+
+    Unchanged release pages share their package files with the previous index, so the
+    comparison of an unchanged repository mostly compares identities.
+    """
+    return previous_index is not None and (
+        index is previous_index
+        or (
+            index["package_name"] == previous_index["package_name"]
+            and index["package_file_list"] == previous_index["package_file_list"]
+        )
+    )
+
 
 class GithubIntegration(AbstractIntegration):
     """Github integration."""
 
-    def __init__(
+    # Seconds a replica holds the lock of a source, longer than the fetch of the largest source
+    SHARED_LOCK_TTL: float = 300.0
+    # Seconds a request waits for the lock of a source held by another replica before fetching it itself
+    SHARED_LOCK_TIMEOUT: float = 10.0
+    # Seconds the indexes of a source are kept in the shared cache
+    SHARED_INDEX_TTL: float = 86400.0
+
+    def __init__(  # noqa: PLR0913
         self,
         repositories: list[GithubRepositoryReference] | None = None,
+        max_concurrency: int = 8,
+        session_settings: GithubSessionSettings | None = None,
+        parallel_release_pages: bool = False,
+        *,
+        background_refresh: bool = False,
+        rate_limit_settings: GithubRateLimitSettings | None = None,
+        organizations: list[GithubOrganizationReference] | None = None,
+        download_mode: GithubDownloadMode = GithubDownloadMode.PROXY,
+        shared_cache: SharedCache | None = None,
+        shared_index_max_age: float = 0.0,
     ) -> None:
-        """Initialize Github integration."""
+        """Initialize Github integration.
+
+        Args:
+            repositories: Repositories to expose.
+            max_concurrency: Maximum number of repositories fetched at the same time.
+            session_settings: Settings of the HTTP session shared by all repositories.
+            parallel_release_pages: Whether to fetch the release pages of a repository concurrently.
+            background_refresh: Whether repositories are refreshed in background by `refresh_source`,
+                `get_index` then serves the current indexes without fetching them.
+            rate_limit_settings: Settings of the rate limit governor shared by all repositories.
+            organizations: Namespaces whose repositories publishing distributions are discovered,
+                a repository also configured in `repositories` uses its own settings.
+            download_mode: Whether package files are streamed through the broker or clients
+                are redirected to their signed URL.
+            shared_cache: Cache shared with the other replicas, holding the indexes, release pages
+                and asset URLs, and locking each source so only one replica fetches it at a time.
+            shared_index_max_age: Number of seconds before a refresh is requested the indexes fetched
+                by another replica are still reused, only the indexes fetched while waiting for the
+                lock are reused by default so a webhook never gets an index older than its release.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self._max_concurrency: int = max_concurrency
+        self._background_refresh: bool = background_refresh
+        self._download_mode: GithubDownloadMode = download_mode
+        self._shared_cache: SharedCache | None = shared_cache
+        self._shared_index_max_age: float = shared_index_max_age
         self._integration_id: IntegrationId = IntegrationId(uuid.uuid4())
         # Github token
         github_token: str | None = os.getenv("GITHUB_TOKEN", None)
@@ -37,9 +119,29 @@ class GithubIntegration(AbstractIntegration):
             raise ValueError("GITHUB_TOKEN is not set")
         self._github_token: GithubToken = GithubToken(github_token)
 
+        # HTTP session shared by all repositories
+        self._session_pool: GithubSessionPool = GithubSessionPool(session_settings)
+        # Rate limit budget of the token, shared by all repositories
+        self._rate_limit_governor: GithubRateLimitGovernor = GithubRateLimitGovernor(rate_limit_settings)
+        # The GraphQL API has its own budget, spent by the discovery of organizations
+        self._graphql_rate_limit_governor: GithubRateLimitGovernor = GithubRateLimitGovernor(rate_limit_settings)
+
         # Repositories
         self._repositories: dict[GithubRepositorySlug, GithubRepository] = {}
         self._indexes_by_slug: dict[GithubRepositorySlug, IntegrationPackageIndex] = {}
+        self._errors_by_slug: dict[GithubRepositorySlug, str] = {}
+        self._refreshes: dict[GithubRepositorySlug, asyncio.Task[None]] = {}
+        # Epoch seconds at which the index of each repository was fetched
+        self._refreshed_at_by_slug: dict[GithubRepositorySlug, float] = {}
+        # Index and package slugs rebuilt after each population and swapped atomically, the index
+        # is only rebuilt on its next use when a single repository changed
+        self._index: list[IntegrationPackageIndex] = []
+        self._index_outdated: bool = False
+        self._slugs_by_package: dict[PackageName, GithubRepositorySlug] = {}
+        # Lookup of each repository, built from its own index
+        self._lookups_by_slug: dict[GithubRepositorySlug, PackageIndexLookup] = {}
+        self._parallel_release_pages: bool = parallel_release_pages
+        self._references: dict[GithubRepositorySlug, GithubRepositoryReference] = {}
         if repositories is not None:
             for repository in repositories:
                 slug: GithubRepositorySlug = get_github_repository_slug(
@@ -47,48 +149,676 @@ class GithubIntegration(AbstractIntegration):
                 )
                 if slug in self._repositories:
                     raise ValueError(f"Repository {slug} already exists")
-                self._repositories[slug] = GithubRepository(
-                    self._github_token, repository, self._integration_id
-                )
+                self.add_repository(slug, repository)
+
+        # Organizations, refreshed as a whole by their `{namespace}/*` source
+        self._organizations: dict[GithubNamespace, GithubOrganization] = {}
+        self._organization_references: dict[GithubNamespace, GithubOrganizationReference] = {}
+        # Slugs of the repositories discovered in each organization
+        self._discovered_slugs: dict[GithubNamespace, set[GithubRepositorySlug]] = {}
+        # Repositories downloaded from, created on the first download of a discovered repository
+        self._discovered_repositories: dict[GithubRepositorySlug, GithubRepository] = {}
+        if organizations is not None:
+            for organization in organizations:
+                if organization["namespace"] in self._organizations:
+                    raise ValueError(f"Organization {organization['namespace']} already exists")
+                self.add_organization(organization)
 
     @property
     def id(self) -> IntegrationId:
         """Get integration id."""
         return self._integration_id
 
+    @property
+    def repositories(self) -> dict[GithubRepositorySlug, GithubRepositoryReference]:
+        """Get a copy of the repositories by slug."""
+        return dict(self._references)
+
+    @property
+    def organizations(self) -> dict[GithubNamespace, GithubOrganizationReference]:
+        """Get a copy of the organizations by namespace."""
+        return dict(self._organization_references)
+
+    @property
+    def rate_limit_governor(self) -> GithubRateLimitGovernor:
+        """Get the rate limit governor."""
+        return self._rate_limit_governor
+
+    def add_repository(self, slug: GithubRepositorySlug, repository: GithubRepositoryReference) -> None:
+        """Add a repository, replacing the one with the same slug but keeping its index until refreshed."""
+        self._references[slug] = repository
+        self._repositories[slug] = GithubRepository(
+            self._github_token,
+            repository,
+            self._integration_id,
+            self._session_pool,
+            parallel_pages=self._parallel_release_pages,
+            rate_limit_governor=self._rate_limit_governor,
+            shared_cache=self._shared_cache,
+        )
+
+    def remove_repository(self, slug: GithubRepositorySlug) -> None:
+        """Remove a repository and its index."""
+        self._references.pop(slug, None)
+        self._repositories.pop(slug, None)
+        self._indexes_by_slug.pop(slug, None)
+        self._errors_by_slug.pop(slug, None)
+        self._refreshed_at_by_slug.pop(slug, None)
+        task: asyncio.Task[None] | None = self._refreshes.pop(slug, None)
+        if task is not None:
+            task.cancel()
+
+    def update_repositories(self, repositories: list[GithubRepositoryReference]) -> list[GithubRepositorySlug]:
+        """Replace the repositories, leaving the unchanged ones and their index untouched.
+
+        Returns:
+            Slugs of the repositories added or changed, whose index must be refreshed.
+        """
+        references: dict[GithubRepositorySlug, GithubRepositoryReference] = {
+            get_github_repository_slug(repository["namespace"], repository["name"]): repository
+            for repository in repositories
+        }
+        removed: list[GithubRepositorySlug] = [slug for slug in self._references if slug not in references]
+        for slug in removed:
+            self.remove_repository(slug)
+        updated: list[GithubRepositorySlug] = [
+            slug for slug, repository in references.items() if self._references.get(slug) != repository
+        ]
+        for slug in updated:
+            self.add_repository(slug, references[slug])
+        if removed:
+            self.build_lookup()
+        return updated
+
+    def add_organization(self, organization: GithubOrganizationReference) -> None:
+        """Add an organization, replacing the one with the same namespace but keeping its indexes until refreshed."""
+        namespace: GithubNamespace = organization["namespace"]
+        self._organization_references[namespace] = organization
+        self._organizations[namespace] = GithubOrganization(
+            self._github_token,
+            organization,
+            self._integration_id,
+            self._session_pool,
+            rate_limit_governor=self._graphql_rate_limit_governor,
+        )
+        self._discovered_slugs.setdefault(namespace, set())
+
+    def remove_organization(self, namespace: GithubNamespace) -> None:
+        """Remove an organization and the indexes of its discovered repositories."""
+        source: GithubRepositorySlug = get_github_organization_source(namespace)
+        self._organization_references.pop(namespace, None)
+        self._organizations.pop(namespace, None)
+        for slug in self._discovered_slugs.pop(namespace, set()):
+            self._indexes_by_slug.pop(slug, None)
+            self._discovered_repositories.pop(slug, None)
+        self._errors_by_slug.pop(source, None)
+        self._refreshed_at_by_slug.pop(source, None)
+        task: asyncio.Task[None] | None = self._refreshes.pop(source, None)
+        if task is not None:
+            task.cancel()
+
+    def update_organizations(self, organizations: list[GithubOrganizationReference]) -> list[GithubRepositorySlug]:
+        """Replace the organizations, leaving the unchanged ones and their indexes untouched.
+
+        Returns:
+            Sources of the organizations added or changed, whose indexes must be refreshed.
+        """
+        references: dict[GithubNamespace, GithubOrganizationReference] = {
+            organization["namespace"]: organization for organization in organizations
+        }
+        removed: list[GithubNamespace] = [
+            namespace for namespace in self._organization_references if namespace not in references
+        ]
+        for namespace in removed:
+            self.remove_organization(namespace)
+        updated: list[GithubNamespace] = [
+            namespace
+            for namespace, organization in references.items()
+            if self._organization_references.get(namespace) != organization
+        ]
+        for namespace in updated:
+            self.add_organization(references[namespace])
+        if removed:
+            self.build_lookup()
+        return [get_github_organization_source(namespace) for namespace in updated]
+
+    def get_organization_namespace(self, slug: GithubRepositorySlug) -> GithubNamespace | None:
+        """Get the organization a repository slug belongs to, whatever its case, `None` if none."""
+        namespace: str = slug.split("/", 1)[0].lower()
+        return next((known for known in self._organizations if known.lower() == namespace), None)
+
+    def is_configured_repository(self, slug: GithubRepositorySlug) -> bool:
+        """Tell whether a repository is explicitly configured, whatever the case of its slug."""
+        return slug.lower() in {configured.lower() for configured in self._repositories}
+
+    async def startup(self) -> None:
+        """Open the shared HTTP session."""
+        _ = self._session_pool.session
+
+    async def shutdown(self) -> None:
+        """Cancel the in-flight refreshes and close the shared HTTP session."""
+        refreshes: list[asyncio.Task[None]] = list(self._refreshes.values())
+        for task in refreshes:
+            task.cancel()
+        await asyncio.gather(*refreshes, return_exceptions=True)
+        await self._session_pool.close()
+
     async def populate_indexes(self) -> None:
-        """Populate indexes."""
-        for slug, repository in self._repositories.items():
-            self._indexes_by_slug[slug] = await repository.get_index()
+        """Populate indexes.
+
+        Repositories and organizations are fetched concurrently. A source failing to be
+        fetched keeps its previous indexes, if any, and is reported by `get_index_errors`.
+        """
+        slugs: list[GithubRepositorySlug] = list(self._repositories.keys())
+        namespaces: list[GithubNamespace] = list(self._organizations.keys())
+        results: list[IntegrationPackageIndex | BaseException] = await gather_with_concurrency(
+            [self.fetch_repository_index(slug) for slug in slugs],
+            max_concurrency=self._max_concurrency,
+        )
+        organization_results: list[dict[GithubRepositorySlug, IntegrationPackageIndex] | BaseException] = (
+            await gather_with_concurrency(
+                [self.fetch_organization_indexes(namespace) for namespace in namespaces],
+                max_concurrency=self._max_concurrency,
+            )
+        )
+        # Rebuilt only when an index changed, so the registry keeps its lookup
+        changed: bool = False
+        for namespace, organization_result in zip(namespaces, organization_results, strict=True):
+            if namespace not in self._organizations:
+                # Removed while being fetched
+                continue
+            source: GithubRepositorySlug = get_github_organization_source(namespace)
+            if isinstance(organization_result, Exception):
+                _logger.warning("Failed to discover repositories of %s", namespace, exc_info=organization_result)
+                self._errors_by_slug[source] = str(organization_result) or organization_result.__class__.__name__
+            elif isinstance(organization_result, BaseException):
+                raise organization_result
+            else:
+                changed = self.apply_organization_indexes(namespace, organization_result) or changed
+                self._errors_by_slug.pop(source, None)
+        for slug, result in zip(slugs, results, strict=True):
+            if slug not in self._repositories:
+                # Removed while being fetched
+                continue
+            if isinstance(result, Exception):
+                _logger.warning("Failed to populate index of repository %s", slug, exc_info=result)
+                self._errors_by_slug[slug] = str(result) or result.__class__.__name__
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                changed = self.set_repository_index(slug, result) or changed
+                self._errors_by_slug.pop(slug, None)
+        if changed:
+            self.build_lookup()
+
+    async def fetch_shared_indexes(
+        self,
+        source: GithubRepositorySlug,
+        fetch: Callable[[], Awaitable[dict[GithubRepositorySlug, IntegrationPackageIndex]]],
+    ) -> tuple[dict[GithubRepositorySlug, IntegrationPackageIndex], float]:
+        """Fetch the indexes of a source once for all the replicas sharing the cache.
+
+        The replica holding the lock of the source fetches it and publishes its indexes,
+        the others wait for the lock then reuse the indexes published meanwhile. Release
+        pages are shared as well, so a replica fetching the source again mostly gets
+        304 Not Modified answers, which do not count against the rate limit. Without
+        background refresh a request is waiting, so the lock is only awaited for
+        `SHARED_LOCK_TIMEOUT` seconds before fetching the source without it.
+
+        Returns:
+            Indexes by repository slug and the epoch seconds at which they were fetched.
+        """
+        if self._shared_cache is None:
+            return await fetch(), time.time()
+        key: str = f"github:indexes:{source}"
+        requested_at: float = time.time()
+        timeout: float | None = None if self._background_refresh else self.SHARED_LOCK_TIMEOUT
+        async with self._shared_cache.lock(f"github:refresh:{source}", ttl=self.SHARED_LOCK_TTL, timeout=timeout):
+            shared_value: Any = await self._shared_cache.get_json(key)
+            if (
+                isinstance(shared_value, dict)
+                and isinstance(shared_value.get("fetched_at"), float)
+                and shared_value["fetched_at"] >= requested_at - self._shared_index_max_age
+                and isinstance(shared_value.get("indexes"), dict)
+                and all(is_stored_package_index(stored) for stored in shared_value["indexes"].values())
+            ):
+                return {
+                    GithubRepositorySlug(slug): to_package_index(self._integration_id, stored)
+                    for slug, stored in shared_value["indexes"].items()
+                }, shared_value["fetched_at"]
+            indexes: dict[GithubRepositorySlug, IntegrationPackageIndex] = await fetch()
+            fetched_at: float = time.time()
+            stored_indexes: dict[str, StoredPackageIndex] = {
+                slug: to_stored_package_index(index) for slug, index in indexes.items()
+            }
+            await self._shared_cache.set_json(
+                key, {"fetched_at": fetched_at, "indexes": stored_indexes}, self.SHARED_INDEX_TTL
+            )
+        return indexes, fetched_at
+
+    async def fetch_repository_index(self, slug: GithubRepositorySlug) -> IntegrationPackageIndex:
+        """Fetch the index of a repository, observing the duration of the fetch."""
+        repository: GithubRepository = self._repositories[slug]
+
+        async def _fetch() -> dict[GithubRepositorySlug, IntegrationPackageIndex]:
+            return {slug: await repository.get_index()}
+
+        started_at: float = time.perf_counter()
+        try:
+            indexes, fetched_at = await self.fetch_shared_indexes(slug, _fetch)
+        except Exception:
+            INDEX_REFRESH_DURATION.labels(slug, "error").observe(time.perf_counter() - started_at)
+            raise
+        INDEX_REFRESH_DURATION.labels(slug, "success").observe(time.perf_counter() - started_at)
+        if slug in self._repositories:
+            self._refreshed_at_by_slug[slug] = fetched_at
+        return indexes[slug]
+
+    async def fetch_organization_indexes(
+        self, namespace: GithubNamespace
+    ) -> dict[GithubRepositorySlug, IntegrationPackageIndex]:
+        """Fetch the indexes of the repositories of an organization, observing the duration of the fetch."""
+        source: GithubRepositorySlug = get_github_organization_source(namespace)
+        started_at: float = time.perf_counter()
+        try:
+            indexes, fetched_at = await self.fetch_shared_indexes(source, self._organizations[namespace].get_indexes)
+        except Exception:
+            INDEX_REFRESH_DURATION.labels(source, "error").observe(time.perf_counter() - started_at)
+            raise
+        INDEX_REFRESH_DURATION.labels(source, "success").observe(time.perf_counter() - started_at)
+        if namespace in self._organizations:
+            self._refreshed_at_by_slug[source] = fetched_at
+        return indexes
+
+    def set_repository_index(self, slug: GithubRepositorySlug, index: IntegrationPackageIndex) -> bool:
+        """Set the index of a repository, keeping the previous one when unchanged.
+
+        Returns:
+            Whether the index changed, and the lookups must be rebuilt.
+        """
+        if is_same_repository_index(index, self._indexes_by_slug.get(slug)):
+            return False
+        self._indexes_by_slug[slug] = index
+        return True
+
+    def apply_organization_indexes(
+        self, namespace: GithubNamespace, indexes: dict[GithubRepositorySlug, IntegrationPackageIndex]
+    ) -> bool:
+        """Replace the indexes of the repositories discovered in an organization, configured repositories win.
+
+        Returns:
+            Whether any index changed, and the lookups must be rebuilt.
+        """
+        discovered: set[GithubRepositorySlug] = {slug for slug in indexes if not self.is_configured_repository(slug)}
+        removed: set[GithubRepositorySlug] = self._discovered_slugs.get(namespace, set()) - discovered
+        changed: bool = False
+        for slug in removed:
+            changed = self._indexes_by_slug.pop(slug, None) is not None or changed
+            self._discovered_repositories.pop(slug, None)
+        for slug in discovered:
+            changed = self.set_repository_index(slug, indexes[slug]) or changed
+        self._discovered_slugs[namespace] = discovered
+        return changed
+
+    async def _refresh_organization(self, namespace: GithubNamespace) -> None:
+        """Discover the repositories of an organization and rebuild the lookups."""
+        source: GithubRepositorySlug = get_github_organization_source(namespace)
+        try:
+            indexes: dict[GithubRepositorySlug, IntegrationPackageIndex] = await self.fetch_organization_indexes(
+                namespace
+            )
+        except Exception as exception:
+            if namespace in self._organizations:
+                self._errors_by_slug[source] = str(exception) or exception.__class__.__name__
+            raise
+        if namespace not in self._organizations:
+            # Removed while being fetched
+            return
+        self._errors_by_slug.pop(source, None)
+        if self.apply_organization_indexes(namespace, indexes):
+            self.build_lookup()
+
+    async def _refresh_discovered_repository(self, namespace: GithubNamespace, name: GithubRepositoryName) -> None:
+        """Fetch the index of a single repository of an organization and rebuild the lookups."""
+        slug: GithubRepositorySlug = get_github_repository_slug(namespace, name)
+        index: IntegrationPackageIndex | None = await self._organizations[namespace].get_repository_index(name)
+        if namespace not in self._organizations or self.is_configured_repository(slug):
+            # Removed, or configured, while being fetched
+            return
+        if index is None:
+            self._discovered_slugs[namespace].discard(slug)
+            changed: bool = self._indexes_by_slug.pop(slug, None) is not None
+            self._discovered_repositories.pop(slug, None)
+        else:
+            self._discovered_slugs[namespace].add(slug)
+            changed = self.set_repository_index(slug, index)
+        if changed:
+            self.update_repository_lookup(slug)
+
+    async def _refresh_repository(self, slug: GithubRepositorySlug) -> None:
+        """Fetch the index of a repository and rebuild the lookups."""
+        try:
+            index: IntegrationPackageIndex = await self.fetch_repository_index(slug)
+        except Exception as exception:
+            if slug in self._repositories:
+                self._errors_by_slug[slug] = str(exception) or exception.__class__.__name__
+            raise
+        if slug not in self._repositories:
+            # Removed while being fetched
+            return
+        self._errors_by_slug.pop(slug, None)
+        if self.set_repository_index(slug, index):
+            self.update_repository_lookup(slug)
+
+    async def refresh_repository(self, slug: GithubRepositorySlug) -> None:
+        """Refresh the index of a single repository, joining the in-flight refresh if any.
+
+        A failing repository keeps its previous index and is reported by `get_index_errors`.
+        """
+        task: asyncio.Task[None] | None = self._refreshes.get(slug)
+        if task is None:
+            task = asyncio.create_task(self._refresh_repository(slug))
+            self._refreshes[slug] = task
+            task.add_done_callback(lambda _: self._refreshes.pop(slug, None))
+        await asyncio.shield(task)
+
+    async def refresh_organization(self, namespace: GithubNamespace, name: GithubRepositoryName | None = None) -> None:
+        """Refresh all discovered repositories of an organization, or only one, joining the in-flight refresh if any.
+
+        A failing organization keeps its previous indexes and is reported by `get_index_errors`.
+        """
+        key: GithubRepositorySlug = (
+            get_github_organization_source(namespace) if name is None else get_github_repository_slug(namespace, name)
+        )
+        task: asyncio.Task[None] | None = self._refreshes.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._refresh_organization(namespace)
+                if name is None
+                else self._refresh_discovered_repository(namespace, name)
+            )
+            self._refreshes[key] = task
+            task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+        await asyncio.shield(task)
+
+    def get_metrics(self) -> list[IntegrationMetric]:
+        """Get the age of the repository indexes and the rate limit budget of the token."""
+        now: float = time.time()
+        metrics: list[IntegrationMetric] = [
+            {
+                "name": "index_age_seconds",
+                "description": "Seconds since the index of a source was last refreshed.",
+                "labels": {"integration_id": str(self._integration_id), "source": slug},
+                "value": now - refreshed_at,
+            }
+            for slug, refreshed_at in self._refreshed_at_by_slug.items()
+        ]
+        for resource, governor in (("core", self._rate_limit_governor), ("graphql", self._graphql_rate_limit_governor)):
+            for fingerprint, budget in governor.budgets.items():
+                labels: dict[str, str] = {
+                    "integration_id": str(self._integration_id),
+                    "token": fingerprint,
+                    "resource": resource,
+                }
+                metrics.extend(
+                    [
+                        {
+                            "name": "github_rate_limit_remaining",
+                            "description": "Requests remaining in the Github rate limit window.",
+                            "labels": labels,
+                            "value": budget["remaining"],
+                        },
+                        {
+                            "name": "github_rate_limit_limit",
+                            "description": "Requests allowed in the Github rate limit window.",
+                            "labels": labels,
+                            "value": budget["limit"],
+                        },
+                        {
+                            "name": "github_rate_limit_reset_timestamp_seconds",
+                            "description": "Time at which the Github rate limit window resets.",
+                            "labels": labels,
+                            "value": budget["reset"],
+                        },
+                    ]
+                )
+        return metrics
+
+    def get_sources(self) -> list[str]:
+        """Get the slugs of the repositories, then the `{namespace}/*` sources of the organizations."""
+        return [*self._repositories.keys(), *map(get_github_organization_source, self._organizations)]
+
+    def get_source_refresh_interval(self, source: str) -> float | None:
+        """Get the refresh interval of the repository, or organization, with the given source."""
+        if source.endswith("/*"):
+            organization: GithubOrganizationReference | None = self._organization_references.get(
+                GithubNamespace(source.removesuffix("/*"))
+            )
+            return organization.get("refresh_interval") if organization is not None else None
+        repository: GithubRepositoryReference | None = self._references.get(GithubRepositorySlug(source))
+        return repository.get("refresh_interval") if repository is not None else None
+
+    def get_source_indexes(self) -> dict[str, IntegrationPackageIndex]:
+        """Get the current package index of each repository."""
+        return {slug: package_index for slug, package_index in self._indexes_by_slug.items()}
+
+    def get_index_age(self) -> float | None:
+        """Get the number of seconds since the stalest source was fetched, `None` until all are."""
+        if any(source not in self._refreshed_at_by_slug for source in self.get_sources()):
+            return None
+        return max((time.time() - refreshed_at for refreshed_at in self._refreshed_at_by_slug.values()), default=0.0)
+
+    def restore_source_indexes(
+        self, sources: dict[str, IntegrationPackageIndex], overwrite: bool = False, fetched_at: float | None = None
+    ) -> None:
+        """Restore the package indexes of the repositories, only those not populated yet unless overwritten.
+
+        Repositories of a configured organization are restored as discovered. When overwritten,
+        discovered repositories missing from the sources are removed.
+        """
+        restored: bool = False
+        refreshed_at: float = time.time() if fetched_at is None else fetched_at
+        if overwrite:
+            for discovered in self._discovered_slugs.values():
+                for missing in discovered - sources.keys():
+                    discovered.discard(missing)
+                    self._indexes_by_slug.pop(missing, None)
+                    self._discovered_repositories.pop(missing, None)
+                    restored = True
+        for source, package_index in sources.items():
+            slug: GithubRepositorySlug = GithubRepositorySlug(source)
+            if not overwrite and slug in self._indexes_by_slug:
+                continue
+            namespace: GithubNamespace = GithubNamespace(slug.split("/", 1)[0])
+            if slug in self._repositories:
+                self._refreshed_at_by_slug[slug] = refreshed_at
+            elif namespace in self._organizations and not self.is_configured_repository(slug):
+                self._discovered_slugs[namespace].add(slug)
+                organization_source: GithubRepositorySlug = get_github_organization_source(namespace)
+                if overwrite or organization_source not in self._refreshed_at_by_slug:
+                    self._refreshed_at_by_slug[organization_source] = refreshed_at
+            else:
+                continue
+            self._indexes_by_slug[slug] = {**package_index, "integration_id": self._integration_id}
+            restored = True
+        if restored:
+            self.build_lookup()
+
+    async def refresh_source(self, source: str) -> bool:
+        """Refresh the repository with the given slug.
+
+        The `{namespace}/*` source of an organization discovers all its repositories again,
+        the slug of any repository of an organization refreshes only that repository.
+        """
+        slug: GithubRepositorySlug = GithubRepositorySlug(source)
+        if slug in self._repositories:
+            await self.refresh_repository(slug)
+            return True
+        namespace: GithubNamespace | None = self.get_organization_namespace(slug)
+        if namespace is None or "/" not in source:
+            return False
+        name: str = source.split("/", 1)[1]
+        if name == "*":
+            await self.refresh_organization(namespace)
+        elif self.is_configured_repository(slug):
+            return False
+        else:
+            await self.refresh_organization(namespace, GithubRepositoryName(name))
+        return True
+
+    def get_repository(self, slug: GithubRepositorySlug) -> GithubRepository:
+        """Get the repository to download from, created on first use for a discovered repository."""
+        repository: GithubRepository | None = self._repositories.get(slug) or self._discovered_repositories.get(slug)
+        if repository is not None:
+            return repository
+        namespace: GithubNamespace | None = self.get_organization_namespace(slug)
+        if namespace is None:
+            raise HTTPException(status_code=404, detail="Repository not found")
+        repository = GithubRepository(
+            self._github_token,
+            {
+                "namespace": namespace,
+                "name": GithubRepositoryName(slug.split("/", 1)[1]),
+                "package_name": None,
+                "asset_pattern": self._organization_references[namespace].get("asset_pattern"),
+            },
+            self._integration_id,
+            self._session_pool,
+            rate_limit_governor=self._rate_limit_governor,
+            shared_cache=self._shared_cache,
+        )
+        self._discovered_repositories[slug] = repository
+        return repository
+
+    def build_lookup(self) -> None:
+        """Build the index and the repository of each package from the current indexes."""
+        slugs_by_package: dict[PackageName, GithubRepositorySlug] = {}
+        for slug, index in self._indexes_by_slug.items():
+            slugs_by_package.setdefault(normalize_package_name(index["package_name"]), slug)
+        indexes: list[IntegrationPackageIndex] = list(self._indexes_by_slug.values())
+        self._index, self._slugs_by_package, self._index_outdated = indexes, slugs_by_package, False
+        self._lookups_by_slug = {
+            slug: lookup for slug, lookup in self._lookups_by_slug.items() if slug in self._indexes_by_slug
+        }
+
+    def update_repository_lookup(self, slug: GithubRepositorySlug) -> None:
+        """Update the lookups after the index of a single repository changed.
+
+        A repository still publishing the same package is served from its own lookup at once
+        and the index is rebuilt on its next use, so refreshing a package does no index-wide work.
+        """
+        index: IntegrationPackageIndex | None = self._indexes_by_slug.get(slug)
+        if index is not None and self._slugs_by_package.get(normalize_package_name(index["package_name"])) == slug:
+            self._index_outdated = True
+        else:
+            self.build_lookup()
+
+    def get_repository_lookup(self, slug: GithubRepositorySlug) -> PackageIndexLookup | None:
+        """Get the lookup of a repository, built from its index alone, `None` until it is populated."""
+        index: IntegrationPackageIndex | None = self._indexes_by_slug.get(slug)
+        if index is None:
+            return None
+        lookup: PackageIndexLookup | None = self._lookups_by_slug.get(slug)
+        if lookup is None or lookup.get_package(index["package_name"]) is not index:
+            lookup = PackageIndexLookup([index])
+            self._lookups_by_slug[slug] = lookup
+        return lookup
+
+    def get_indexed_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get the current index of a package, from the lookup of the repository publishing it."""
+        slug: GithubRepositorySlug | None = self._slugs_by_package.get(normalize_package_name(package_name))
+        lookup: PackageIndexLookup | None = self.get_repository_lookup(slug) if slug is not None else None
+        return lookup.get_package(package_name) if lookup is not None else None
 
     async def get_index(self) -> list[IntegrationPackageIndex]:
-        """Get index."""
-        await self.populate_indexes()
-        return list(self._indexes_by_slug.values())
+        """Get index.
 
-    async def get_download_package(
+        With background refresh, the current indexes are served as is, the same list
+        being returned until a repository is refreshed.
+        """
+        if not self._background_refresh:
+            await self.populate_indexes()
+        if self._index_outdated:
+            self._index, self._index_outdated = list(self._indexes_by_slug.values()), False
+        return self._index
+
+    def get_package_slug(self, package_name: PackageName) -> GithubRepositorySlug | None:
+        """Get the slug of the repository publishing a package, known before its index is fetched if configured."""
+        normalized_package_name: PackageName = normalize_package_name(package_name)
+        slug: GithubRepositorySlug | None = self._slugs_by_package.get(normalized_package_name)
+        if slug is not None:
+            return slug
+        for slug, repository in self._references.items():
+            if normalize_package_name(repository["package_name"] or repository["name"]) == normalized_package_name:
+                return slug
+        return None
+
+    async def get_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get the index of a package, only refreshing the repository publishing it.
+
+        Organizations not discovered yet are discovered first, as they may publish the package.
+        With background refresh, the current index of the package is served as is. A failing
+        repository serves its previous index, if any.
+        """
+        if self._background_refresh:
+            return self.get_indexed_package(package_name)
+        slug: GithubRepositorySlug | None = self.get_package_slug(package_name)
+        if slug is None:
+            namespaces: list[GithubNamespace] = [
+                namespace
+                for namespace in self._organizations
+                if get_github_organization_source(namespace) not in self._refreshed_at_by_slug
+            ]
+            if not namespaces:
+                return None
+            await gather_with_concurrency(
+                [self.refresh_organization(namespace) for namespace in namespaces],
+                max_concurrency=self._max_concurrency,
+            )
+            # Just discovered, the index of the package is fresh
+            return self.get_indexed_package(package_name)
+        try:
+            await self.refresh_source(slug)
+        except Exception:  # pylint: disable=broad-exception-caught
+            if self.get_indexed_package(package_name) is None:
+                raise
+            _logger.warning("Failed to refresh repository %s, serving its previous index", slug, exc_info=True)
+        return self.get_indexed_package(package_name)
+
+    def get_index_errors(self) -> list[IntegrationIndexError]:
+        """Get errors of the last index population."""
+        return [
+            {"integration_id": self._integration_id, "source": slug, "message": message}
+            for slug, message in self._errors_by_slug.items()
+        ]
+
+    def get_package_file(
         self, package_name: PackageName, package_version: PackageVersion
-    ) -> AsyncGenerator[bytes, None]:
-        """Get download package."""
-        # Identify the repository slug based on the package name
-        repository_slug: GithubRepositorySlug | None = next(
-            (
-                slug
-                for slug, index in self._indexes_by_slug.items()
-                if index["package_name"] == package_name
-            ),
-            None,
-        )
+    ) -> tuple[GithubRepository, IntegrationPackageFile]:
+        """Get a package file and the repository publishing it."""
+        repository_slug: GithubRepositorySlug | None = self._slugs_by_package.get(normalize_package_name(package_name))
         if repository_slug is None:
             raise HTTPException(status_code=404, detail="Repository not found")
 
-        # Identify the package version based on the package name and version
-        package_version_list: list[PackageVersion] = self._indexes_by_slug[
-            repository_slug
-        ]["package_version_list"]
-        if package_version not in package_version_list:
+        lookup: PackageIndexLookup | None = self.get_repository_lookup(repository_slug)
+        package_file: IntegrationPackageFile | None = (
+            lookup.get_file(package_name, package_version) if lookup is not None else None
+        )
+        if package_file is None:
             raise HTTPException(status_code=404, detail="Package version not found")
 
-        return await self._repositories[repository_slug].get_download_package(
-            package_name, package_version
-        )
+        return self.get_repository(repository_slug), package_file
+
+    async def get_download_redirect(self, package_name: PackageName, package_version: PackageVersion) -> str | None:
+        """Get the signed URL to redirect the download to, only in redirect mode."""
+        if self._download_mode != GithubDownloadMode.REDIRECT:
+            return None
+        repository, package_file = self.get_package_file(package_name, package_version)
+        return await repository.get_download_redirect(package_file)
+
+    async def get_download_package(
+        self, package_name: PackageName, package_version: PackageVersion, range_header: str | None = None
+    ) -> IntegrationPackageDownload:
+        """Get download package."""
+        repository, package_file = self.get_package_file(package_name, package_version)
+        return await repository.get_download_package(package_file, range_header)
@@ -1,6 +1,6 @@
 """Github objects."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class GithubReleaseAssetObject(BaseModel):
@@ -11,6 +11,7 @@ class GithubReleaseAssetObject(BaseModel):
     digest: str
     browser_download_url: str
     content_type: str
+    size: int | None = None
 
 
 class GithubReleaseObject(BaseModel):
@@ -19,3 +20,75 @@ class GithubReleaseObject(BaseModel):
     tag_name: str
     name: str
     assets: list[GithubReleaseAssetObject]
+
+
+class GithubGraphqlPageInfoObject(BaseModel):
+    """Github GraphQL page info object."""
+
+    has_next_page: bool = Field(alias="hasNextPage")
+    end_cursor: str | None = Field(default=None, alias="endCursor")
+
+
+class GithubGraphqlReleaseAssetObject(BaseModel):
+    """Github GraphQL release asset object."""
+
+    name: str
+    download_url: str = Field(alias="downloadUrl")
+    content_type: str = Field(alias="contentType")
+    size: int | None = None
+    digest: str | None = None
+
+    def to_release_asset(self) -> GithubReleaseAssetObject:
+        """Convert to the release asset object of the REST API, downloaded from its release download URL."""
+        return GithubReleaseAssetObject(
+            url=self.download_url,
+            name=self.name,
+            digest=self.digest or "",
+            browser_download_url=self.download_url,
+            content_type=self.content_type,
+            size=self.size,
+        )
+
+
+class GithubGraphqlReleaseAssetConnectionObject(BaseModel):
+    """Github GraphQL release asset connection object."""
+
+    page_info: GithubGraphqlPageInfoObject = Field(alias="pageInfo")
+    nodes: list[GithubGraphqlReleaseAssetObject]
+
+
+class GithubGraphqlReleaseObject(BaseModel):
+    """Github GraphQL release object."""
+
+    tag_name: str = Field(alias="tagName")
+    name: str | None = None
+    release_assets: GithubGraphqlReleaseAssetConnectionObject = Field(alias="releaseAssets")
+
+    def to_release(self) -> GithubReleaseObject:
+        """Convert to the release object of the REST API."""
+        return GithubReleaseObject(
+            tag_name=self.tag_name,
+            name=self.name or self.tag_name,
+            assets=[asset.to_release_asset() for asset in self.release_assets.nodes],
+        )
+
+
+class GithubGraphqlReleaseConnectionObject(BaseModel):
+    """Github GraphQL release connection object."""
+
+    page_info: GithubGraphqlPageInfoObject = Field(alias="pageInfo")
+    nodes: list[GithubGraphqlReleaseObject]
+
+
+class GithubGraphqlRepositoryObject(BaseModel):
+    """Github GraphQL repository object."""
+
+    name: str
+    releases: GithubGraphqlReleaseConnectionObject
+
+
+class GithubGraphqlRepositoryConnectionObject(BaseModel):
+    """Github GraphQL repository connection object."""
+
+    page_info: GithubGraphqlPageInfoObject = Field(alias="pageInfo")
+    nodes: list[GithubGraphqlRepositoryObject]
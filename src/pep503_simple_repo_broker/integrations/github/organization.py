@@ -0,0 +1,254 @@
+"""Github organization discovery through the GraphQL API."""
+
+import logging
+from collections.abc import AsyncGenerator
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import ClientResponse
+
+from ..abstracts import (
+    IntegrationId,
+    IntegrationPackageFile,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+)
+from .objects import (
+    GithubGraphqlReleaseConnectionObject,
+    GithubGraphqlReleaseObject,
+    GithubGraphqlRepositoryConnectionObject,
+    GithubGraphqlRepositoryObject,
+)
+from .rate_limit import GithubApiError, GithubRateLimitGovernor
+from .repository import GithubApi, transform_release_to_package_files
+from .session import GithubSessionPool
+from .types import (
+    GithubNamespace,
+    GithubOrganizationReference,
+    GithubRepositoryName,
+    GithubRepositorySlug,
+    GithubToken,
+    get_github_repository_slug,
+)
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+_RELEASE_CONNECTION_FRAGMENT: str = """
+fragment ReleaseConnectionFields on ReleaseConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    tagName
+    name
+    releaseAssets(first: $assets) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name downloadUrl contentType size digest }
+    }
+  }
+}
+"""
+
+ORGANIZATION_REPOSITORIES_QUERY: str = (
+    """
+query OrganizationRepositories($owner: String!, $cursor: String, $repositories: Int!, $releases: Int!, $assets: Int!) {
+  repositoryOwner(login: $owner) {
+    repositories(first: $repositories, after: $cursor, orderBy: {field: NAME, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        releases(first: $releases, orderBy: {field: CREATED_AT, direction: DESC}) { ...ReleaseConnectionFields }
+      }
+    }
+  }
+}
+"""
+    + _RELEASE_CONNECTION_FRAGMENT
+)
+
+REPOSITORY_RELEASES_QUERY: str = (
+    """
+query RepositoryReleases($owner: String!, $name: String!, $cursor: String, $releases: Int!, $assets: Int!) {
+  repository(owner: $owner, name: $name) {
+    releases(first: $releases, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      ...ReleaseConnectionFields
+    }
+  }
+}
+"""
+    + _RELEASE_CONNECTION_FRAGMENT
+)
+
+
+class GithubOrganizationApi(GithubApi):
+    """Github GraphQL API of the repositories of an organization.
+
+    Repositories are listed with their latest releases and assets in batched pages,
+    a few API points per page instead of one REST request per repository.
+    """
+
+    REPOSITORIES_PER_PAGE: int = 50
+    RELEASES_PER_REPOSITORY: int = 20
+    RELEASES_PER_PAGE: int = 100
+    ASSETS_PER_RELEASE: int = 100
+
+    async def query(self, query: str, variables: dict[str, Any], operation: str) -> dict[str, Any]:
+        """Send a GraphQL query and get its data.
+
+        Raises:
+            GithubApiError: The query failed or answered errors.
+        """
+        response: ClientResponse = await self.request(
+            "/graphql", operation=operation, method="POST", json_body={"query": query, "variables": variables}
+        )
+        async with response:
+            if response.status != HTTPStatus.OK:
+                raise GithubApiError(f"Failed to query Github GraphQL API: {response.status}", response.status)
+            payload: Any = await response.json()
+        if payload.get("errors"):
+            messages: str = "; ".join(str(error.get("message", error)) for error in payload["errors"])
+            raise GithubApiError(f"Github GraphQL API errors: {messages}", response.status)
+        data: dict[str, Any] = payload["data"]
+        return data
+
+    async def iter_repositories(
+        self, namespace: GithubNamespace
+    ) -> AsyncGenerator[GithubGraphqlRepositoryObject, None]:
+        """Iterate over the repositories of a namespace, with their latest releases."""
+        cursor: str | None = None
+        while True:
+            data: dict[str, Any] = await self.query(
+                ORGANIZATION_REPOSITORIES_QUERY,
+                {
+                    "owner": namespace,
+                    "cursor": cursor,
+                    "repositories": self.REPOSITORIES_PER_PAGE,
+                    "releases": self.RELEASES_PER_REPOSITORY,
+                    "assets": self.ASSETS_PER_RELEASE,
+                },
+                operation="graphql_repositories",
+            )
+            if data["repositoryOwner"] is None:
+                raise GithubApiError(f"Namespace {namespace} not found", HTTPStatus.NOT_FOUND)
+            connection: GithubGraphqlRepositoryConnectionObject = (
+                GithubGraphqlRepositoryConnectionObject.model_validate(data["repositoryOwner"]["repositories"])
+            )
+            for repository in connection.nodes:
+                yield repository
+            if not connection.page_info.has_next_page:
+                return
+            cursor = connection.page_info.end_cursor
+
+    async def retrieve_releases(
+        self,
+        namespace: GithubNamespace,
+        name: GithubRepositoryName,
+        releases: GithubGraphqlReleaseConnectionObject | None = None,
+    ) -> list[GithubGraphqlReleaseObject]:
+        """Retrieve all releases of a repository.
+
+        Args:
+            namespace: Owner of the repository.
+            name: Name of the repository.
+            releases: First page of releases already retrieved, continued from its end.
+        """
+        release_list: list[GithubGraphqlReleaseObject] = releases.nodes.copy() if releases is not None else []
+        cursor: str | None = releases.page_info.end_cursor if releases is not None else None
+        has_next_page: bool = releases.page_info.has_next_page if releases is not None else True
+        while has_next_page:
+            data: dict[str, Any] = await self.query(
+                REPOSITORY_RELEASES_QUERY,
+                {
+                    "owner": namespace,
+                    "name": name,
+                    "cursor": cursor,
+                    "releases": self.RELEASES_PER_PAGE,
+                    "assets": self.ASSETS_PER_RELEASE,
+                },
+                operation="graphql_releases",
+            )
+            if data["repository"] is None:
+                raise GithubApiError(f"Repository {namespace}/{name} not found", HTTPStatus.NOT_FOUND)
+            page: GithubGraphqlReleaseConnectionObject = GithubGraphqlReleaseConnectionObject.model_validate(
+                data["repository"]["releases"]
+            )
+            release_list.extend(page.nodes)
+            cursor, has_next_page = page.page_info.end_cursor, page.page_info.has_next_page
+        return release_list
+
+
+class GithubOrganization:
+    """Github organization, or user, whose repositories publishing distributions are discovered."""
+
+    def __init__(
+        self,
+        github_token: GithubToken,
+        organization: GithubOrganizationReference,
+        integration_id: IntegrationId,
+        session_pool: GithubSessionPool | None = None,
+        *,
+        rate_limit_governor: GithubRateLimitGovernor | None = None,
+    ) -> None:
+        """Initialize Github organization."""
+        self._organization: GithubOrganizationReference = organization
+        self._integration_id: IntegrationId = integration_id
+        self._api: GithubOrganizationApi = GithubOrganizationApi(
+            github_token, session_pool, rate_limit_governor=rate_limit_governor
+        )
+
+    async def close(self) -> None:
+        """Close the organization API."""
+        await self._api.close()
+
+    def build_index(
+        self, name: GithubRepositoryName, releases: list[GithubGraphqlReleaseObject]
+    ) -> IntegrationPackageIndex:
+        """Build the index of a repository from its releases, named after the repository."""
+        package_file_list: list[IntegrationPackageFile] = [
+            package_file
+            for release in releases
+            for package_file in transform_release_to_package_files(
+                release.to_release(), self._organization.get("asset_pattern")
+            )
+        ]
+        return {
+            "integration_id": self._integration_id,
+            "package_name": PackageName(name),
+            "package_version_list": [PackageVersion(package_file["filename"]) for package_file in package_file_list],
+            "package_file_list": package_file_list,
+        }
+
+    async def get_repository_releases(
+        self, repository: GithubGraphqlRepositoryObject
+    ) -> list[GithubGraphqlReleaseObject]:
+        """Get all releases of a discovered repository, completing the first page if needed."""
+        name: GithubRepositoryName = GithubRepositoryName(repository.name)
+        releases: list[GithubGraphqlReleaseObject] = repository.releases.nodes
+        if repository.releases.page_info.has_next_page:
+            releases = await self._api.retrieve_releases(self._organization["namespace"], name, repository.releases)
+        for release in releases:
+            if release.release_assets.page_info.has_next_page:
+                _logger.warning(
+                    "Release %s of %s/%s has more than %s assets, the others are ignored",
+                    release.tag_name,
+                    self._organization["namespace"],
+                    name,
+                    self._api.ASSETS_PER_RELEASE,
+                )
+        return releases
+
+    async def get_indexes(self) -> dict[GithubRepositorySlug, IntegrationPackageIndex]:
+        """Get the index of every repository publishing distributions."""
+        indexes: dict[GithubRepositorySlug, IntegrationPackageIndex] = {}
+        async for repository in self._api.iter_repositories(self._organization["namespace"]):
+            name: GithubRepositoryName = GithubRepositoryName(repository.name)
+            index: IntegrationPackageIndex = self.build_index(name, await self.get_repository_releases(repository))
+            if index["package_file_list"]:
+                indexes[get_github_repository_slug(self._organization["namespace"], name)] = index
+        return indexes
+
+    async def get_repository_index(self, name: GithubRepositoryName) -> IntegrationPackageIndex | None:
+        """Get the index of a single repository, `None` if it publishes no distributions."""
+        index: IntegrationPackageIndex = self.build_index(
+            name, await self._api.retrieve_releases(self._organization["namespace"], name)
+        )
+        return index if index["package_file_list"] else None
@@ -0,0 +1,175 @@
+"""Github API rate limit governor."""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import TypedDict
+
+from pydantic import BaseModel, Field
+
+from .types import GithubToken
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+class GithubApiError(Exception):
+    """Raised when the Github API answers with an unexpected status."""
+
+    def __init__(self, message: str, status: int) -> None:
+        """Initialize Github API error."""
+        super().__init__(message)
+        self.status: int = status
+
+
+class GithubRateLimitError(GithubApiError):
+    """Raised when the Github API rate limit is exhausted for longer than callers may wait."""
+
+    def __init__(self, message: str, status: int, retry_after: float) -> None:
+        """Initialize Github rate limit error."""
+        super().__init__(message, status)
+        self.retry_after: float = retry_after
+
+
+class GithubRateLimitSettings(BaseModel):
+    """Github API rate limit settings."""
+
+    max_retries: int = Field(default=3, ge=0, description="Retries of a request failing with 403, 429 or 5xx.")
+    backoff_base: float = Field(default=1.0, gt=0, description="Seconds before the first retry, doubled each retry.")
+    max_backoff: float = Field(default=30.0, gt=0, description="Maximum seconds between two retries.")
+    max_wait: float = Field(
+        default=60.0, ge=0, description="Maximum seconds a request waits for the rate limit, it fails beyond."
+    )
+    low_budget_ratio: float = Field(
+        default=0.1, ge=0, le=1, description="Fraction of the limit below which requests are spread until reset."
+    )
+    max_spread_delay: float = Field(
+        default=10.0, ge=0, description="Maximum seconds a request is delayed by spreading."
+    )
+
+
+class GithubRateLimitBudget(TypedDict):
+    """Github API rate limit budget of a token."""
+
+    limit: int
+    remaining: int
+    # Epoch seconds at which the budget is reset
+    reset: float
+    # Epoch seconds before which no request must be sent, from `Retry-After`
+    blocked_until: float
+
+
+def get_token_fingerprint(github_token: GithubToken) -> str:
+    """Get a fingerprint of a token, safe to log and to use as a metric label."""
+    return hashlib.sha256(github_token.encode()).hexdigest()[:12]
+
+
+def parse_retry_after(value: str | None, now: float) -> float | None:
+    """Parse a `Retry-After` header into a number of seconds."""
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+class GithubRateLimitGovernor:
+    """Tracks the rate limit budget of each token and throttles requests accordingly.
+
+    Requests are delayed while a token is blocked by a `Retry-After`, spread until the
+    reset when its budget runs low, and refused once waiting would exceed `max_wait`.
+    """
+
+    def __init__(self, settings: GithubRateLimitSettings | None = None) -> None:
+        """Initialize Github rate limit governor."""
+        self._settings: GithubRateLimitSettings = settings or GithubRateLimitSettings()
+        self._budgets: dict[str, GithubRateLimitBudget] = {}
+
+    @property
+    def settings(self) -> GithubRateLimitSettings:
+        """Get rate limit settings."""
+        return self._settings
+
+    @property
+    def budgets(self) -> dict[str, GithubRateLimitBudget]:
+        """Get a copy of the budgets by token fingerprint."""
+        return {fingerprint: budget.copy() for fingerprint, budget in self._budgets.items()}
+
+    def get_budget(self, github_token: GithubToken) -> GithubRateLimitBudget | None:
+        """Get the budget of a token, `None` until a response reported it."""
+        return self._budgets.get(get_token_fingerprint(github_token))
+
+    def get_delay(self, github_token: GithubToken, now: float | None = None) -> float:
+        """Get the number of seconds the next request of a token must wait."""
+        budget: GithubRateLimitBudget | None = self.get_budget(github_token)
+        if budget is None:
+            return 0.0
+        now = time.time() if now is None else now
+        delay: float = max(0.0, budget["blocked_until"] - now)
+        until_reset: float = budget["reset"] - now
+        if until_reset <= 0:
+            return delay
+        if budget["remaining"] <= 0:
+            return max(delay, until_reset)
+        if budget["remaining"] < budget["limit"] * self._settings.low_budget_ratio:
+            # Spread the remaining requests evenly until the reset
+            delay = max(delay, min(self._settings.max_spread_delay, until_reset / budget["remaining"]))
+        return delay
+
+    async def acquire(self, github_token: GithubToken) -> None:
+        """Wait until a request of a token may be sent.
+
+        Raises:
+            GithubRateLimitError: The token is rate limited for longer than `max_wait`.
+        """
+        delay: float = self.get_delay(github_token)
+        if delay > self._settings.max_wait:
+            raise GithubRateLimitError(
+                f"Github rate limit exhausted, retry in {delay:.0f}s", HTTPStatus.TOO_MANY_REQUESTS, delay
+            )
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, github_token: GithubToken, status: int, headers: Mapping[str, str]) -> float | None:
+        """Update the budget of a token from a response.
+
+        Returns:
+            Seconds to wait before retrying when the response is rate limited, `None` otherwise.
+        """
+        now: float = time.time()
+        fingerprint: str = get_token_fingerprint(github_token)
+        budget: GithubRateLimitBudget = self._budgets.get(
+            fingerprint, {"limit": 0, "remaining": 0, "reset": 0.0, "blocked_until": 0.0}
+        )
+        try:
+            if "X-RateLimit-Remaining" in headers:
+                budget = {
+                    "limit": int(headers.get("X-RateLimit-Limit", budget["limit"])),
+                    "remaining": int(headers["X-RateLimit-Remaining"]),
+                    "reset": float(headers.get("X-RateLimit-Reset", budget["reset"])),
+                    "blocked_until": budget["blocked_until"],
+                }
+        except ValueError:
+            _logger.warning("Invalid rate limit headers from Github: %s", dict(headers))
+        retry_after: float | None = None
+        if status in (HTTPStatus.FORBIDDEN, HTTPStatus.TOO_MANY_REQUESTS):
+            retry_after = parse_retry_after(headers.get("Retry-After"), now)
+            if retry_after is None and budget["remaining"] <= 0 and budget["reset"] > now:
+                retry_after = budget["reset"] - now
+            if retry_after is not None:
+                budget["blocked_until"] = max(budget["blocked_until"], now + retry_after)
+        if "X-RateLimit-Remaining" in headers or retry_after is not None:
+            self._budgets[fingerprint] = budget
+        return retry_after
+
+    def get_backoff(self, attempt: int) -> float:
+        """Get the jittered exponential backoff before a retry."""
+        backoff: float = min(self._settings.max_backoff, self._settings.backoff_base * 2**attempt)
+        return random.uniform(backoff / 2, backoff)
@@ -1,120 +1,695 @@
 """Github release API."""
 
-from collections.abc import AsyncGenerator
+import asyncio
+import base64
+import binascii
+import fnmatch
+import json
+import logging
+import sys
+import time
+from collections.abc import AsyncGenerator, Mapping
+from datetime import datetime
 from http import HTTPStatus
+from typing import Any, TypedDict
+from urllib.parse import SplitResult, urlsplit
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponse
 from fastapi import HTTPException
+from yarl import URL
 
+from ...metrics import CACHE_REQUESTS, GITHUB_REQUEST_DURATION, GITHUB_RESPONSES
+from ...shared_cache import SharedCache
 from ..abstracts import (
     IntegrationId,
+    IntegrationPackageDownload,
+    IntegrationPackageFile,
     IntegrationPackageIndex,
     PackageName,
     PackageVersion,
 )
-from .objects import GithubReleaseObject
+from .objects import GithubReleaseAssetObject, GithubReleaseObject
+from .rate_limit import (
+    GithubApiError,
+    GithubRateLimitError,
+    GithubRateLimitGovernor,
+    GithubRateLimitSettings,
+)
+from .session import GithubSessionPool
 from .types import GithubRepositoryReference, GithubToken
 
+_logger: logging.Logger = logging.getLogger(__name__)
 
-class GithubRepositoryApi:
-    """Github repository API."""
+GITHUB_HOST: str = "github.com"
+# Path segments between the repository and the tag of a release download URL
+RELEASE_DOWNLOAD_SEGMENTS: tuple[str, str] = ("releases", "download")
+
+
+class GithubReleaseRecord:
+    """Github release as kept between refreshes, reduced to the package files of its distributions.
+
+    The package files are shared with the index built from the release, an unchanged
+    release costs no memory on refresh.
+    """
+
+    __slots__ = ("package_files", "tag_name")
+
+    def __init__(self, tag_name: str, package_files: list[IntegrationPackageFile]) -> None:
+        """Initialize Github release record."""
+        self.tag_name: str = tag_name
+        self.package_files: list[IntegrationPackageFile] = package_files
+
+
+class GithubReleasePage(TypedDict):
+    """Github release page, kept to answer conditional requests."""
+
+    etag: str | None
+    releases: list[GithubReleaseRecord]
+    next_page: int | None
+    last_page: int | None
+
+
+def dump_release_page(release_page: GithubReleasePage) -> dict[str, Any]:
+    """Dump a release page as JSON for the shared cache."""
+    return {
+        "etag": release_page["etag"],
+        "releases": [[release.tag_name, release.package_files] for release in release_page["releases"]],
+        "next_page": release_page["next_page"],
+        "last_page": release_page["last_page"],
+    }
+
+
+def load_release_page(value: Any) -> GithubReleasePage | None:
+    """Load a release page dumped by `dump_release_page`, `None` if malformed."""
+    try:
+        return {
+            "etag": value["etag"],
+            "releases": [
+                GithubReleaseRecord(
+                    tag_name,
+                    [
+                        {
+                            "filename": PackageVersion(package_file["filename"]),
+                            "url": package_file["url"],
+                            "digest": package_file["digest"],
+                            "content_type": sys.intern(package_file["content_type"]),
+                            "size": package_file["size"],
+                        }
+                        for package_file in package_files
+                    ],
+                )
+                for tag_name, package_files in value["releases"]
+            ],
+            "next_page": value["next_page"],
+            "last_page": value["last_page"],
+        }
+    except (KeyError, TypeError, ValueError):
+        _logger.warning("Ignoring malformed release page in the shared cache")
+        return None
+
+
+def is_retryable_status(status: int, retry_after: float | None) -> bool:
+    """Check if a request answered with this status must be retried.
+
+    A 403 is only retried when it is a rate limit, otherwise it is a permission error.
+    """
+    if status == HTTPStatus.FORBIDDEN:
+        return retry_after is not None
+    return status == HTTPStatus.TOO_MANY_REQUESTS or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def get_signed_url_expiry(url: str) -> float | None:
+    """Get the epoch seconds at which a signed asset URL expires, `None` if it cannot be told.
+
+    Github signs asset URLs with an `se` expiry and a JWT, or the legacy S3 `X-Amz-Date`
+    and `X-Amz-Expires` parameters.
+    """
+    query: dict[str, str] = dict(URL(url).query)
+    try:
+        if "se" in query:
+            return datetime.fromisoformat(query["se"]).timestamp()
+        if "X-Amz-Date" in query and "X-Amz-Expires" in query:
+            signed_at: datetime = datetime.strptime(query["X-Amz-Date"] + "+0000", "%Y%m%dT%H%M%SZ%z")
+            return signed_at.timestamp() + float(query["X-Amz-Expires"])
+        if "jwt" in query:
+            payload: str = query["jwt"].split(".")[1]
+            claims: Any = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return float(claims["exp"])
+    except (ValueError, IndexError, KeyError, TypeError, binascii.Error):
+        _logger.debug("Cannot tell the expiry of signed URL %s", URL(url).with_query(None))
+    return None
+
+
+def parse_release_download_url(url: str) -> tuple[str, str, str] | None:
+    """Get the namespace, repository name and tag of a release download URL, `None` for other URLs.
+
+    Release download URLs are `https://github.com/{namespace}/{name}/releases/download/{tag}/{filename}`,
+    the tag may hold slashes.
+    """
+    split_url: SplitResult = urlsplit(url)
+    if split_url.hostname != GITHUB_HOST:
+        return None
+    try:
+        _, namespace, name, releases, download, asset_path = split_url.path.split("/", 5)
+    except ValueError:
+        return None
+    tag, _, filename = asset_path.rpartition("/")
+    if (releases, download) != RELEASE_DOWNLOAD_SEGMENTS or not tag or not filename:
+        return None
+    return namespace, name, tag
+
+
+def get_link_page(response: ClientResponse, rel: str) -> int | None:
+    """Get the page number of a relation of the `Link` header."""
+    link = response.links.get(rel)
+    if link is None:
+        return None
+    page: str | None = URL(link["url"]).query.get("page")
+    if page is None or not page.isdigit():
+        return None
+    return int(page)
+
+
+class GithubApi:
+    """Github API client, throttled by a rate limit governor."""
 
     GITHUB_API_BASE_URL: str = "https://api.github.com"
 
-    def __init__(self, github_token: GithubToken, repository: GithubRepositoryReference) -> None:
-        """Initialize Github release API."""
+    def __init__(
+        self,
+        github_token: GithubToken,
+        session_pool: GithubSessionPool | None = None,
+        *,
+        rate_limit_governor: GithubRateLimitGovernor | None = None,
+    ) -> None:
+        """Initialize Github API client.
+
+        Args:
+            github_token: Token used to authenticate requests.
+            session_pool: Shared session pool, a private one is created when not provided.
+            rate_limit_governor: Shared rate limit governor, a private one is created when not provided.
+        """
         self._github_token: GithubToken = github_token
-        self._repository: GithubRepositoryReference = repository
+        self._owns_session_pool: bool = session_pool is None
+        self._session_pool: GithubSessionPool = session_pool or GithubSessionPool()
+        self._rate_limit_governor: GithubRateLimitGovernor = rate_limit_governor or GithubRateLimitGovernor()
 
-    def acquire_session(self, base_url: str | None = None, headers: dict[str, str] | None = None) -> ClientSession:
-        """Acquire session."""
-        if base_url is None:
-            base_url = self.GITHUB_API_BASE_URL
+    def build_headers(self, headers: dict[str, str] | None = None) -> dict[str, str]:
+        """Build request headers."""
         if headers is None:
             headers = {}
         headers["Authorization"] = f"Bearer {self._github_token}"
-        return ClientSession(
-            headers=headers,
-            base_url=base_url,
-        )
+        return headers
 
-    async def retrieve_releases(self) -> list[GithubReleaseObject]:
-        """Retrieve releases."""
+    def build_url(self, path: str) -> str:
+        """Build an absolute URL from a path of the Github API."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.GITHUB_API_BASE_URL}{path}"
+
+    async def close(self) -> None:
+        """Close the session pool if it is owned by this API."""
+        if self._owns_session_pool:
+            await self._session_pool.close()
+
+    async def request(  # noqa: PLR0913
+        self,
+        url: str,
+        params: Mapping[str, str | int] | None = None,
+        headers: dict[str, str] | None = None,
+        operation: str = "api",
+        *,
+        method: str = "GET",
+        json_body: Any = None,
+        allow_redirects: bool = True,
+    ) -> ClientResponse:
+        """Send a request within the rate limit, the caller must release the response.
+
+        Requests failing with 429, 5xx or a rate limited 403 are retried with a jittered
+        exponential backoff, or after the delay required by Github. The last response is
+        returned once the retries are exhausted.
+
+        Args:
+            url: URL or path of the Github API.
+            params: Query parameters.
+            headers: Request headers, the authorization is added.
+            operation: Name of the operation, used as metric label.
+            method: HTTP method.
+            json_body: Body sent as JSON.
+            allow_redirects: Whether to follow redirects, the redirect is returned otherwise.
+
+        Raises:
+            GithubRateLimitError: The token is rate limited for longer than allowed to wait.
+        """
+        settings: GithubRateLimitSettings = self._rate_limit_governor.settings
+        attempt: int = 0
+        while True:
+            await self._rate_limit_governor.acquire(self._github_token)
+            started_at: float = time.perf_counter()
+            response: ClientResponse = await self._session_pool.session.request(
+                method,
+                self.build_url(url),
+                params=params,
+                headers=self.build_headers(dict(headers or {})),
+                json=json_body,
+                allow_redirects=allow_redirects,
+            )
+            GITHUB_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+            GITHUB_RESPONSES.labels(operation, str(response.status)).inc()
+            retry_after: float | None = self._rate_limit_governor.update(
+                self._github_token, response.status, response.headers
+            )
+            if not is_retryable_status(response.status, retry_after) or attempt >= settings.max_retries:
+                return response
+            response.release()
+            _logger.info("Github answered %s to %s, retrying (attempt %s)", response.status, url, attempt + 1)
+            if retry_after is None:
+                # Rate limited retries wait in `acquire` until the token is unblocked
+                await asyncio.sleep(self._rate_limit_governor.get_backoff(attempt))
+            attempt += 1
+
+
+class GithubRepositoryApi(GithubApi):
+    """Github repository API."""
+
+    RELEASES_PER_PAGE: int = 100
+    # Seconds before its expiry a signed URL stops being served, so clients never follow an expired one
+    SIGNED_URL_EXPIRY_MARGIN: float = 30.0
+    # Seconds a signed URL is kept when its expiry cannot be told
+    SIGNED_URL_DEFAULT_TTL: float = 60.0
+    # Seconds release pages and asset URLs are kept in the shared cache
+    SHARED_RELEASE_PAGE_TTL: float = 86400.0
+    SHARED_ASSET_URL_TTL: float = 86400.0
+
+    def __init__(  # noqa: PLR0913
+        self,
+        github_token: GithubToken,
+        repository: GithubRepositoryReference,
+        session_pool: GithubSessionPool | None = None,
+        *,
+        parallel_pages: bool = False,
+        max_page_concurrency: int = 4,
+        rate_limit_governor: GithubRateLimitGovernor | None = None,
+        shared_cache: SharedCache | None = None,
+    ) -> None:
+        """Initialize Github release API.
+
+        Args:
+            github_token: Token used to authenticate requests.
+            repository: Repository to query.
+            session_pool: Shared session pool, a private one is created when not provided.
+            parallel_pages: Whether to fetch the pages concurrently once the last page is known.
+            max_page_concurrency: Maximum number of pages fetched at the same time.
+            rate_limit_governor: Shared rate limit governor, a private one is created when not provided.
+            shared_cache: Cache sharing the release pages, asset URLs and signed URLs with other replicas.
+        """
+        if max_page_concurrency < 1:
+            raise ValueError("max_page_concurrency must be greater than 0")
+        super().__init__(github_token, session_pool, rate_limit_governor=rate_limit_governor)
+        self._repository: GithubRepositoryReference = repository
+        self._parallel_pages: bool = parallel_pages
+        self._max_page_concurrency: int = max_page_concurrency
+        # Last release pages retrieved, reused when Github answers 304 Not Modified
+        self._release_pages: dict[int, GithubReleasePage] = {}
+        # API URLs of the assets by release download URL
+        self._asset_urls: dict[str, str] = {}
+        # Signed URLs of the assets and the epoch seconds at which they stop being served, by asset URL
+        self._signed_urls: dict[str, tuple[str, float]] = {}
+        self._shared_cache: SharedCache | None = shared_cache
+
+    def get_shared_key(self, kind: str, key: str | int) -> str:
+        """Get the key of a value of the repository in the shared cache."""
+        return f"github:{kind}:{self._repository['namespace']}/{self._repository['name']}:{key}"
+
+    async def get_shared_release_page(
+        self, page: int, cached_page: GithubReleasePage | None
+    ) -> GithubReleasePage | None:
+        """Get the page the request is conditional on, the shared page when another replica saw a newer one."""
+        if self._shared_cache is None:
+            return cached_page
+        shared_value: Any = await self._shared_cache.get_json(self.get_shared_key("release_page", page))
+        if not isinstance(shared_value, dict) or (
+            cached_page is not None and shared_value.get("etag") == cached_page["etag"]
+        ):
+            # The local page shares its package files with the current index
+            return cached_page
+        return load_release_page(shared_value) or cached_page
+
+    async def retrieve_release_page(self, page: int) -> GithubReleasePage:
+        """Retrieve a page of releases.
+
+        The request is conditional on the ETag of the previous response of the same page,
+        an unchanged page is answered with 304 Not Modified and its releases are reused.
+        With a shared cache, the previous response may come from another replica.
+        """
         url: str = f"/repos/{self._repository['namespace']}/{self._repository['name']}/releases"  # pylint: disable=inconsistent-quotes
-        async with self.acquire_session() as session:
-            async with session.get(url) as response:
-                if response.status != HTTPStatus.OK:
-                    raise Exception(f"Failed to retrieve releases: {response.status}")  # pylint: disable=broad-exception-raised
-                return [GithubReleaseObject.model_validate(release) for release in await response.json()]
+        cached_page: GithubReleasePage | None = await self.get_shared_release_page(page, self._release_pages.get(page))
+        headers: dict[str, str] = {}
+        if cached_page is not None and cached_page["etag"] is not None:
+            headers["If-None-Match"] = cached_page["etag"]
+        response: ClientResponse = await self.request(
+            url, params={"per_page": self.RELEASES_PER_PAGE, "page": page}, headers=headers, operation="releases"
+        )
+        async with response:
+            if response.status == HTTPStatus.NOT_MODIFIED and cached_page is not None:
+                self._release_pages[page] = cached_page
+                return cached_page
+            if response.status != HTTPStatus.OK:
+                raise GithubApiError(f"Failed to retrieve releases: {response.status}", response.status)
+            release_page: GithubReleasePage = {
+                "etag": response.headers.get("ETag", None),
+                # The parsed objects are only kept as records, holding what the index needs
+                "releases": [
+                    build_release_record(GithubReleaseObject.model_validate(release))
+                    for release in await response.json()
+                ],
+                "next_page": get_link_page(response, "next"),
+                "last_page": get_link_page(response, "last"),
+            }
+        self._release_pages[page] = release_page
+        if self._shared_cache is not None:
+            await self._shared_cache.set_json(
+                self.get_shared_key("release_page", page),
+                dump_release_page(release_page),
+                self.SHARED_RELEASE_PAGE_TTL,
+            )
+        return release_page
+
+    def forget_release_pages_after(self, page: int) -> None:
+        """Forget the cached pages which no longer exist."""
+        for cached_page in [cached_page for cached_page in self._release_pages if cached_page > page]:
+            del self._release_pages[cached_page]
+
+    async def iter_release_pages(self) -> AsyncGenerator[list[GithubReleaseRecord], None]:
+        """Iterate over all pages of releases, following the `Link` header.
+
+        Pages are yielded in order as soon as they are retrieved, so callers can consume
+        releases without holding the whole raw listing. In parallel mode, the remaining
+        pages are fetched concurrently once the first page gives the last page number.
+        """
+        release_page: GithubReleasePage = await self.retrieve_release_page(1)
+        yield release_page["releases"]
+
+        last_page: int | None = release_page["last_page"]
+        if self._parallel_pages and release_page["next_page"] is not None and last_page is not None:
+            semaphore: asyncio.Semaphore = asyncio.Semaphore(self._max_page_concurrency)
+
+            async def _retrieve(page: int) -> GithubReleasePage:
+                async with semaphore:
+                    return await self.retrieve_release_page(page)
+
+            tasks: list[asyncio.Task[GithubReleasePage]] = [
+                asyncio.create_task(_retrieve(page)) for page in range(2, last_page + 1)
+            ]
+            try:
+                for task in tasks:
+                    yield (await task)["releases"]
+            finally:
+                for task in tasks:
+                    task.cancel()
+            self.forget_release_pages_after(last_page)
+            return
+
+        page: int = 1
+        while release_page["next_page"] is not None:
+            page = release_page["next_page"]
+            release_page = await self.retrieve_release_page(page)
+            yield release_page["releases"]
+        self.forget_release_pages_after(page)
+
+    async def retrieve_releases(self) -> list[GithubReleaseRecord]:
+        """Retrieve releases of all pages."""
+        return [release async for releases in self.iter_release_pages() for release in releases]
+
+    async def resolve_asset_url(self, url: str) -> str:
+        """Resolve a release download URL into the API URL of the asset, other URLs are kept.
+
+        Assets of private repositories can only be downloaded through the API. The release
+        of a download URL is looked up once by its tag and the URLs of its assets are kept.
+        """
+        release_download: tuple[str, str, str] | None = parse_release_download_url(url)
+        if release_download is None:
+            return url
+        asset_url: str | None = self._asset_urls.get(url)
+        if asset_url is not None:
+            return asset_url
+        shared_asset_url: bytes | None = (
+            await self._shared_cache.get(self.get_shared_key("asset_url", url))
+            if self._shared_cache is not None
+            else None
+        )
+        if shared_asset_url is not None:
+            self._asset_urls[url] = shared_asset_url.decode()
+            return self._asset_urls[url]
+        namespace, name, tag = release_download
+        response: ClientResponse = await self.request(
+            f"/repos/{namespace}/{name}/releases/tags/{tag}", operation="release"
+        )
+        async with response:
+            if response.status != HTTPStatus.OK:
+                raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Release not found")
+            release: GithubReleaseObject = GithubReleaseObject.model_validate(await response.json())
+        for asset in release.assets:
+            self._asset_urls[asset.browser_download_url] = asset.url
+        asset_url = self._asset_urls.get(url)
+        if asset_url is None:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Asset not found")
+        if self._shared_cache is not None:
+            await self._shared_cache.set(
+                self.get_shared_key("asset_url", url), asset_url.encode(), self.SHARED_ASSET_URL_TTL
+            )
+        return asset_url
+
+    async def resolve_signed_url(self, url: str) -> str | None:
+        """Resolve the short-lived signed URL the download of an asset redirects to.
+
+        The signed URL is kept until shortly before it expires, no request is sent to
+        Github meanwhile, by any replica when the cache is shared.
+
+        Returns:
+            Signed URL, `None` when Github serves the asset without redirecting.
+        """
+        now: float = time.time()
+        signed_url: tuple[str, float] | None = self._signed_urls.get(url)
+        if (signed_url is None or signed_url[1] <= now) and self._shared_cache is not None:
+            shared_value: Any = await self._shared_cache.get_json(self.get_shared_key("signed_url", url))
+            if isinstance(shared_value, list) and len(shared_value) == 2:  # noqa: PLR2004
+                signed_url = (str(shared_value[0]), float(shared_value[1]))
+                self._signed_urls[url] = signed_url
+        if signed_url is not None and signed_url[1] > now:
+            CACHE_REQUESTS.labels("signed_url", "hit").inc()
+            return signed_url[0]
+        CACHE_REQUESTS.labels("signed_url", "miss").inc()
+        try:
+            asset_url: str = await self.resolve_asset_url(url)
+            response: ClientResponse = await self.request(
+                asset_url,
+                headers={"Accept": "application/octet-stream"},
+                operation="asset_redirect",
+                allow_redirects=False,
+            )
+        except GithubRateLimitError as exception:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=str(exception),
+                headers={"Retry-After": str(int(exception.retry_after) + 1)},
+            ) from exception
+        async with response:
+            location: str | None = response.headers.get("Location") if 300 <= response.status < 400 else None  # noqa: PLR2004
+            if location is None and response.status not in (HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT):
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_GATEWAY, detail=f"Failed to download asset: {response.status}"
+                )
+        # Forget the expired URLs, only while resolving a new one
+        self._signed_urls = {key: value for key, value in self._signed_urls.items() if value[1] > now}
+        if location is None:
+            return None
+        expires_at: float = get_signed_url_expiry(location) or now + self.SIGNED_URL_DEFAULT_TTL
+        self._signed_urls[url] = (location, expires_at - self.SIGNED_URL_EXPIRY_MARGIN)
+        if self._shared_cache is not None:
+            await self._shared_cache.set_json(
+                self.get_shared_key("signed_url", url),
+                list(self._signed_urls[url]),
+                expires_at - self.SIGNED_URL_EXPIRY_MARGIN - now,
+            )
+        return location
+
+    async def open_asset(self, url: str, range_header: str | None = None) -> ClientResponse:
+        """Open the download of an asset, the caller must release the response.
+
+        A `Range` header is forwarded as is, the response is then either a 206 Partial
+        Content or a 200 OK with the whole asset if the range is ignored upstream.
+        """
+        headers: dict[str, str] = {"Accept": "application/octet-stream"}
+        if range_header is not None:
+            headers["Range"] = range_header
+        try:
+            url = await self.resolve_asset_url(url)
+            response: ClientResponse = await self.request(url, headers=headers, operation="asset")
+        except GithubRateLimitError as exception:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=str(exception),
+                headers={"Retry-After": str(int(exception.retry_after) + 1)},
+            ) from exception
+        if response.status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            response.release()
+            raise HTTPException(status_code=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, detail="Range not satisfiable")
+        if response.status not in (HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT):
+            response.release()
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_GATEWAY, detail=f"Failed to download asset: {response.status}"
+            )
+        return response
+
+    async def iter_asset_chunks(self, response: ClientResponse) -> AsyncGenerator[bytes, None]:
+        """Stream an opened asset in fixed size chunks, releasing the response at the end.
+
+        Chunks are read on demand, so a slow client pauses the upstream read once the
+        session read buffer is full instead of buffering the whole asset in memory.
+        """
+        try:
+            async for chunk in response.content.iter_chunked(self._session_pool.settings.download_chunk_size):
+                yield chunk
+        finally:
+            response.release()
 
     async def download_asset(self, url: str) -> AsyncGenerator[bytes, None]:
         """Download asset."""
-        async with self.acquire_session(
-            headers={"Accept": "application/octet-stream"},
-        ) as session:
-            async with session.get(url) as response:
-                async for content in response.content:
-                    yield content
+        response: ClientResponse = await self.open_asset(url)
+        async for chunk in self.iter_asset_chunks(response):
+            yield chunk
+
+
+def is_package_filename(filename: str, asset_pattern: str | None = None) -> bool:
+    """Check if a file name is a package distribution, matching the asset pattern if any."""
+    if asset_pattern is not None and not fnmatch.fnmatchcase(filename, asset_pattern):
+        return False
+    return filename.endswith(".tar.gz") or filename.endswith(".whl")
+
+
+def is_package_asset(asset: GithubReleaseAssetObject, asset_pattern: str | None = None) -> bool:
+    """Check if a release asset is a package distribution, matching the asset pattern if any."""
+    return is_package_filename(asset.name, asset_pattern)
 
 
 def transform_release_to_package_version(
-    release: GithubReleaseObject,
+    release: GithubReleaseObject, asset_pattern: str | None = None
 ) -> list[PackageVersion]:
     """Transform release to package version."""
     package_version_list: list[PackageVersion] = []
 
     for asset in release.assets:
-        if asset.name.endswith(".tar.gz") or asset.name.endswith(".whl"):
+        if is_package_asset(asset, asset_pattern):
             package_version_list.append(PackageVersion(asset.name))
 
     return package_version_list
 
 
+def transform_release_to_package_files(
+    release: GithubReleaseObject, asset_pattern: str | None = None
+) -> list[IntegrationPackageFile]:
+    """Transform release to package files.
+
+    Content types are interned, a catalog holding a handful of them for all its files.
+    """
+    return [
+        {
+            "filename": PackageVersion(asset.name),
+            "url": asset.url,
+            "digest": asset.digest or None,
+            "content_type": sys.intern(asset.content_type),
+            "size": asset.size,
+        }
+        for asset in release.assets
+        if is_package_asset(asset, asset_pattern)
+    ]
+
+
+def build_release_record(release: GithubReleaseObject) -> GithubReleaseRecord:
+    """Build the record of a release, with the package files of all its distributions."""
+    return GithubReleaseRecord(release.tag_name, transform_release_to_package_files(release))
+
+
 class GithubRepository:
     """Github repository."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         github_token: GithubToken,
         repository: GithubRepositoryReference,
         integration_id: IntegrationId,
+        session_pool: GithubSessionPool | None = None,
+        *,
+        parallel_pages: bool = False,
+        rate_limit_governor: GithubRateLimitGovernor | None = None,
+        shared_cache: SharedCache | None = None,
     ) -> None:
         """Initialize Github release API."""
         self._github_token: GithubToken = github_token
         self._repository: GithubRepositoryReference = repository
         self._integration_id: IntegrationId = integration_id
-        self._api: GithubRepositoryApi = GithubRepositoryApi(github_token, repository)
+        self._api: GithubRepositoryApi = GithubRepositoryApi(
+            github_token,
+            repository,
+            session_pool,
+            parallel_pages=parallel_pages,
+            rate_limit_governor=rate_limit_governor,
+            shared_cache=shared_cache,
+        )
+
+    async def close(self) -> None:
+        """Close the repository API."""
+        await self._api.close()
 
     async def get_index(self) -> IntegrationPackageIndex:
         """Get index."""
-        releases: list[GithubReleaseObject] = await self._api.retrieve_releases()
         package_version_list: list[PackageVersion] = []
-        for release in releases:
-            package_version_list.extend(transform_release_to_package_version(release))
+        package_file_list: list[IntegrationPackageFile] = []
+        asset_pattern: str | None = self._repository.get("asset_pattern")
+        async for releases in self._api.iter_release_pages():
+            for release in releases:
+                package_files: list[IntegrationPackageFile] = (
+                    release.package_files
+                    if asset_pattern is None
+                    else [
+                        package_file
+                        for package_file in release.package_files
+                        if is_package_filename(package_file["filename"], asset_pattern)
+                    ]
+                )
+                package_file_list.extend(package_files)
+                package_version_list.extend(package_file["filename"] for package_file in package_files)
         package_name: PackageName = self._repository["package_name"] or PackageName(self._repository["name"])
         return {
             "integration_id": self._integration_id,
             "package_name": package_name,
             "package_version_list": package_version_list,
+            "package_file_list": package_file_list,
         }
 
+    async def get_download_redirect(self, package_file: IntegrationPackageFile) -> str | None:
+        """Get the signed URL of a package file, `None` if Github serves it without redirecting."""
+        return await self._api.resolve_signed_url(package_file["url"])
+
     async def get_download_package(
-        self,
-        package_name: PackageName,  # pylint: disable=unused-argument
-        package_version: PackageVersion,
-    ) -> AsyncGenerator[bytes, None]:
-        """Get download package."""
-        releases: list[GithubReleaseObject] = await self._api.retrieve_releases()
-        # we must retrieve the asset url from the release
-        asset_url: str | None = None
-        for release in releases:
-            for asset in release.assets:
-                if asset.name == package_version:
-                    asset_url = asset.url
-                    break
-            if asset_url is not None:
-                break
-        if asset_url is None:
-            raise HTTPException(status_code=404, detail="Package version not found")
+        self, package_file: IntegrationPackageFile, range_header: str | None = None
+    ) -> IntegrationPackageDownload:
+        """Get download package.
 
-        return self._api.download_asset(asset_url)
+        The asset URL is taken from the index, no release listing is needed.
+        """
+        response: ClientResponse = await self._api.open_asset(package_file["url"], range_header)
+        content_range: str | None = None
+        content_length: int | None = response.content_length
+        if response.status == HTTPStatus.PARTIAL_CONTENT:
+            content_range = response.headers.get("Content-Range", None)
+        elif content_length is None or response.headers.get("Content-Encoding") is not None:
+            content_length = package_file["size"]
+        return {
+            "filename": package_file["filename"],
+            "content": self._api.iter_asset_chunks(response),
+            "content_length": content_length,
+            "content_type": package_file["content_type"] or response.content_type,
+            "content_range": content_range,
+        }
@@ -0,0 +1,64 @@
+"""Github HTTP session pool."""
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from pydantic import BaseModel, Field
+
+
+class GithubSessionSettings(BaseModel):
+    """Github HTTP session settings."""
+
+    limit: int = Field(default=100, ge=0, description="Maximum number of connections, 0 for no limit.")
+    limit_per_host: int = Field(default=20, ge=0, description="Maximum number of connections per host.")
+    keepalive_timeout: float = Field(default=30.0, gt=0, description="Seconds an idle connection is kept open.")
+    dns_cache_ttl: int | None = Field(default=300, ge=0, description="Seconds DNS lookups are cached.")
+    connect_timeout: float | None = Field(default=10.0, gt=0, description="Seconds to establish a connection.")
+    read_timeout: float | None = Field(default=60.0, gt=0, description="Seconds to wait for data on a socket.")
+    read_bufsize: int = Field(
+        default=2**18, gt=0, description="Bytes buffered per response before reading from the socket is paused."
+    )
+    download_chunk_size: int = Field(default=2**16, gt=0, description="Bytes per chunk when streaming assets.")
+
+
+class GithubSessionPool:
+    """Long-lived HTTP session shared by all repositories of an integration.
+
+    The session is created lazily, inside the running event loop, and keeps
+    connections to api.github.com and the asset hosts alive between requests.
+    """
+
+    def __init__(self, settings: GithubSessionSettings | None = None) -> None:
+        """Initialize Github session pool."""
+        self._settings: GithubSessionSettings = settings or GithubSessionSettings()
+        self._session: ClientSession | None = None
+
+    @property
+    def settings(self) -> GithubSessionSettings:
+        """Get session settings."""
+        return self._settings
+
+    @property
+    def session(self) -> ClientSession:
+        """Get the shared session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self._settings.limit,
+                    limit_per_host=self._settings.limit_per_host,
+                    keepalive_timeout=self._settings.keepalive_timeout,
+                    ttl_dns_cache=self._settings.dns_cache_ttl,
+                    use_dns_cache=self._settings.dns_cache_ttl is not None,
+                ),
+                timeout=ClientTimeout(
+                    total=None,
+                    sock_connect=self._settings.connect_timeout,
+                    sock_read=self._settings.read_timeout,
+                ),
+                read_bufsize=self._settings.read_bufsize,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,6 +1,7 @@
 """Github types."""
 
-from typing import NewType, TypedDict
+from enum import StrEnum
+from typing import NewType, NotRequired, TypedDict
 
 from ..abstracts import PackageName
 
@@ -19,9 +20,39 @@ def get_github_repository_slug(
     return GithubRepositorySlug(f"{namespace}/{name}")
 
 
+class GithubDownloadMode(StrEnum):
+    """How package files are served to clients."""
+
+    # Files are streamed through the broker
+    PROXY = "proxy"
+    # Clients are redirected to the short-lived signed URL of the asset
+    REDIRECT = "redirect"
+
+
 class GithubRepositoryReference(TypedDict):
     """Github repository."""
 
     namespace: GithubNamespace
     name: GithubRepositoryName
     package_name: PackageName | None
+    # Glob the release asset names must match, on top of being distributions
+    asset_pattern: NotRequired[str | None]
+    # Number of seconds between two background refreshes, the refresher interval if `None`
+    refresh_interval: NotRequired[float | None]
+
+
+class GithubOrganizationReference(TypedDict):
+    """Github organization, or user, whose repositories are discovered."""
+
+    namespace: GithubNamespace
+    # Glob the release asset names must match, on top of being distributions
+    asset_pattern: NotRequired[str | None]
+    # Number of seconds between two background refreshes, the refresher interval if `None`
+    refresh_interval: NotRequired[float | None]
+
+
+def get_github_organization_source(namespace: GithubNamespace) -> GithubRepositorySlug:
+    """Get the source refreshing all discovered repositories of a namespace."""
+    if namespace == "":
+        raise ValueError("Namespace must be set")
+    return GithubRepositorySlug(f"{namespace}/*")
@@ -0,0 +1,60 @@
+"""Package index lookup."""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .abstracts import (
+    IntegrationPackageFile,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+    normalize_package_name,
+)
+
+
+def build_package_files(package_index: IntegrationPackageIndex) -> dict[PackageVersion, IntegrationPackageFile]:
+    """Build the files of a package by file name, the first file with a name wins."""
+    package_files: dict[PackageVersion, IntegrationPackageFile] = {}
+    for package_file in package_index["package_file_list"]:
+        package_files.setdefault(package_file["filename"], package_file)
+    return package_files
+
+
+class PackageIndexLookup:
+    """Immutable lookup of packages and files, built once per index refresh.
+
+    Package names are normalized as defined by PEP 503. When several indexes expose
+    the same package, the first one wins. Files are looked up by package then by file
+    name, sparing a key tuple per file.
+    """
+
+    __slots__ = ("_files", "_packages")
+
+    def __init__(self, index: list[IntegrationPackageIndex]) -> None:
+        """Build the lookup from an index."""
+        packages: dict[PackageName, IntegrationPackageIndex] = {}
+        files: dict[PackageName, dict[PackageVersion, IntegrationPackageFile]] = {}
+        for package_index in index:
+            package_name: PackageName = normalize_package_name(package_index["package_name"])
+            if package_name in packages:
+                continue
+            packages[package_name] = package_index
+            files[package_name] = build_package_files(package_index)
+        self._packages: Mapping[PackageName, IntegrationPackageIndex] = MappingProxyType(packages)
+        self._files: Mapping[PackageName, dict[PackageVersion, IntegrationPackageFile]] = MappingProxyType(files)
+
+    @property
+    def packages(self) -> Mapping[PackageName, IntegrationPackageIndex]:
+        """Get package indexes by normalized package name."""
+        return self._packages
+
+    def get_package(self, package_name: str) -> IntegrationPackageIndex | None:
+        """Get the index of a package."""
+        return self._packages.get(normalize_package_name(package_name))
+
+    def get_file(self, package_name: str, filename: str) -> IntegrationPackageFile | None:
+        """Get a file of a package."""
+        package_files: dict[PackageVersion, IntegrationPackageFile] | None = self._files.get(
+            normalize_package_name(package_name)
+        )
+        return package_files.get(PackageVersion(filename)) if package_files is not None else None
@@ -0,0 +1,82 @@
+"""JSON Renderer Package, implements the PEP 691 simple API."""
+
+import json
+from abc import ABC
+from typing import Any, NotRequired, Self, TypedDict
+
+from .distributions import get_distribution_version
+
+JSON_API_VERSION: str = "1.1"
+
+
+class AbstractJsonRenderer(ABC):
+    """Abstract JSON Renderer."""
+
+    @classmethod
+    def build_json(cls, content: dict[str, Any]) -> str:
+        """Build JSON."""
+        return json.dumps({"meta": {"api-version": JSON_API_VERSION}, **content}, separators=(",", ":"))
+
+
+class JsonProjectItem(TypedDict):
+    """JSON Project Item."""
+
+    name: str
+
+
+# JSON File Item, functional syntax as PEP 658 keys are not identifiers
+JsonFileItem = TypedDict(
+    "JsonFileItem",
+    {
+        "filename": str,
+        "url": str,
+        "hashes": dict[str, str],
+        "size": NotRequired[int],
+        "core-metadata": NotRequired[bool],
+        "dist-info-metadata": NotRequired[bool],
+    },
+)
+
+
+class JsonProjectListRenderer(AbstractJsonRenderer):
+    """JSON Project List Renderer."""
+
+    def __init__(self) -> None:
+        """Initialize JSON Project List Renderer."""
+        self.projects: list[JsonProjectItem] = []
+
+    def add_projects(self, projects: list[JsonProjectItem]) -> Self:
+        """Add projects to JSON Project List Renderer."""
+        self.projects.extend(projects)
+        return self
+
+    def build(self) -> str:
+        """Build JSON Project List."""
+        return self.build_json({"projects": self.projects})
+
+
+class JsonProjectRenderer(AbstractJsonRenderer):
+    """JSON Project Renderer."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize JSON Project Renderer."""
+        self.name: str = name
+        self.files: list[JsonFileItem] = []
+
+    def add_files(self, files: list[JsonFileItem]) -> Self:
+        """Add files to JSON Project Renderer."""
+        self.files.extend(files)
+        return self
+
+    def build_versions(self) -> list[str]:
+        """Build the versions of the project from its file names."""
+        versions: dict[str, None] = {}
+        for file in self.files:
+            version: str | None = get_distribution_version(file["filename"])
+            if version is not None:
+                versions[version] = None
+        return list(versions)
+
+    def build(self) -> str:
+        """Build JSON Project."""
+        return self.build_json({"name": self.name, "versions": self.build_versions(), "files": self.files})
@@ -0,0 +1,171 @@
+"""Prometheus metrics."""
+
+import os
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from .integrations.abstracts import AbstractIntegration, IntegrationMetric
+from .integrations.cache import CachedIntegration, CacheStatistics
+
+_SIZE_BUCKETS: tuple[float, ...] = tuple(float(2**exponent) for exponent in range(10, 34, 2))
+
+HTTP_REQUEST_DURATION: Histogram = Histogram(
+    "pep503_http_request_duration_seconds",
+    "Time to answer a request, until the response starts for streamed responses.",
+    ["route", "method", "status"],
+)
+GITHUB_REQUEST_DURATION: Histogram = Histogram(
+    "pep503_github_request_duration_seconds",
+    "Time to receive the response headers of a Github request.",
+    ["operation"],
+)
+GITHUB_RESPONSES: Counter = Counter(
+    "pep503_github_responses",
+    "Github responses by status.",
+    ["operation", "status"],
+)
+CACHE_REQUESTS: Counter = Counter(
+    "pep503_cache_requests",
+    "Cache lookups by result.",
+    ["cache", "result"],
+)
+DOWNLOAD_BYTES: Counter = Counter(
+    "pep503_download_bytes",
+    "Bytes streamed to clients by origin of the content.",
+    ["origin"],
+)
+DOWNLOAD_SIZE: Histogram = Histogram(
+    "pep503_download_size_bytes",
+    "Bytes streamed per download.",
+    ["origin"],
+    buckets=_SIZE_BUCKETS,
+)
+DOWNLOAD_REDIRECTS: Counter = Counter(
+    "pep503_download_redirects",
+    "Downloads redirected to a signed upstream URL instead of being streamed.",
+)
+DOWNLOADS_IN_FLIGHT: Gauge = Gauge(
+    "pep503_downloads_in_flight",
+    "Downloads being streamed.",
+    multiprocess_mode="livesum",
+)
+INDEX_REFRESH_DURATION: Histogram = Histogram(
+    "pep503_index_refresh_duration_seconds",
+    "Time to refresh the index of a source.",
+    ["source", "result"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+
+async def count_download(content: AsyncIterator[bytes], origin: str) -> AsyncIterator[bytes]:
+    """Stream a download while counting its bytes and the downloads in flight."""
+    size: int = 0
+    DOWNLOADS_IN_FLIGHT.inc()
+    try:
+        async for chunk in content:
+            size += len(chunk)
+            DOWNLOAD_BYTES.labels(origin).inc(len(chunk))
+            yield chunk
+    finally:
+        DOWNLOADS_IN_FLIGHT.dec()
+        DOWNLOAD_SIZE.labels(origin).observe(size)
+
+
+def count_file_download(size: int, origin: str) -> None:
+    """Count a download served at once from a file."""
+    DOWNLOAD_BYTES.labels(origin).inc(size)
+    DOWNLOAD_SIZE.labels(origin).observe(size)
+
+
+class InstrumentedRoute(APIRoute):
+    """Route observing the latency of its requests."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """Wrap the route handler with a latency observation."""
+        handler: Callable[[Request], Coroutine[Any, Any, Response]] = super().get_route_handler()
+        route: str = self.path_format
+
+        async def _instrumented_handler(request: Request) -> Response:
+            started_at: float = time.perf_counter()
+            status: int = 500
+            try:
+                response: Response = await handler(request)
+                status = response.status_code
+                return response
+            except Exception as exception:
+                status = getattr(exception, "status_code", 500)
+                raise
+            finally:
+                HTTP_REQUEST_DURATION.labels(route, request.method, str(status)).observe(
+                    time.perf_counter() - started_at
+                )
+
+        return _instrumented_handler
+
+
+class IntegrationCollector(Collector):
+    """Collector of the metrics sampled from the integrations."""
+
+    def __init__(self, integrations: list[AbstractIntegration]) -> None:
+        """Initialize integration collector."""
+        self._integrations: list[AbstractIntegration] = integrations
+
+    def collect(self) -> Iterable[Metric]:
+        """Collect the integration metrics and the index cache statistics."""
+        gauges: dict[str, GaugeMetricFamily] = {}
+        index_cache: CounterMetricFamily = CounterMetricFamily(
+            "pep503_index_cache_requests", "Index cache lookups by result.", labels=["integration_id", "result"]
+        )
+        for integration in self._integrations:
+            metric: IntegrationMetric
+            for metric in integration.get_metrics():
+                name: str = f"pep503_{metric['name']}"
+                if name not in gauges:
+                    gauges[name] = GaugeMetricFamily(name, metric["description"], labels=list(metric["labels"]))
+                gauges[name].add_metric(list(metric["labels"].values()), metric["value"])
+            if isinstance(integration, CachedIntegration):
+                statistics: CacheStatistics = integration.statistics
+                for result, value in (
+                    ("hit", statistics["hits"]),
+                    ("stale_hit", statistics["stale_hits"]),
+                    ("miss", statistics["misses"]),
+                ):
+                    index_cache.add_metric([str(integration.id), result], value)
+        yield from gauges.values()
+        yield index_cache
+
+
+def render_metrics(integrations: list[AbstractIntegration]) -> Response:
+    """Render the metrics in the Prometheus text format.
+
+    In the multi-worker mode, `PROMETHEUS_MULTIPROC_DIR` aggregates the metrics of all
+    processes.
+    """
+    registry: CollectorRegistry
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    integration_registry: CollectorRegistry = CollectorRegistry(auto_describe=False)
+    integration_registry.register(IntegrationCollector(integrations))
+    return Response(
+        content=generate_latest(registry) + generate_latest(integration_registry),
+        media_type=CONTENT_TYPE_LATEST,
+    )
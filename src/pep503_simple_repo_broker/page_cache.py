@@ -0,0 +1,135 @@
+"""Pre-rendered and pre-compressed pages."""
+
+import gzip
+import hashlib
+import importlib
+from collections.abc import Callable
+from http import HTTPStatus
+from types import ModuleType
+
+from fastapi import Request, Response
+
+from .metrics import CACHE_REQUESTS
+
+try:
+    brotli: ModuleType | None = importlib.import_module("brotli")
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+IDENTITY_ENCODING: str = "identity"
+# Preferred first when the client accepts several encodings with the same quality
+SUPPORTED_ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def parse_quality_values(header: str) -> dict[str, float]:
+    """Parse an `Accept` or `Accept-Encoding` header into qualities by value."""
+    qualities: dict[str, float] = {}
+    for item in header.split(","):
+        parts: list[str] = [part.strip() for part in item.split(";")]
+        if parts[0] == "":
+            continue
+        quality: float = 1.0
+        for parameter in parts[1:]:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[parts[0].lower()] = quality
+    return qualities
+
+
+def parse_if_none_match(if_none_match: str) -> set[str]:
+    """Parse an `If-None-Match` header into entity tags, weak tags are compared as strong ones."""
+    return {tag.strip().removeprefix("W/") for tag in if_none_match.split(",") if tag.strip() != ""}
+
+
+class RenderedPage:
+    """Page rendered once, with its compressed variants and entity tags."""
+
+    __slots__ = ("contents", "etags", "media_type")
+
+    def __init__(self, body: bytes, media_type: str) -> None:
+        """Render the compressed variants of a page body."""
+        self.media_type: str = media_type
+        self.contents: dict[str, bytes] = {IDENTITY_ENCODING: body}
+        for encoding in SUPPORTED_ENCODINGS:
+            compressed: bytes = self.compress(body, encoding)
+            if len(compressed) < len(body):
+                self.contents[encoding] = compressed
+        body_hash: str = hashlib.sha256(body).hexdigest()[:32]
+        self.etags: dict[str, str] = {
+            encoding: f'"{body_hash}"' if encoding == IDENTITY_ENCODING else f'"{body_hash}-{encoding}"'
+            for encoding in self.contents
+        }
+
+    @classmethod
+    def compress(cls, body: bytes, encoding: str) -> bytes:
+        """Compress a body."""
+        if encoding == "gzip":
+            return gzip.compress(body, compresslevel=9, mtime=0)
+        if encoding == "br" and brotli is not None:
+            compressed: bytes = brotli.compress(body)
+            return compressed
+        raise ValueError(f"Unsupported encoding {encoding}")
+
+    def negotiate_encoding(self, accept_encoding: str | None) -> str:
+        """Select the best available encoding accepted by the client."""
+        if not accept_encoding:
+            return IDENTITY_ENCODING
+        qualities: dict[str, float] = parse_quality_values(accept_encoding)
+        default_quality: float = qualities.get("*", 0.0)
+        best_encoding: str = IDENTITY_ENCODING
+        best_quality: float = 0.0
+        for encoding in SUPPORTED_ENCODINGS:
+            quality: float = qualities.get(encoding, default_quality)
+            if encoding in self.contents and quality > best_quality:
+                best_encoding, best_quality = encoding, quality
+        return best_encoding
+
+    def to_response(self, request: Request) -> Response:
+        """Build the response of the page for a request.
+
+        Answers 304 Not Modified when the client already holds a variant of the page.
+        """
+        encoding: str = self.negotiate_encoding(request.headers.get("Accept-Encoding"))
+        headers: dict[str, str] = {"ETag": self.etags[encoding], "Vary": "Accept, Accept-Encoding"}
+        if_none_match: str | None = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags: set[str] = parse_if_none_match(if_none_match)
+            if "*" in tags or not tags.isdisjoint(self.etags.values()):
+                return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+        if encoding != IDENTITY_ENCODING:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.contents[encoding], media_type=self.media_type, headers=headers)
+
+
+class RenderedPageCache:
+    """Rendered pages of the current index generation.
+
+    Pages are rendered on first use and kept until the index generation changes, or
+    until the revision of their page changes within the generation.
+    """
+
+    def __init__(self) -> None:
+        """Initialize rendered page cache."""
+        self._generation: int | None = None
+        # Pages and the revision they were rendered from, by key
+        self._pages: dict[tuple[str, ...], tuple[int, RenderedPage]] = {}
+
+    def get(
+        self, generation: int, key: tuple[str, ...], render: Callable[[], RenderedPage], revision: int = 0
+    ) -> RenderedPage:
+        """Get a rendered page, rendering it if needed."""
+        if generation != self._generation:
+            # Swap the whole mapping so the previous generation is released at once
+            self._pages = {}
+            self._generation = generation
+        cached: tuple[int, RenderedPage] | None = self._pages.get(key)
+        if cached is not None and cached[0] == revision:
+            CACHE_REQUESTS.labels("page", "hit").inc()
+            return cached[1]
+        CACHE_REQUESTS.labels("page", "miss").inc()
+        page: RenderedPage = render()
+        self._pages[key] = (revision, page)
+        return page
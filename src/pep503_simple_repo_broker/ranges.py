@@ -0,0 +1,153 @@
+"""HTTP byte ranges of package downloads, as defined by RFC 9110."""
+
+import re
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+
+# First and last byte offsets, both inclusive
+ByteRange = tuple[int, int]
+# Range requested by a client, first and last offsets or the suffix length when the first is missing
+RangeSpec = tuple[int | None, int | None]
+# Opens the content of a byte range, the content may start before the range and go past it
+RangeOpener = Callable[[ByteRange], Awaitable[tuple[AsyncIterator[bytes], int]]]
+
+# Beyond this number of ranges a `Range` header is ignored, a client asking more is likely abusive
+MAX_RANGES: int = 16
+_RANGE_SPEC: re.Pattern[str] = re.compile(r"^\s*(?P<start>\d*)\s*-\s*(?P<end>\d*)\s*$")
+_CONTENT_RANGE: re.Pattern[str] = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<size>\d+|\*)$")
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when none of the requested ranges overlap the file."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize range not satisfiable error."""
+        super().__init__(f"Range not satisfiable for a size of {size}")
+        self.size: int = size
+
+
+def parse_range_header(range_header: str | None) -> list[RangeSpec] | None:
+    """Parse a `Range` header, `None` when it is missing, invalid or not in bytes and must be ignored."""
+    if range_header is None:
+        return None
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or ranges == "":
+        return None
+    specs: list[RangeSpec] = []
+    for spec in ranges.split(","):
+        match: re.Match[str] | None = _RANGE_SPEC.match(spec)
+        if match is None or (match["start"] == "" and match["end"] == ""):
+            return None
+        start: int | None = int(match["start"]) if match["start"] != "" else None
+        end: int | None = int(match["end"]) if match["end"] != "" else None
+        if start is not None and end is not None and end < start:
+            return None
+        specs.append((start, end))
+    if len(specs) > MAX_RANGES:
+        return None
+    return specs
+
+
+def resolve_ranges(specs: list[RangeSpec], size: int) -> list[ByteRange]:
+    """Resolve the requested ranges against the size of the file, overlapping ones being coalesced.
+
+    Raises:
+        RangeNotSatisfiableError: No range overlaps the file.
+    """
+    byte_ranges: list[ByteRange] = []
+    for start, end in specs:
+        if start is None:
+            # Suffix range, the last `end` bytes
+            if end == 0 or size == 0:
+                continue
+            byte_ranges.append((max(0, size - (end or 0)), size - 1))
+        elif start < size:
+            byte_ranges.append((start, size - 1 if end is None else min(end, size - 1)))
+    if not byte_ranges:
+        raise RangeNotSatisfiableError(size)
+    coalesced: list[ByteRange] = []
+    for start, end in sorted(byte_ranges):
+        if coalesced and start <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def if_range_matches(if_range: str | None, etag: str | None) -> bool:
+    """Check an `If-Range` condition, only a strong entity tag equal to the current one matches.
+
+    Downloads have no modification date, an `If-Range` holding a date never matches and
+    the whole file is served instead.
+    """
+    if if_range is None:
+        return True
+    return etag is not None and not if_range.startswith("W/") and if_range.strip() == etag
+
+
+def format_content_range(byte_range: ByteRange, size: int | None) -> str:
+    """Format the `Content-Range` of a byte range."""
+    return f"bytes {byte_range[0]}-{byte_range[1]}/{size if size is not None else '*'}"
+
+
+def parse_content_range_start(content_range: str | None) -> int | None:
+    """Parse the offset of the first byte of a `Content-Range`, `None` if missing or invalid."""
+    if content_range is None:
+        return None
+    match: re.Match[str] | None = _CONTENT_RANGE.match(content_range)
+    return int(match["start"]) if match is not None else None
+
+
+async def slice_content(
+    content: AsyncIterator[bytes], content_start: int, byte_range: ByteRange
+) -> AsyncGenerator[bytes, None]:
+    """Stream the part of a content within a byte range, the content starting at `content_start`.
+
+    The content is closed as soon as the range is streamed, releasing its upstream connection.
+    """
+    offset: int = content_start
+    try:
+        async for chunk in content:
+            chunk_end: int = offset + len(chunk)
+            if chunk_end > byte_range[0]:
+                yield chunk[max(0, byte_range[0] - offset) : byte_range[1] + 1 - offset]
+            offset = chunk_end
+            if offset > byte_range[1]:
+                break
+    finally:
+        aclose: Callable[[], Awaitable[None]] | None = getattr(content, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def build_multipart_part_header(boundary: str, content_type: str, byte_range: ByteRange, size: int) -> bytes:
+    """Build the delimiter and headers of a part of a `multipart/byteranges` body."""
+    return (
+        f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+        f"Content-Range: {format_content_range(byte_range, size)}\r\n\r\n"
+    ).encode()
+
+
+def build_multipart_end(boundary: str) -> bytes:
+    """Build the closing delimiter of a `multipart/byteranges` body."""
+    return f"--{boundary}--\r\n".encode()
+
+
+def get_multipart_length(boundary: str, content_type: str, byte_ranges: list[ByteRange], size: int) -> int:
+    """Get the length of a `multipart/byteranges` body."""
+    return sum(
+        len(build_multipart_part_header(boundary, content_type, byte_range, size)) + byte_range[1] - byte_range[0] + 3
+        for byte_range in byte_ranges
+    ) + len(build_multipart_end(boundary))
+
+
+async def iter_multipart(
+    boundary: str, content_type: str, byte_ranges: list[ByteRange], size: int, open_range: RangeOpener
+) -> AsyncGenerator[bytes, None]:
+    """Stream a `multipart/byteranges` body, the ranges being opened one after the other."""
+    for byte_range in byte_ranges:
+        yield build_multipart_part_header(boundary, content_type, byte_range, size)
+        content, content_start = await open_range(byte_range)
+        async for chunk in slice_content(content, content_start, byte_range):
+            yield chunk
+        yield b"\r\n"
+    yield build_multipart_end(boundary)
@@ -0,0 +1,46 @@
+"""Readiness of the integration indexes."""
+
+from typing import TypedDict
+
+from .integrations.abstracts import AbstractIntegration, IntegrationId, IntegrationIndexError
+
+
+class IntegrationReadiness(TypedDict):
+    """Readiness of the index of an integration."""
+
+    integration_id: IntegrationId
+    ready: bool
+    # Seconds since the stalest part of the index was fetched, `None` until it is populated
+    index_age: float | None
+    errors: list[IntegrationIndexError]
+
+
+class Readiness(TypedDict):
+    """Readiness of all integrations."""
+
+    ready: bool
+    max_index_age: float | None
+    integrations: list[IntegrationReadiness]
+
+
+def get_integration_readiness(integration: AbstractIntegration, max_index_age: float | None) -> IntegrationReadiness:
+    """Get the readiness of an integration, ready once its index is populated and not older than `max_index_age`."""
+    index_age: float | None = integration.get_index_age()
+    return {
+        "integration_id": integration.id,
+        "ready": index_age is not None and (max_index_age is None or index_age <= max_index_age),
+        "index_age": index_age,
+        "errors": integration.get_index_errors(),
+    }
+
+
+def get_readiness(integrations: list[AbstractIntegration], max_index_age: float | None) -> Readiness:
+    """Get the readiness of the integrations, ready once all of them are."""
+    integration_readinesses: list[IntegrationReadiness] = [
+        get_integration_readiness(integration, max_index_age) for integration in integrations
+    ]
+    return {
+        "ready": all(integration_readiness["ready"] for integration_readiness in integration_readinesses),
+        "max_index_age": max_index_age,
+        "integrations": integration_readinesses,
+    }
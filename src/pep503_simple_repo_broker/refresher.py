@@ -0,0 +1,129 @@
+"""Background refresh of the integration indexes."""
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .integrations.abstracts import AbstractIntegration, IntegrationId
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+class IndexRefresher:
+    """Scheduler refreshing each source of the integrations on its own jittered interval.
+
+    Every source is refreshed once at start, then every `interval` seconds unless its
+    integration sets another interval for it. A failing source is retried with an
+    exponential backoff, from `retry_delay` up to `max_backoff` seconds. Delays are
+    spread by `jitter` so sources do not hit upstream all at once.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        integrations: list[AbstractIntegration],
+        interval: float,
+        *,
+        jitter: float = 0.1,
+        retry_delay: float = 5.0,
+        max_backoff: float = 600.0,
+        max_concurrency: int = 8,
+        on_refresh: Callable[[], Awaitable[Any]] | None = None,
+    ) -> None:
+        """Initialize index refresher.
+
+        Args:
+            integrations: Integrations to refresh the sources of.
+            interval: Default number of seconds between two refreshes of a source.
+            jitter: Fraction of the delays randomly added or removed.
+            retry_delay: Number of seconds before the first retry of a failing source.
+            max_backoff: Maximum number of seconds between two retries of a failing source.
+            max_concurrency: Maximum number of sources refreshed at the same time.
+            on_refresh: Coroutine function called after each successful refresh of a source.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self._integrations: list[AbstractIntegration] = integrations
+        self._interval: float = interval
+        self._jitter: float = jitter
+        self._retry_delay: float = retry_delay
+        self._max_backoff: float = max_backoff
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._on_refresh: Callable[[], Awaitable[Any]] | None = on_refresh
+        self._tasks: dict[tuple[IntegrationId, str], asyncio.Task[None]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Check if the refresher is running."""
+        return bool(self._tasks)
+
+    def get_delay(self, failures: int, interval: float | None = None) -> float:
+        """Get the jittered delay before the next refresh of a source."""
+        delay: float = (
+            (interval or self._interval)
+            if failures == 0
+            else min(self._max_backoff, self._retry_delay * 2 ** (failures - 1))
+        )
+        return delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    async def refresh_source(self, integration: AbstractIntegration, source: str) -> None:
+        """Refresh a source of an integration, bounded by the concurrency limit."""
+        async with self._semaphore:
+            await integration.refresh_source(source)
+        if self._on_refresh is not None:
+            await self._on_refresh()
+
+    async def run_source(self, integration: AbstractIntegration, source: str) -> None:
+        """Refresh a source forever."""
+        failures: int = 0
+        while True:
+            try:
+                await self.refresh_source(integration, source)
+                failures = 0
+            except Exception:  # pylint: disable=broad-exception-caught
+                failures += 1
+                _logger.warning("Failed to refresh source %s (%s failures)", source, failures, exc_info=True)
+            await asyncio.sleep(self.get_delay(failures, integration.get_source_refresh_interval(source)))
+
+    def start(self) -> None:
+        """Start refreshing the sources of all integrations."""
+        if self._tasks:
+            return
+        self.sync()
+
+    def sync(self, restarted_sources: list[str] | None = None) -> None:
+        """Follow the sources of the integrations after they changed.
+
+        Added sources are refreshed at once, removed ones are no longer refreshed.
+
+        Args:
+            restarted_sources: Sources refreshed at once, as if they were added.
+        """
+        sources: set[tuple[IntegrationId, str]] = set()
+        for integration in self._integrations:
+            for source in integration.get_sources():
+                key: tuple[IntegrationId, str] = (integration.id, source)
+                sources.add(key)
+                task: asyncio.Task[None] | None = self._tasks.get(key)
+                if task is not None and restarted_sources is not None and source in restarted_sources:
+                    task.cancel()
+                    task = None
+                if task is None:
+                    self._tasks[key] = asyncio.create_task(
+                        self.run_source(integration, source), name=f"refresh:{source}"
+                    )
+        for key in [key for key in self._tasks if key not in sources]:
+            self._tasks.pop(key).cancel()
+
+    async def stop(self) -> None:
+        """Stop refreshing."""
+        tasks: list[asyncio.Task[None]] = list(self._tasks.values())
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
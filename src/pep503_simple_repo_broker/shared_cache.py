@@ -0,0 +1,247 @@
+"""Cache shared by the replicas of the broker."""
+
+import asyncio
+import importlib
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import ModuleType
+from typing import Any
+
+try:
+    redis_asyncio: ModuleType | None = importlib.import_module("redis.asyncio")
+    redis_exceptions: ModuleType | None = importlib.import_module("redis.exceptions")
+except ImportError:  # pragma: no cover - optional dependency
+    redis_asyncio = None
+    redis_exceptions = None
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+
+class SharedCacheError(Exception):
+    """Shared cache unavailable."""
+
+
+class SharedCache(ABC):
+    """Cache of values and locks shared by the replicas of the broker.
+
+    Entries and locks expire on their own. An unavailable cache is logged and behaves
+    as an empty cache granting every lock, a replica then only loses the sharing.
+    """
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes | None:
+        """Read the value of a key, `None` if missing or expired.
+
+        Raises:
+            SharedCacheError: The cache is unavailable.
+        """
+
+    @abstractmethod
+    async def write(self, key: str, value: bytes, ttl: float) -> None:
+        """Write the value of a key, expiring after `ttl` seconds.
+
+        Raises:
+            SharedCacheError: The cache is unavailable.
+        """
+
+    @abstractmethod
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        """Acquire the lock of a key for `ttl` seconds unless already held, telling whether it is acquired.
+
+        Raises:
+            SharedCacheError: The cache is unavailable.
+        """
+
+    @abstractmethod
+    async def release(self, key: str, token: str) -> None:
+        """Release the lock of a key if still held with `token`.
+
+        Raises:
+            SharedCacheError: The cache is unavailable.
+        """
+
+    async def close(self) -> None:
+        """Close the connections to the cache."""
+
+    async def get(self, key: str) -> bytes | None:
+        """Get the value of a key, `None` if missing, expired or the cache is unavailable."""
+        try:
+            return await self.read(key)
+        except SharedCacheError as exception:
+            _logger.warning("Failed to read %s from the shared cache: %s", key, exception)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Set the value of a key for `ttl` seconds, nothing is stored when the cache is unavailable."""
+        if ttl <= 0:
+            return
+        try:
+            await self.write(key, value, ttl)
+        except SharedCacheError as exception:
+            _logger.warning("Failed to write %s to the shared cache: %s", key, exception)
+
+    async def get_json(self, key: str) -> Any:
+        """Get the JSON value of a key, `None` if missing or not valid JSON."""
+        value: bytes | None = await self.get(key)
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            _logger.warning("Ignoring invalid JSON of %s in the shared cache", key)
+            return None
+
+    async def set_json(self, key: str, value: Any, ttl: float) -> None:
+        """Set the JSON value of a key for `ttl` seconds."""
+        await self.set(key, json.dumps(value, separators=(",", ":")).encode(), ttl)
+
+    @asynccontextmanager
+    async def lock(
+        self, key: str, ttl: float, timeout: float | None = None, poll_interval: float = 0.05
+    ) -> AsyncIterator[bool]:
+        """Hold the lock of a key while in the context, polling for it when held by another replica.
+
+        The lock expires after `ttl` seconds, so a replica dying while holding it only delays
+        the others. The context is entered without the lock when it is not acquired within
+        `timeout` seconds, `ttl` by default, or the cache is unavailable.
+
+        Yields:
+            Whether the lock is held.
+        """
+        token: str = uuid.uuid4().hex
+        deadline: float = time.monotonic() + (ttl if timeout is None else timeout)
+        acquired: bool = False
+        try:
+            while not (acquired := await self.acquire(key, token, ttl)) and time.monotonic() < deadline:
+                await asyncio.sleep(poll_interval)
+        except SharedCacheError as exception:
+            _logger.warning("Failed to acquire lock %s from the shared cache: %s", key, exception)
+        else:
+            if not acquired:
+                _logger.warning("Timed out waiting for lock %s, going on without it", key)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    await self.release(key, token)
+                except SharedCacheError as exception:
+                    _logger.warning("Failed to release lock %s, it expires on its own: %s", key, exception)
+
+
+class MemorySharedCache(SharedCache):
+    """Shared cache held in memory, shared by the integrations of a single process."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """Initialize memory shared cache."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self._max_entries: int = max_entries
+        # Values and the monotonic time at which they expire, by key
+        self._entries: dict[str, tuple[bytes, float]] = {}
+        # Tokens of the held locks and the monotonic time at which they expire, by key
+        self._locks: dict[str, tuple[str, float]] = {}
+
+    async def read(self, key: str) -> bytes | None:
+        """Read the value of a key, `None` if missing or expired."""
+        entry: tuple[bytes, float] | None = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    async def write(self, key: str, value: bytes, ttl: float) -> None:
+        """Write the value of a key, evicting the expired then the oldest entries when full."""
+        now: float = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (value, now + ttl)
+        if len(self._entries) > self._max_entries:
+            self._entries = {name: entry for name, entry in self._entries.items() if entry[1] > now}
+            while len(self._entries) > self._max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        """Acquire the lock of a key unless held and not expired."""
+        now: float = time.monotonic()
+        held: tuple[str, float] | None = self._locks.get(key)
+        if held is not None and held[1] > now:
+            return False
+        self._locks[key] = (token, now + ttl)
+        return True
+
+    async def release(self, key: str, token: str) -> None:
+        """Release the lock of a key if still held with `token`."""
+        held: tuple[str, float] | None = self._locks.get(key)
+        if held is not None and held[0] == token:
+            del self._locks[key]
+
+
+class RedisSharedCache(SharedCache):
+    """Shared cache stored in Redis, requires the `redis` extra.
+
+    Locks are keys set only if missing, released by a script deleting them only when
+    they still hold the token of their owner.
+    """
+
+    # Deletes the lock only if not expired and acquired again by another replica meanwhile
+    RELEASE_SCRIPT: str = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, url: str, prefix: str = "pep503_simple_repo_broker:") -> None:
+        """Initialize Redis shared cache.
+
+        Args:
+            url: URL of the Redis server, as `redis://host:port/db`.
+            prefix: Prefix of the keys, separating the brokers sharing a Redis server.
+        """
+        if redis_asyncio is None:
+            raise RuntimeError("The redis package is required by the Redis shared cache, install the redis extra")
+        self._prefix: str = prefix
+        self._client: Any = redis_asyncio.Redis.from_url(url)
+
+    async def read(self, key: str) -> bytes | None:
+        """Read the value of a key, `None` if missing or expired."""
+        try:
+            value: bytes | None = await self._client.get(f"{self._prefix}{key}")
+        except redis_exceptions.RedisError as exception:  # type: ignore[union-attr]
+            raise SharedCacheError(str(exception)) from exception
+        return value
+
+    async def write(self, key: str, value: bytes, ttl: float) -> None:
+        """Write the value of a key, expiring after `ttl` seconds."""
+        try:
+            await self._client.set(f"{self._prefix}{key}", value, px=max(1, int(ttl * 1000)))
+        except redis_exceptions.RedisError as exception:  # type: ignore[union-attr]
+            raise SharedCacheError(str(exception)) from exception
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        """Acquire the lock of a key for `ttl` seconds unless already held."""
+        try:
+            acquired: bool | None = await self._client.set(
+                f"{self._prefix}lock:{key}", token, nx=True, px=max(1, int(ttl * 1000))
+            )
+        except redis_exceptions.RedisError as exception:  # type: ignore[union-attr]
+            raise SharedCacheError(str(exception)) from exception
+        return bool(acquired)
+
+    async def release(self, key: str, token: str) -> None:
+        """Release the lock of a key if still held with `token`."""
+        try:
+            await self._client.eval(self.RELEASE_SCRIPT, 1, f"{self._prefix}lock:{key}", token)
+        except redis_exceptions.RedisError as exception:  # type: ignore[union-attr]
+            raise SharedCacheError(str(exception)) from exception
+
+    async def close(self) -> None:
+        """Close the connections to Redis."""
+        await self._client.aclose()
@@ -0,0 +1,178 @@
+"""Wheel core metadata extraction, as served by PEP 658."""
+
+import asyncio
+import io
+import re
+import struct
+import zipfile
+import zlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from .metrics import CACHE_REQUESTS
+from .shared_cache import SharedCache
+
+# Reads a `Range` header worth of a file, returns the data, its start offset and the file size
+RangeReader = Callable[[str], Awaitable[tuple[bytes, int, int]]]
+
+_METADATA_PATH: re.Pattern[str] = re.compile(r"^[^/]+\.dist-info/METADATA$")
+_CONTENT_RANGE: re.Pattern[str] = re.compile(r"^bytes (?P<start>\d+)-\d+/(?P<size>\d+)$")
+_END_OF_CENTRAL_DIRECTORY_SIGNATURE: bytes = b"PK\x05\x06"
+_END_OF_CENTRAL_DIRECTORY_SIZE: int = 22
+_CENTRAL_DIRECTORY_HEADER_SIGNATURE: bytes = b"PK\x01\x02"
+_CENTRAL_DIRECTORY_HEADER: struct.Struct = struct.Struct("<4s6H3L5H2L")
+_LOCAL_FILE_HEADER_SIGNATURE: bytes = b"PK\x03\x04"
+_LOCAL_FILE_HEADER: struct.Struct = struct.Struct("<4s5H3L2H")
+_ZIP64_MARKER: int = 0xFFFFFFFF
+_COMPRESSION_STORED: int = 0
+_COMPRESSION_DEFLATED: int = 8
+# Bytes read past the expected entry end, to absorb a local extra field larger than the central one
+_LOCAL_HEADER_SLACK: int = 1024
+
+
+class WheelMetadataError(Exception):
+    """Raised when the metadata of a wheel cannot be extracted."""
+
+
+def parse_content_range(content_range: str | None, data: bytes) -> tuple[bytes, int, int]:
+    """Parse the `Content-Range` of a range read, a missing one means the whole file was returned."""
+    if content_range is None:
+        return data, 0, len(data)
+    match: re.Match[str] | None = _CONTENT_RANGE.match(content_range)
+    if match is None:
+        raise WheelMetadataError(f"Invalid Content-Range {content_range}")
+    return data, int(match["start"]), int(match["size"])
+
+
+def read_metadata_from_zip(data: bytes | Path) -> bytes:
+    """Read the core metadata of a whole wheel."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data) if isinstance(data, bytes) else data) as wheel:
+            for name in wheel.namelist():
+                if _METADATA_PATH.match(name):
+                    return wheel.read(name)
+    except zipfile.BadZipFile as exception:
+        raise WheelMetadataError("Invalid wheel") from exception
+    raise WheelMetadataError("No METADATA in wheel")
+
+
+def decompress_entry(data: bytes, compression: int) -> bytes:
+    """Decompress a zip entry."""
+    if compression == _COMPRESSION_STORED:
+        return data
+    if compression == _COMPRESSION_DEFLATED:
+        return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data)
+    raise WheelMetadataError(f"Unsupported compression method {compression}")
+
+
+def find_metadata_entry(central_directory: bytes) -> tuple[int, int, int, int]:
+    """Find the METADATA entry in a central directory.
+
+    Returns:
+        The compression method, compressed size, local header offset and name length.
+    """
+    position: int = 0
+    while position + _CENTRAL_DIRECTORY_HEADER.size <= len(central_directory):
+        fields: tuple[bytes | int, ...] = _CENTRAL_DIRECTORY_HEADER.unpack_from(central_directory, position)
+        if fields[0] != _CENTRAL_DIRECTORY_HEADER_SIGNATURE:
+            raise WheelMetadataError("Invalid central directory")
+        compression, compressed_size = int(fields[4]), int(fields[8])
+        name_length, extra_length, comment_length = int(fields[10]), int(fields[11]), int(fields[12])
+        local_header_offset: int = int(fields[16])
+        name_start: int = position + _CENTRAL_DIRECTORY_HEADER.size
+        name: str = central_directory[name_start : name_start + name_length].decode("utf-8", errors="replace")
+        if _METADATA_PATH.match(name):
+            if _ZIP64_MARKER in (compressed_size, local_header_offset):
+                raise WheelMetadataError("Zip64 entries are not supported")
+            return compression, compressed_size, local_header_offset, name_length
+        position = name_start + name_length + extra_length + comment_length
+    raise WheelMetadataError("No METADATA in wheel")
+
+
+async def read_metadata_from_ranges(read_range: RangeReader, tail_size: int = 2**16) -> bytes:
+    """Read the core metadata of a remote wheel with range reads.
+
+    The end of the file gives the central directory, which locates the METADATA entry,
+    so only a few kilobytes are transferred instead of the whole wheel. If the remote
+    ignores ranges, the whole wheel returned is read instead.
+    """
+    tail, tail_start, size = await read_range(f"bytes=-{tail_size}")
+    if tail_start == 0 and len(tail) == size:
+        return await asyncio.to_thread(read_metadata_from_zip, tail)
+
+    end_position: int = tail.rfind(_END_OF_CENTRAL_DIRECTORY_SIGNATURE)
+    if end_position < 0 or end_position + _END_OF_CENTRAL_DIRECTORY_SIZE > len(tail):
+        raise WheelMetadataError("End of central directory not found")
+    central_directory_size, central_directory_offset = struct.unpack_from("<2L", tail, end_position + 12)
+    if _ZIP64_MARKER in (central_directory_size, central_directory_offset):
+        raise WheelMetadataError("Zip64 archives are not supported")
+
+    if central_directory_offset >= tail_start:
+        relative_offset: int = central_directory_offset - tail_start
+        central_directory: bytes = tail[relative_offset : relative_offset + central_directory_size]
+    else:
+        central_directory, _, _ = await read_range(
+            f"bytes={central_directory_offset}-{central_directory_offset + central_directory_size - 1}"
+        )
+
+    compression, compressed_size, offset, name_length = find_metadata_entry(central_directory)
+    entry_end: int = min(size, offset + _LOCAL_FILE_HEADER.size + name_length + compressed_size + _LOCAL_HEADER_SLACK)
+    entry, _, _ = await read_range(f"bytes={offset}-{entry_end - 1}")
+    local_fields: tuple[bytes | int, ...] = _LOCAL_FILE_HEADER.unpack_from(entry, 0)
+    if local_fields[0] != _LOCAL_FILE_HEADER_SIGNATURE:
+        raise WheelMetadataError("Invalid local file header")
+    data_start: int = _LOCAL_FILE_HEADER.size + int(local_fields[9]) + int(local_fields[10])
+    if data_start + compressed_size > len(entry):
+        entry, _, _ = await read_range(f"bytes={offset}-{offset + data_start + compressed_size - 1}")
+    return decompress_entry(entry[data_start : data_start + compressed_size], compression)
+
+
+class WheelMetadataCache:
+    """In-memory cache of wheel metadata, with single-flight extraction and LRU eviction.
+
+    With a shared cache, metadata extracted by a replica is reused by the others.
+    """
+
+    # Seconds metadata is kept in the shared cache, the metadata of a file never changes
+    SHARED_TTL: float = 7 * 86400.0
+
+    def __init__(self, max_entries: int = 4096, shared_cache: SharedCache | None = None) -> None:
+        """Initialize wheel metadata cache."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self._max_entries: int = max_entries
+        self._shared_cache: SharedCache | None = shared_cache
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[bytes]] = {}
+
+    async def get(self, key: str, extract: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Get the metadata of a wheel, extracting it once."""
+        metadata: bytes | None = self._entries.get(key)
+        if metadata is not None:
+            CACHE_REQUESTS.labels("wheel_metadata", "hit").inc()
+            self._entries.move_to_end(key)
+            return metadata
+        CACHE_REQUESTS.labels("wheel_metadata", "miss").inc()
+        task: asyncio.Task[bytes] | None = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._extract(key, extract))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        metadata = await asyncio.shield(task)
+        self._entries[key] = metadata
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return metadata
+
+    async def _extract(self, key: str, extract: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Extract the metadata of a wheel, unless already extracted by another replica."""
+        if self._shared_cache is None:
+            return await extract()
+        shared_key: str = f"wheel_metadata:{key}"
+        metadata: bytes | None = await self._shared_cache.get(shared_key)
+        if metadata is None:
+            metadata = await extract()
+            await self._shared_cache.set(shared_key, metadata, self.SHARED_TTL)
+        return metadata
@@ -0,0 +1,228 @@
+"""Benchmark harness driving the application against a fake Github server."""
+
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TypedDict
+
+import httpx
+import pytest
+import yaml
+
+from pep503_simple_repo_broker.application import Application
+from pep503_simple_repo_broker.integrations.github.repository import GithubApi
+from tests.units.integrations.github.fake_github import FakeGithubServer, build_repositories, serve
+
+
+class BenchmarkResult(TypedDict):
+    """Result of a benchmark scenario."""
+
+    scenario: str
+    repositories: int
+    requests: int
+    concurrency: int
+    requests_per_second: float
+    # Latencies in milliseconds
+    p50: float
+    p99: float
+    # Peak resident set size of the process in bytes, fake Github server included
+    peak_rss: int
+
+
+class BenchmarkComparison(TypedDict):
+    """Comparison of a result with its baseline."""
+
+    key: str
+    baseline: float
+    current: float
+    # Current throughput relative to the baseline, 1.0 being unchanged
+    ratio: float
+
+
+def get_peak_rss() -> int:
+    """Get the peak resident set size of the process in bytes."""
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak_rss if platform.system() == "Darwin" else peak_rss * 1024
+
+
+def get_result_key(result: BenchmarkResult) -> str:
+    """Get the key identifying a result across runs."""
+    return f"{result['scenario']}@{result['repositories']}"
+
+
+async def measure(  # noqa: PLR0913
+    client: httpx.AsyncClient,
+    scenario: str,
+    repositories: int,
+    build_path: Callable[[int], str],
+    *,
+    requests: int,
+    concurrency: int,
+) -> BenchmarkResult:
+    """Send `requests` requests with `concurrency` clients and measure the throughput and latencies.
+
+    Args:
+        client: Client of the application.
+        scenario: Name of the scenario.
+        repositories: Number of repositories served by the application.
+        build_path: Builds the path of the n-th request.
+        requests: Number of requests to send.
+        concurrency: Number of requests in flight.
+    """
+    latencies: list[float] = []
+    # Shared by the clients, each one takes the next position
+    positions: Iterator[int] = iter(range(requests))
+
+    async def _client() -> None:
+        for position in positions:
+            started_at: float = time.perf_counter()
+            response: httpx.Response = await client.get(build_path(position))
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code != 200:  # noqa: PLR2004
+                raise AssertionError(f"{scenario} answered {response.status_code}")
+
+    started_at: float = time.perf_counter()
+    await asyncio.gather(*[_client() for _ in range(concurrency)])
+    duration: float = time.perf_counter() - started_at
+    quantiles: list[float] = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "scenario": scenario,
+        "repositories": repositories,
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_second": round(requests / duration, 1),
+        "p50": round(quantiles[49] * 1000, 3),
+        "p99": round(quantiles[98] * 1000, 3),
+        "peak_rss": get_peak_rss(),
+    }
+
+
+@asynccontextmanager
+async def serve_application(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fake_github: FakeGithubServer
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Serve the application, configured with the repositories of the fake Github server, and yield a client."""
+    config_path: Path = tmp_path / "integrations.yaml"
+    repositories: list[dict[str, str]] = [{"namespace": "namespace", "name": name} for name in fake_github.repositories]
+    config_path.write_text(yaml.safe_dump({"github": {"repositories": repositories}}))
+    async with serve(fake_github) as base_url:
+        monkeypatch.setattr(GithubApi, "GITHUB_API_BASE_URL", base_url)
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        monkeypatch.setenv("INTEGRATIONS_CONFIG_PATH", str(config_path))
+        application: Application = Application()
+        async with application.lifespan(application.fastapi_app):
+            transport: httpx.ASGITransport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                yield client
+
+
+async def run_benchmarks(  # noqa: PLR0913
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    repositories: int,
+    *,
+    requests: int,
+    concurrency: int,
+    asset_size: int,
+    latency: float,
+) -> list[BenchmarkResult]:
+    """Benchmark the index, project pages and downloads of an application serving `repositories` repositories."""
+    fake_github: FakeGithubServer = FakeGithubServer(
+        repositories=build_repositories(repositories), asset_size=asset_size, latency=latency
+    )
+    results: list[BenchmarkResult] = []
+    async with serve_application(tmp_path, monkeypatch, fake_github) as client:
+        # Wait for the index to be populated, its duration is measured on its own
+        started_at: float = time.perf_counter()
+        while (await client.get("/readyz")).status_code != 200:  # noqa: PLR2004
+            await asyncio.sleep(0.05)
+        populate_duration: float = time.perf_counter() - started_at
+        results.append(
+            {
+                "scenario": "populate",
+                "repositories": repositories,
+                "requests": repositories,
+                "concurrency": 1,
+                "requests_per_second": round(repositories / populate_duration, 1),
+                "p50": round(populate_duration * 1000, 3),
+                "p99": round(populate_duration * 1000, 3),
+                "peak_rss": get_peak_rss(),
+            }
+        )
+        fake_github.requests.clear()
+        results.append(
+            await measure(
+                client,
+                "simple_index",
+                repositories,
+                lambda _: "/simple/",
+                requests=requests,
+                concurrency=concurrency,
+            )
+        )
+        results.append(
+            await measure(
+                client,
+                "simple_project",
+                repositories,
+                lambda position: f"/simple/package-{position % repositories}",
+                requests=requests,
+                concurrency=concurrency,
+            )
+        )
+        results.append(
+            await measure(
+                client,
+                "download",
+                repositories,
+                lambda position: (
+                    f"/simple/package-{position % repositories}"
+                    f"/package_{position % repositories}-0.0.0-py3-none-any.whl"
+                ),
+                requests=max(1, requests // 4),
+                concurrency=concurrency,
+            )
+        )
+        fake_github.requests.clear()
+    return results
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    """Load stored results by key, empty when none are stored."""
+    if not path.exists():
+        return {}
+    results: list[BenchmarkResult] = json.loads(path.read_text())
+    return {get_result_key(result): result for result in results}
+
+
+def store_results(path: Path, results: list[BenchmarkResult]) -> None:
+    """Store results, replacing those with the same keys."""
+    stored: dict[str, BenchmarkResult] = load_results(path)
+    stored.update({get_result_key(result): result for result in results})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(sorted(stored.values(), key=get_result_key), indent=2) + "\n")
+
+
+def compare_results(baseline: dict[str, BenchmarkResult], results: list[BenchmarkResult]) -> list[BenchmarkComparison]:
+    """Compare the throughput of results with the baseline, results without baseline are skipped."""
+    comparisons: list[BenchmarkComparison] = []
+    for result in results:
+        key: str = get_result_key(result)
+        if key not in baseline:
+            continue
+        comparisons.append(
+            {
+                "key": key,
+                "baseline": baseline[key]["requests_per_second"],
+                "current": result["requests_per_second"],
+                "ratio": result["requests_per_second"] / baseline[key]["requests_per_second"],
+            }
+        )
+    return comparisons
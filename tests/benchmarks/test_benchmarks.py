@@ -0,0 +1,58 @@
+"""Benchmarks of the application against a fake Github server.
+
+Skipped unless `BENCHMARK` is set, run them with:
+
+```shell
+BENCHMARK=1 pytest tests/benchmarks -n0 -s
+```
+
+Results are stored in `BENCHMARK_RESULTS_PATH`, `build/benchmarks.json` by default, and
+compared with the baseline committed in `tests/benchmarks/baseline.json`. A throughput
+lower than `BENCHMARK_TOLERANCE` times the baseline fails, `BENCHMARK_UPDATE_BASELINE=1`
+replaces the baseline with the results instead.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from .harness import BenchmarkComparison, BenchmarkResult, compare_results, load_results, run_benchmarks, store_results
+
+BASELINE_PATH: Path = Path(__file__).parent / "baseline.json"
+
+
+@pytest.mark.skipif(os.getenv("BENCHMARK", "") == "", reason="BENCHMARK is not set")
+class TestBenchmarks:
+    """Benchmark the simple API at increasing numbers of repositories."""
+
+    @pytest.mark.parametrize("repositories", [10, 100, 1000])
+    async def test_simple_api(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, repositories: int) -> None:
+        """Benchmark the index, the project pages and the downloads."""
+        results: list[BenchmarkResult] = await run_benchmarks(
+            tmp_path,
+            monkeypatch,
+            repositories,
+            requests=int(os.getenv("BENCHMARK_REQUESTS", "1000")),
+            concurrency=int(os.getenv("BENCHMARK_CONCURRENCY", "16")),
+            asset_size=int(os.getenv("BENCHMARK_ASSET_SIZE", str(256 * 1024))),
+            latency=float(os.getenv("BENCHMARK_LATENCY", "0.005")),
+        )
+        for result in results:
+            print(
+                f"{result['scenario']:>16} @ {repositories:>4} repositories: "
+                f"{result['requests_per_second']:>9.1f} req/s, p50 {result['p50']:>8.3f} ms, "
+                f"p99 {result['p99']:>8.3f} ms, peak RSS {result['peak_rss'] / 2**20:.1f} MiB"
+            )
+        store_results(Path(os.getenv("BENCHMARK_RESULTS_PATH", "build/benchmarks.json")), results)
+
+        if os.getenv("BENCHMARK_UPDATE_BASELINE", "") != "":
+            store_results(BASELINE_PATH, results)
+            return
+        tolerance: float = float(os.getenv("BENCHMARK_TOLERANCE", "0.5"))
+        regressions: list[BenchmarkComparison] = [
+            comparison
+            for comparison in compare_results(load_results(BASELINE_PATH), results)
+            if comparison["ratio"] < tolerance
+        ]
+        assert regressions == []
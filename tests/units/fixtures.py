@@ -1,10 +1,25 @@
 """Fixtures."""
 
+import hashlib
+import io
 import os
+import time
+import uuid
+import zipfile
+from collections.abc import AsyncGenerator
 
 import pytest
 
-from pep503_simple_repo_broker.integrations.abstracts import PackageName
+from pep503_simple_repo_broker.integrations.abstracts import (
+    AbstractIntegration,
+    IntegrationId,
+    IntegrationIndexError,
+    IntegrationPackageDownload,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+    normalize_package_name,
+)
 from pep503_simple_repo_broker.integrations.github.types import (
     GithubNamespace,
     GithubRepositoryName,
@@ -31,3 +46,169 @@ def repository() -> GithubRepositoryReference:
         name=GithubRepositoryName(os.getenv("GITHUB_REPOSITORY_NAME", "")),
         package_name=package_name,
     )
+
+
+def build_content(package_name: str, filename: str) -> bytes:
+    """Build the content of a fake package file."""
+    return f"{package_name}/{filename}".encode()
+
+
+def build_wheel(metadata: bytes, compression: int = zipfile.ZIP_DEFLATED, padding: int = 0) -> bytes:
+    """Build a wheel holding the given core metadata."""
+    buffer: io.BytesIO = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as wheel:
+        wheel.writestr("package/__init__.py", os.urandom(padding))
+        wheel.writestr("package-0.1.0.dist-info/METADATA", metadata)
+        wheel.writestr("package-0.1.0.dist-info/RECORD", b"")
+    return buffer.getvalue()
+
+
+class FakeIntegration(AbstractIntegration):
+    """Fake integration serving an in-memory index."""
+
+    def __init__(self, packages: dict[str, list[str]], fail: bool = False) -> None:
+        """Initialize fake integration.
+
+        Args:
+            packages: Package file names by package name.
+            fail: Whether `get_index` must raise.
+        """
+        self._integration_id: IntegrationId = IntegrationId(uuid.uuid4())
+        self.packages: dict[str, list[str]] = packages
+        self.fail: bool = fail
+        self.index_calls: int = 0
+        self.download_calls: int = 0
+        # Contents by file name, generated from the file name when missing
+        self.contents: dict[str, bytes] = {}
+        self.errors: list[IntegrationIndexError] = []
+        # Sources refreshed by `refresh_source`, in order
+        self.refreshed_sources: list[str] = []
+        # Epoch seconds of the last successful `get_index`
+        self.fetched_at: float | None = None
+        # Refresh intervals by source
+        self.refresh_intervals: dict[str, float] = {}
+        # Whether the index holds the size of the files
+        self.known_sizes: bool = False
+        # Whether a single byte range is served partially, ranges are ignored otherwise
+        self.serve_ranges: bool = False
+        # `Range` headers of the downloads, in order
+        self.range_headers: list[str | None] = []
+        # URL the downloads are redirected to, proxied when not set
+        self.redirect_url: str | None = None
+
+    @property
+    def id(self) -> IntegrationId:
+        """Get integration id."""
+        return self._integration_id
+
+    def get_content(self, package_name: str, filename: str) -> bytes:
+        """Get the content of a package file."""
+        return self.contents.get(filename, build_content(package_name, filename))
+
+    async def get_index(self) -> list[IntegrationPackageIndex]:
+        """Get index."""
+        self.index_calls += 1
+        if self.fail:
+            raise RuntimeError("integration failure")
+        self.fetched_at = time.time()
+        return self.build_index()
+
+    def build_index(self) -> list[IntegrationPackageIndex]:
+        """Build the index of the packages."""
+        return [
+            {
+                "integration_id": self._integration_id,
+                "package_name": PackageName(package_name),
+                "package_version_list": [PackageVersion(filename) for filename in filenames],
+                "package_file_list": [
+                    {
+                        "filename": PackageVersion(filename),
+                        "url": f"https://example.com/{filename}",
+                        "digest": f"sha256:{hashlib.sha256(self.get_content(package_name, filename)).hexdigest()}",
+                        "content_type": "application/octet-stream",
+                        "size": len(self.get_content(package_name, filename)) if self.known_sizes else None,
+                    }
+                    for filename in filenames
+                ],
+            }
+            for package_name, filenames in self.packages.items()
+        ]
+
+    def get_index_errors(self) -> list[IntegrationIndexError]:
+        """Get errors of the last index population."""
+        return self.errors
+
+    def get_index_age(self) -> float | None:
+        """Get the number of seconds since the last successful `get_index`."""
+        return None if self.fetched_at is None else time.time() - self.fetched_at
+
+    def get_sources(self) -> list[str]:
+        """Get the package names as sources."""
+        return list(self.packages)
+
+    def get_source_refresh_interval(self, source: str) -> float | None:
+        """Get the refresh interval of a source."""
+        return self.refresh_intervals.get(source)
+
+    async def refresh_source(self, source: str) -> bool:
+        """Record the refresh of a source."""
+        if source not in self.packages:
+            return False
+        self.refreshed_sources.append(source)
+        if self.fail:
+            raise RuntimeError("integration failure")
+        return True
+
+    async def get_download_redirect(self, package_name: PackageName, package_version: PackageVersion) -> str | None:
+        """Get the download redirect, `redirect_url` followed by the file name."""
+        if self.redirect_url is None:
+            return None
+        return f"{self.redirect_url}/{package_version}"
+
+    async def get_download_package(
+        self, package_name: PackageName, package_version: PackageVersion, range_header: str | None = None
+    ) -> IntegrationPackageDownload:
+        """Get download package, a range is only served when `serve_ranges` is set."""
+        self.download_calls += 1
+        self.range_headers.append(range_header)
+        content: bytes = self.get_content(package_name, package_version)
+        content_range: str | None = None
+        if self.serve_ranges and range_header is not None:
+            start, end = range_header.removeprefix("bytes=").split("-")
+            first: int = int(start) if start else max(0, len(content) - int(end))
+            last: int = min(int(end), len(content) - 1) if start and end else len(content) - 1
+            content_range = f"bytes {first}-{last}/{len(content)}"
+            content = content[first : last + 1]
+
+        async def _content() -> AsyncGenerator[bytes, None]:
+            # Chunked, to check the content is sliced across chunks
+            for offset in range(0, len(content), 4):
+                yield content[offset : offset + 4]
+
+        return {
+            "filename": package_version,
+            "content": _content(),
+            "content_length": len(content),
+            "content_type": "application/octet-stream",
+            "content_range": content_range,
+        }
+
+
+class PackageFakeIntegration(FakeIntegration):
+    """Fake integration serving each package on its own, without building the whole index."""
+
+    def __init__(self, packages: dict[str, list[str]], fail: bool = False) -> None:
+        """Initialize package fake integration."""
+        super().__init__(packages, fail)
+        # Normalized names of the packages fetched on their own, in order
+        self.package_calls: list[str] = []
+
+    async def get_package(self, package_name: PackageName) -> IntegrationPackageIndex | None:
+        """Get the index of a single package."""
+        self.package_calls.append(normalize_package_name(package_name))
+        if self.fail:
+            raise RuntimeError("integration failure")
+        for package_index in self.build_index():
+            if normalize_package_name(package_index["package_name"]) == normalize_package_name(package_name):
+                return package_index
+        return None
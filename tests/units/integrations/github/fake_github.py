@@ -0,0 +1,219 @@
+"""Fake Github API server."""
+
+import asyncio
+import hashlib
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+def build_release(tag_name: str, filenames: list[str]) -> dict[str, Any]:
+    """Build a release payload as returned by the Github API."""
+    return {
+        "tag_name": tag_name,
+        "name": tag_name,
+        "assets": [
+            {
+                "url": f"/assets/{filename}",
+                "name": filename,
+                "digest": f"sha256:{hashlib.sha256(filename.encode()).hexdigest()}",
+                "browser_download_url": f"/download/{filename}",
+                "content_type": "application/octet-stream",
+            }
+            for filename in filenames
+        ],
+    }
+
+
+def build_repositories(
+    count: int, releases_per_repository: int = 1, assets_per_release: int = 1
+) -> dict[str, list[dict[str, Any]]]:
+    """Build the releases of `count` repositories, each publishing a package named after it."""
+    return {
+        f"package-{position}": [
+            build_release(
+                f"v{version}.0.0",
+                [
+                    f"package_{position}-{version}.0.{asset}-py3-none-any.whl"
+                    for asset in range(assets_per_release)
+                ],
+            )
+            for version in range(releases_per_repository)
+        ]
+        for position in range(count)
+    }
+
+
+def build_graphql_release(release: dict[str, Any]) -> dict[str, Any]:
+    """Build a release node, with all its assets, as returned by the Github GraphQL API."""
+    return {
+        "tagName": release["tag_name"],
+        "name": release["name"],
+        "releaseAssets": {
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": [
+                {
+                    "name": asset["name"],
+                    "downloadUrl": asset["url"],
+                    "contentType": asset["content_type"],
+                    "size": None,
+                    "digest": asset["digest"],
+                }
+                for asset in release["assets"]
+            ],
+        },
+    }
+
+
+def build_graphql_connection(nodes: list[Any], first: int, cursor: str | None) -> dict[str, Any]:
+    """Build a page of a GraphQL connection, the cursors being offsets."""
+    offset: int = int(cursor) if cursor is not None else 0
+    return {
+        "pageInfo": {"hasNextPage": offset + first < len(nodes), "endCursor": str(offset + first)},
+        "nodes": nodes[offset : offset + first],
+    }
+
+
+class FakeGithubServer:
+    """In-process stand-in for the Github releases API."""
+
+    def __init__(
+        self,
+        releases: list[dict[str, Any]] | None = None,
+        assets: dict[str, bytes] | None = None,
+        repositories: dict[str, list[dict[str, Any]]] | None = None,
+        *,
+        asset_size: int | None = None,
+        latency: float = 0.0,
+    ) -> None:
+        """Initialize fake Github server.
+
+        Args:
+            releases: Releases served for any repository not in `repositories`.
+            assets: Contents by asset file name.
+            repositories: Releases by repository name, served by the REST and GraphQL APIs.
+            asset_size: Size of the content generated for assets missing from `assets`, 404 if not set.
+            latency: Seconds waited before answering each request.
+        """
+        self.releases: list[dict[str, Any]] = releases or []
+        self.repositories: dict[str, list[dict[str, Any]]] = repositories or {}
+        self.asset_size: int | None = asset_size
+        self.latency: float = latency
+        self.assets: dict[str, bytes] = assets or {}
+        self.requests: list[web.Request] = []
+        # Statuses and headers answered, in order, before serving the requests normally
+        self.failures: list[tuple[int, dict[str, str]]] = []
+        # Rate limit headers added to the responses
+        self.rate_limit_headers: dict[str, str] = {}
+        # Signed URLs the downloads of assets redirect to, by asset file name
+        self.signed_urls: dict[str, str] = {}
+        self.app: web.Application = web.Application(middlewares=[self.delay])
+        self.app.router.add_get("/repos/{namespace}/{name}/releases", self.get_releases)
+        self.app.router.add_get("/repos/{namespace}/{name}/releases/tags/{tag}", self.get_release_by_tag)
+        self.app.router.add_get("/assets/{filename}", self.get_asset)
+        self.app.router.add_post("/graphql", self.post_graphql)
+
+    @web.middleware
+    async def delay(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """Answer after the injected latency."""
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        response: web.StreamResponse = await handler(request)
+        return response
+
+    async def get_release_by_tag(self, request: web.Request) -> web.Response:
+        """Serve a release by its tag."""
+        self.requests.append(request)
+        for release in self.releases:
+            if release["tag_name"] == request.match_info["tag"]:
+                return web.json_response(release)
+        return web.Response(status=404)
+
+    async def post_graphql(self, request: web.Request) -> web.Response:
+        """Answer the organization repositories and repository releases queries."""
+        self.requests.append(request)
+        payload: Any = await request.json()
+        variables: dict[str, Any] = payload["variables"]
+        if "repositoryOwner" in payload["query"]:
+            repositories: list[dict[str, Any]] = [
+                {
+                    "name": name,
+                    "releases": build_graphql_connection(
+                        [build_graphql_release(release) for release in releases], variables["releases"], None
+                    ),
+                }
+                for name, releases in sorted(self.repositories.items())
+            ]
+            data: dict[str, Any] = {
+                "repositoryOwner": {
+                    "repositories": build_graphql_connection(
+                        repositories, variables["repositories"], variables["cursor"]
+                    )
+                }
+            }
+        elif variables["name"] in self.repositories:
+            data = {
+                "repository": {
+                    "releases": build_graphql_connection(
+                        [build_graphql_release(release) for release in self.repositories[variables["name"]]],
+                        variables["releases"],
+                        variables["cursor"],
+                    )
+                }
+            }
+        else:
+            data = {"repository": None}
+        return web.json_response({"data": data}, headers=self.rate_limit_headers)
+
+    async def get_asset(self, request: web.Request) -> web.Response:
+        """Serve an asset, or redirect to its signed URL if any."""
+        self.requests.append(request)
+        if request.match_info["filename"] in self.signed_urls:
+            raise web.HTTPFound(self.signed_urls[request.match_info["filename"]])
+        asset: bytes | None = self.assets.get(request.match_info["filename"])
+        if asset is None and self.asset_size is not None:
+            asset = hashlib.sha256(request.match_info["filename"].encode()).digest() * (self.asset_size // 32 + 1)
+            asset = asset[: self.asset_size]
+        if asset is None:
+            return web.Response(status=404)
+        return web.Response(body=asset, content_type="application/octet-stream")
+
+    async def get_releases(self, request: web.Request) -> web.Response:
+        """Serve a page of releases with an ETag and pagination links."""
+        self.requests.append(request)
+        if self.failures:
+            status, failure_headers = self.failures.pop(0)
+            return web.Response(status=status, headers={**self.rate_limit_headers, **failure_headers})
+        per_page: int = int(request.query.get("per_page", "30"))
+        page: int = int(request.query.get("page", "1"))
+        releases: list[dict[str, Any]] = self.repositories.get(request.match_info["name"], self.releases)
+        last_page: int = max(1, -(-len(releases) // per_page))
+        body: str = json.dumps(releases[(page - 1) * per_page : page * per_page])
+        headers: dict[str, str] = {
+            **self.rate_limit_headers,
+            "ETag": f'"{hashlib.sha256(body.encode()).hexdigest()}"',
+        }
+        links: list[str] = []
+        if page < last_page:
+            links.append(f'<{request.url.update_query(page=page + 1)}>; rel="next"')
+            links.append(f'<{request.url.update_query(page=last_page)}>; rel="last"')
+        if links:
+            headers["Link"] = ", ".join(links)
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=body, content_type="application/json", headers=headers)
+
+
+@asynccontextmanager
+async def serve(fake_github: FakeGithubServer) -> AsyncIterator[str]:
+    """Serve the fake Github server and yield its base URL."""
+    server: TestServer = TestServer(fake_github.app)
+    await server.start_server()
+    try:
+        yield str(server.make_url("")).rstrip("/")
+    finally:
+        await server.close()
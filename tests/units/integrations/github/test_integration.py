@@ -0,0 +1,345 @@
+"""Test Github integration."""
+
+import asyncio
+import time
+
+import pytest
+
+from pep503_simple_repo_broker.integrations.abstracts import (
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+)
+from pep503_simple_repo_broker.integrations.github import (
+    GithubIntegration,
+    GithubNamespace,
+    GithubRepositoryName,
+)
+from pep503_simple_repo_broker.integrations.github.repository import GithubRepository
+from pep503_simple_repo_broker.integrations.github.types import GithubRepositoryReference
+from pep503_simple_repo_broker.shared_cache import MemorySharedCache
+
+
+@pytest.fixture(name="github_integration")
+def github_integration_fixture(monkeypatch: pytest.MonkeyPatch) -> GithubIntegration:
+    """Github integration with two repositories."""
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    return GithubIntegration(
+        [
+            {
+                "namespace": GithubNamespace("namespace"),
+                "name": GithubRepositoryName("working"),
+                "package_name": None,
+            },
+            {
+                "namespace": GithubNamespace("namespace"),
+                "name": GithubRepositoryName("failing"),
+                "package_name": None,
+            },
+        ],
+        max_concurrency=2,
+    )
+
+
+class TestGithubIntegration:
+    """Test Github integration."""
+
+    async def test_get_index_partial(
+        self, github_integration: GithubIntegration, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a failing repository gives a partial index and an error."""
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            if self._repository["name"] == "failing":  # pylint: disable=protected-access
+                raise RuntimeError("boom")
+            return {
+                "integration_id": github_integration.id,
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": [],
+                "package_file_list": [],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        index = await github_integration.get_index()
+        errors = github_integration.get_index_errors()
+
+        assert [package_index["package_name"] for package_index in index] == ["working"]
+        assert errors == [{"integration_id": github_integration.id, "source": "namespace/failing", "message": "boom"}]
+
+    async def test_refresh_source(self, github_integration: GithubIntegration, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test refreshing a repository only fetches that repository."""
+        fetched: list[str] = []
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            fetched.append(self._repository["name"])  # pylint: disable=protected-access
+            return {
+                "integration_id": github_integration.id,
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": [],
+                "package_file_list": [],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        assert github_integration.get_sources() == ["namespace/working", "namespace/failing"]
+        assert await github_integration.refresh_source("namespace/working") is True
+        assert await github_integration.refresh_source("namespace/unknown") is False
+        assert fetched == ["working"]
+
+    async def test_refresh_source_unchanged(
+        self, github_integration: GithubIntegration, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test refreshing an unchanged repository keeps the index, a changed one rebuilds it."""
+        filenames: list[PackageVersion] = [PackageVersion("working-0.1.0.tar.gz")]
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            return {
+                "integration_id": github_integration.id,
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": list(filenames),
+                "package_file_list": [
+                    {"filename": filename, "url": filename, "digest": None, "content_type": "", "size": None}
+                    for filename in filenames
+                ],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        await github_integration.refresh_source("namespace/working")
+        first = await github_integration.get_index()
+        await github_integration.refresh_source("namespace/working")
+        unchanged = await github_integration.get_index()
+        filenames.append(PackageVersion("working-0.2.0.tar.gz"))
+        await github_integration.refresh_source("namespace/working")
+        changed = await github_integration.get_index()
+
+        assert unchanged is first
+        assert changed is not first
+        assert changed[0]["package_version_list"] == filenames
+
+    async def test_get_package_does_not_rebuild_index(
+        self, github_integration: GithubIntegration, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a changed package is served from its repository alone, the index being rebuilt on its next use."""
+        filenames: list[PackageVersion] = [PackageVersion("working-0.1.0.tar.gz")]
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            name: str = self._repository["name"]  # pylint: disable=protected-access
+            package_filenames: list[PackageVersion] = list(filenames) if name == "working" else []
+            return {
+                "integration_id": github_integration.id,
+                "package_name": PackageName(name),
+                "package_version_list": package_filenames,
+                "package_file_list": [
+                    {"filename": filename, "url": filename, "digest": None, "content_type": "", "size": None}
+                    for filename in package_filenames
+                ],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+        await github_integration.get_index()
+        builds: list[None] = []
+        monkeypatch.setattr(github_integration, "build_lookup", lambda: builds.append(None))
+
+        filenames.append(PackageVersion("working-0.2.0.tar.gz"))
+        package_index = await github_integration.get_package(PackageName("working"))
+        _, package_file = github_integration.get_package_file(PackageName("working"), filenames[-1])
+        index = await github_integration.get_index()
+
+        assert len(builds) == 0
+        assert package_index is not None and package_index["package_version_list"] == filenames
+        assert package_file["filename"] == "working-0.2.0.tar.gz"
+        assert package_index in index
+
+    async def test_get_package(self, github_integration: GithubIntegration, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a package only refreshes the repository publishing it, and a failing one serves its last index."""
+        fetched: list[str] = []
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            fetched.append(self._repository["name"])  # pylint: disable=protected-access
+            if fetched.count("failing") > 1:
+                raise RuntimeError("boom")
+            return {
+                "integration_id": github_integration.id,
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": [],
+                "package_file_list": [],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        working = await github_integration.get_package(PackageName("Working"))
+        unknown = await github_integration.get_package(PackageName("unknown"))
+        await github_integration.get_package(PackageName("failing"))
+        failing = await github_integration.get_package(PackageName("failing"))
+
+        assert working is not None and working["package_name"] == "working"
+        assert unknown is None
+        assert failing is not None and failing["package_name"] == "failing"
+        assert fetched == ["working", "failing", "failing"]
+        assert github_integration.get_index_errors()[0]["source"] == "namespace/failing"
+
+    @pytest.mark.parametrize(("shared_index_max_age", "expected_fetches"), [(0.0, 2), (60.0, 1)])
+    async def test_shared_cache(
+        self, monkeypatch: pytest.MonkeyPatch, shared_index_max_age: float, expected_fetches: int
+    ) -> None:
+        """Test a repository is fetched by a single replica at a time and its index reused by the others.
+
+        A refresh requested after the index was published fetches it again, unless still young enough.
+        """
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        repository: GithubRepositoryReference = {
+            "namespace": GithubNamespace("namespace"),
+            "name": GithubRepositoryName("name"),
+            "package_name": None,
+        }
+        replicas: list[GithubIntegration] = [
+            GithubIntegration(
+                [repository],
+                shared_cache=shared_cache,
+                shared_index_max_age=shared_index_max_age,
+            )
+            for _ in range(3)
+        ]
+        fetched: list[str] = []
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            fetched.append(self._repository["name"])  # pylint: disable=protected-access
+            await asyncio.sleep(0.05)
+            return {
+                "integration_id": self._integration_id,  # pylint: disable=protected-access
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": [],
+                "package_file_list": [],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        await asyncio.gather(*[replica.refresh_source("namespace/name") for replica in replicas[:2]])
+        concurrent_fetches: int = len(fetched)
+        await replicas[2].refresh_source("namespace/name")
+
+        assert concurrent_fetches == 1
+        assert len(fetched) == expected_fetches
+        for replica in replicas:
+            index = await replica.get_package(PackageName("name"))
+            assert index is not None and index["integration_id"] == replica.id
+            assert replica.get_index_age() is not None
+
+    async def test_shared_cache_lock_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a request fetches the repository itself once the lock held by another replica timed out."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        monkeypatch.setattr(GithubIntegration, "SHARED_LOCK_TIMEOUT", 0.05)
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        integration: GithubIntegration = GithubIntegration(
+            [{"namespace": GithubNamespace("namespace"), "name": GithubRepositoryName("name"), "package_name": None}],
+            shared_cache=shared_cache,
+        )
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            return {
+                "integration_id": self._integration_id,  # pylint: disable=protected-access
+                "package_name": PackageName(self._repository["name"]),  # pylint: disable=protected-access
+                "package_version_list": [],
+                "package_file_list": [],
+            }
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+        assert await shared_cache.acquire("github:refresh:namespace/name", "dead", ttl=60) is True
+
+        index = await asyncio.wait_for(integration.get_package(PackageName("name")), timeout=1)
+
+        assert index is not None and index["package_name"] == "name"
+
+    async def test_background_refresh_get_index(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the index is served without fetching when refreshed in background."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        integration: GithubIntegration = GithubIntegration(
+            [{"namespace": GithubNamespace("namespace"), "name": GithubRepositoryName("name"), "package_name": None}],
+            background_refresh=True,
+        )
+
+        async def _get_index(self: GithubRepository) -> IntegrationPackageIndex:
+            raise AssertionError("get_index must not fetch")
+
+        monkeypatch.setattr(GithubRepository, "get_index", _get_index)
+
+        first = await integration.get_index()
+        second = await integration.get_index()
+
+        assert first == []
+        assert first is second
+
+    async def test_restore_source_indexes(self, github_integration: GithubIntegration) -> None:
+        """Test restored indexes are served until the repository is refreshed."""
+        github_integration.restore_source_indexes(
+            {
+                "namespace/working": {
+                    "integration_id": github_integration.id,
+                    "package_name": PackageName("working"),
+                    "package_version_list": [],
+                    "package_file_list": [],
+                },
+                "namespace/unknown": {
+                    "integration_id": github_integration.id,
+                    "package_name": PackageName("unknown"),
+                    "package_version_list": [],
+                    "package_file_list": [],
+                },
+            }
+        )
+
+        assert list(github_integration.get_source_indexes()) == ["namespace/working"]
+
+    async def test_get_index_age(self, github_integration: GithubIntegration) -> None:
+        """Test the index age is known once every repository is populated, from its oldest fetch."""
+        package_index: IntegrationPackageIndex = {
+            "integration_id": github_integration.id,
+            "package_name": PackageName("package"),
+            "package_version_list": [],
+            "package_file_list": [],
+        }
+        github_integration.restore_source_indexes({"namespace/working": package_index})
+
+        assert github_integration.get_index_age() is None
+
+        github_integration.restore_source_indexes({"namespace/failing": package_index}, fetched_at=time.time() - 120)
+        index_age: float | None = github_integration.get_index_age()
+
+        assert index_age is not None
+        assert 120 <= index_age < 180  # noqa: PLR2004
+
+    async def test_update_repositories(self, github_integration: GithubIntegration) -> None:
+        """Test only added or changed repositories are rebuilt, and removed ones are dropped with their index."""
+        package_index: IntegrationPackageIndex = {
+            "integration_id": github_integration.id,
+            "package_name": PackageName("package"),
+            "package_version_list": [],
+            "package_file_list": [],
+        }
+        github_integration.restore_source_indexes(
+            {"namespace/working": package_index, "namespace/failing": package_index}
+        )
+
+        updated = github_integration.update_repositories(
+            [
+                {
+                    "namespace": GithubNamespace("namespace"),
+                    "name": GithubRepositoryName("working"),
+                    "package_name": None,
+                },
+                {
+                    "namespace": GithubNamespace("namespace"),
+                    "name": GithubRepositoryName("added"),
+                    "package_name": None,
+                    "refresh_interval": 600,
+                },
+            ]
+        )
+
+        assert updated == ["namespace/added"]
+        assert github_integration.get_sources() == ["namespace/working", "namespace/added"]
+        assert list(github_integration.get_source_indexes()) == ["namespace/working"]
+        assert github_integration.get_source_refresh_interval("namespace/added") == 600  # noqa: PLR2004
@@ -0,0 +1,148 @@
+"""Test Github organization discovery."""
+
+import uuid
+
+import pytest
+
+from pep503_simple_repo_broker.integrations.abstracts import (
+    IntegrationId,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+)
+from pep503_simple_repo_broker.integrations.github import GithubIntegration, GithubNamespace, GithubRepositoryName
+from pep503_simple_repo_broker.integrations.github.organization import GithubOrganization, GithubOrganizationApi
+from pep503_simple_repo_broker.integrations.github.repository import GithubApi
+from pep503_simple_repo_broker.integrations.github.types import GithubRepositorySlug, GithubToken
+
+from .fake_github import FakeGithubServer, build_release, serve
+
+
+def build_repositories() -> dict[str, list[dict[str, object]]]:
+    """Build the releases of an organization, one repository publishing no distribution."""
+    return {
+        "first": [build_release(f"v0.{minor}.0", [f"first-0.{minor}.0.tar.gz"]) for minor in range(3)],
+        "second": [build_release("v1.0.0", ["second-1.0.0-py3-none-any.whl", "checksums.txt"])],
+        "third": [build_release("v1.0.0", ["third-1.0.0.tar.gz"])],
+        "website": [build_release("v1.0.0", ["website.zip"])],
+    }
+
+
+class TestGithubOrganization:
+    """Test Github organization."""
+
+    async def test_get_indexes(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test all repositories are discovered in batched pages, following their releases when truncated."""
+        fake_github: FakeGithubServer = FakeGithubServer(repositories=build_repositories())
+        monkeypatch.setattr(GithubOrganizationApi, "REPOSITORIES_PER_PAGE", 2)
+        monkeypatch.setattr(GithubOrganizationApi, "RELEASES_PER_REPOSITORY", 2)
+        async with serve(fake_github) as base_url:
+            monkeypatch.setattr(GithubApi, "GITHUB_API_BASE_URL", base_url)
+            organization: GithubOrganization = GithubOrganization(
+                GithubToken("token"), {"namespace": GithubNamespace("namespace")}, IntegrationId(uuid.uuid4())
+            )
+            indexes: dict[GithubRepositorySlug, IntegrationPackageIndex] = await organization.get_indexes()
+            await organization.close()
+
+        assert list(indexes) == ["namespace/first", "namespace/second", "namespace/third"]
+        assert len(indexes[GithubRepositorySlug("namespace/first")]["package_file_list"]) == 3  # noqa: PLR2004
+        assert indexes[GithubRepositorySlug("namespace/second")]["package_version_list"] == [
+            "second-1.0.0-py3-none-any.whl"
+        ]
+        # Two pages of repositories, then the remaining releases of the first repository
+        assert len(fake_github.requests) == 3  # noqa: PLR2004
+
+    async def test_get_repository_index(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a single repository is indexed, `None` when it publishes no distribution."""
+        fake_github: FakeGithubServer = FakeGithubServer(repositories=build_repositories())
+        async with serve(fake_github) as base_url:
+            monkeypatch.setattr(GithubApi, "GITHUB_API_BASE_URL", base_url)
+            organization: GithubOrganization = GithubOrganization(
+                GithubToken("token"), {"namespace": GithubNamespace("namespace")}, IntegrationId(uuid.uuid4())
+            )
+            third: IntegrationPackageIndex | None = await organization.get_repository_index(
+                GithubRepositoryName("third")
+            )
+            website: IntegrationPackageIndex | None = await organization.get_repository_index(
+                GithubRepositoryName("website")
+            )
+            await organization.close()
+
+        assert third is not None
+        assert third["package_name"] == "third"
+        assert website is None
+
+
+class TestGithubIntegrationDiscovery:
+    """Test Github integration discovering organizations."""
+
+    async def test_refresh_organization(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test an organization source discovers the repositories, configured repositories winning."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        fake_github: FakeGithubServer = FakeGithubServer(repositories=build_repositories())
+        integration: GithubIntegration = GithubIntegration(
+            [
+                {
+                    "namespace": GithubNamespace("namespace"),
+                    "name": GithubRepositoryName("third"),
+                    "package_name": PackageName("renamed"),
+                }
+            ],
+            background_refresh=True,
+            organizations=[{"namespace": GithubNamespace("namespace")}],
+        )
+        async with serve(fake_github) as base_url:
+            monkeypatch.setattr(GithubApi, "GITHUB_API_BASE_URL", base_url)
+            assert integration.get_sources() == ["namespace/third", "namespace/*"]
+            assert integration.get_index_age() is None
+
+            assert await integration.refresh_source("namespace/*")
+
+            index: list[IntegrationPackageIndex] = await integration.get_index()
+            assert sorted(package_index["package_name"] for package_index in index) == ["first", "second"]
+            assert integration.get_index_age() is None
+
+            fake_github.repositories["fourth"] = [build_release("v1.0.0", ["fourth-1.0.0.tar.gz"])]
+            assert await integration.refresh_source("Namespace/fourth")
+            assert not await integration.refresh_source("other/fourth")
+            await integration.shutdown()
+
+        assert "namespace/fourth" in integration.get_source_indexes()
+        assert integration.get_index_errors() == []
+
+    async def test_restore_discovered_indexes(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test discovered repositories are restored, and removed when missing from an overwrite."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        integration: GithubIntegration = GithubIntegration(
+            background_refresh=True, organizations=[{"namespace": GithubNamespace("namespace")}]
+        )
+        package_index: IntegrationPackageIndex = {
+            "integration_id": IntegrationId(uuid.uuid4()),
+            "package_name": PackageName("first"),
+            "package_version_list": [PackageVersion("first-0.1.0.tar.gz")],
+            "package_file_list": [],
+        }
+
+        integration.restore_source_indexes({"namespace/first": package_index, "other/first": package_index})
+
+        assert list(integration.get_source_indexes()) == ["namespace/first"]
+        assert integration.get_index_age() is not None
+
+        integration.restore_source_indexes({}, overwrite=True)
+
+        assert integration.get_source_indexes() == {}
+
+    def test_update_organizations(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test only the organizations added or changed are reported."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        integration: GithubIntegration = GithubIntegration(
+            organizations=[{"namespace": GithubNamespace("first")}, {"namespace": GithubNamespace("second")}]
+        )
+
+        updated: list[GithubRepositorySlug] = integration.update_organizations(
+            [{"namespace": GithubNamespace("first")}, {"namespace": GithubNamespace("third"), "refresh_interval": 60}]
+        )
+
+        assert updated == ["third/*"]
+        assert integration.get_sources() == ["first/*", "third/*"]
+        assert integration.get_source_refresh_interval("third/*") == 60  # noqa: PLR2004
@@ -0,0 +1,80 @@
+"""Test Github rate limit governor."""
+
+import time
+
+import pytest
+
+from pep503_simple_repo_broker.integrations.github.rate_limit import (
+    GithubRateLimitError,
+    GithubRateLimitGovernor,
+    GithubRateLimitSettings,
+    get_token_fingerprint,
+)
+from pep503_simple_repo_broker.integrations.github.types import GithubToken
+
+TOKEN: GithubToken = GithubToken("token")
+
+
+class TestGithubRateLimitGovernor:
+    """Test Github rate limit governor."""
+
+    def test_update_tracks_budget(self) -> None:
+        """Test the budget is read from the rate limit headers."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor()
+
+        retry_after = governor.update(
+            TOKEN, 200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "1"}
+        )
+
+        assert retry_after is None
+        assert governor.budgets[get_token_fingerprint(TOKEN)]["remaining"] == 4999  # noqa: PLR2004
+        assert governor.get_delay(TOKEN) == 0
+
+    def test_low_budget_spreads_requests(self) -> None:
+        """Test requests are spread until the reset when the budget is low."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor(GithubRateLimitSettings(max_spread_delay=60))
+        now: float = time.time()
+        governor.update(
+            TOKEN,
+            200,
+            {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(now + 1000)},
+        )
+
+        assert governor.get_delay(TOKEN, now=now) == pytest.approx(10, abs=0.1)
+
+    def test_retry_after_blocks_token(self) -> None:
+        """Test a `Retry-After` blocks the token until it expires."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor()
+
+        retry_after = governor.update(TOKEN, 429, {"Retry-After": "30"})
+
+        assert retry_after == 30  # noqa: PLR2004
+        assert 29 < governor.get_delay(TOKEN) <= 30  # noqa: PLR2004
+
+    def test_forbidden_without_rate_limit_is_not_blocking(self) -> None:
+        """Test a 403 with budget left is a permission error, not a rate limit."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor()
+
+        retry_after = governor.update(TOKEN, 403, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1"})
+
+        assert retry_after is None
+
+    async def test_acquire_refuses_long_waits(self) -> None:
+        """Test a token exhausted until a distant reset fails fast."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor(GithubRateLimitSettings(max_wait=1))
+        governor.update(
+            TOKEN, 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 3600)}
+        )
+
+        with pytest.raises(GithubRateLimitError) as exception_info:
+            await governor.acquire(TOKEN)
+        assert exception_info.value.retry_after > 1
+
+    def test_get_backoff_is_bounded(self) -> None:
+        """Test the backoff grows exponentially up to the maximum."""
+        governor: GithubRateLimitGovernor = GithubRateLimitGovernor(
+            GithubRateLimitSettings(backoff_base=1, max_backoff=4)
+        )
+
+        assert 0.5 <= governor.get_backoff(0) <= 1  # noqa: PLR2004
+        assert 2 <= governor.get_backoff(10) <= 4  # noqa: PLR2004
@@ -1,19 +1,46 @@
 """Test Github repository API."""
 
 import os
+import time
+import tracemalloc
 import uuid
 
 import pytest
+from fastapi import HTTPException
 
-from pep503_simple_repo_broker.integrations.abstracts import IntegrationId
+from pep503_simple_repo_broker.integrations.abstracts import IntegrationId, PackageVersion
+from pep503_simple_repo_broker.integrations.github.objects import GithubReleaseObject
+from pep503_simple_repo_broker.integrations.github.rate_limit import (
+    GithubApiError,
+    GithubRateLimitGovernor,
+    GithubRateLimitSettings,
+)
 from pep503_simple_repo_broker.integrations.github.repository import (
     GithubRepository,
     GithubRepositoryApi,
+    get_signed_url_expiry,
+    parse_release_download_url,
+    transform_release_to_package_files,
+)
+from pep503_simple_repo_broker.integrations.github.session import (
+    GithubSessionPool,
+    GithubSessionSettings,
 )
 from pep503_simple_repo_broker.integrations.github.types import (
+    GithubNamespace,
+    GithubRepositoryName,
     GithubRepositoryReference,
     GithubToken,
 )
+from pep503_simple_repo_broker.shared_cache import MemorySharedCache
+
+from .fake_github import FakeGithubServer, build_release, serve
+
+REPOSITORY: GithubRepositoryReference = {
+    "namespace": GithubNamespace("namespace"),
+    "name": GithubRepositoryName("name"),
+    "package_name": None,
+}
 
 
 class TestGithubRepositoryApi:
@@ -25,6 +52,7 @@ class TestGithubRepositoryApi:
         """Test retrieve releases."""
         github_repository_api = GithubRepositoryApi(github_token, repository)
         releases = await github_repository_api.retrieve_releases()
+        await github_repository_api.close()
         assert releases is not None
         assert len(releases) > 0
 
@@ -42,5 +70,400 @@ class TestGithubRepository:
             repository=repository,
         )
         index = await github_repository.get_index()
+        await github_repository.close()
         assert index is not None
         assert len(index) > 0
+
+
+class TestGithubRepositoryApiConditionalRequests:
+    """Test Github repository API conditional requests."""
+
+    async def test_retrieve_releases_reuses_releases_when_not_modified(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test an unchanged repository reuses the previously parsed releases."""
+        fake_github = FakeGithubServer([build_release("v0.1.0", ["package-0.1.0.tar.gz"])])
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(GithubToken("token"), REPOSITORY)
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            first = await github_repository_api.retrieve_releases()
+            second = await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert second == first
+        assert second[0] is first[0]
+        assert fake_github.requests[0].headers.get("If-None-Match") is None
+        assert fake_github.requests[1].headers.get("If-None-Match") is not None
+
+    async def test_retrieve_releases_refreshes_when_modified(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a changed repository returns the new releases."""
+        fake_github = FakeGithubServer([build_release("v0.1.0", ["package-0.1.0.tar.gz"])])
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(GithubToken("token"), REPOSITORY)
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            await github_repository_api.retrieve_releases()
+            fake_github.releases.append(build_release("v0.2.0", ["package-0.2.0.tar.gz"]))
+            releases = await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert [release.tag_name for release in releases] == ["v0.1.0", "v0.2.0"]
+
+
+class TestGithubRepositoryApiSharedCache:
+    """Test Github repository API sharing its cache with other replicas."""
+
+    async def test_retrieve_releases_reuses_pages_of_other_replicas(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a replica sends its first request conditional on the page retrieved by another one."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        fake_github = FakeGithubServer([build_release("v0.1.0", ["package-0.1.0.tar.gz"])])
+        async with serve(fake_github) as base_url:
+            replicas: list[GithubRepositoryApi] = [
+                GithubRepositoryApi(GithubToken("token"), REPOSITORY, shared_cache=shared_cache) for _ in range(2)
+            ]
+            for replica in replicas:
+                monkeypatch.setattr(replica, "GITHUB_API_BASE_URL", base_url)
+            first = await replicas[0].retrieve_releases()
+            second = await replicas[1].retrieve_releases()
+            for replica in replicas:
+                await replica.close()
+
+        assert [release.tag_name for release in second] == [release.tag_name for release in first]
+        assert second[0].package_files == first[0].package_files
+        assert fake_github.requests[0].headers.get("If-None-Match") is None
+        assert fake_github.requests[1].headers.get("If-None-Match") is not None
+
+    async def test_resolve_signed_url_reuses_urls_of_other_replicas(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the asset and signed URLs resolved by a replica are reused by another one."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        release = build_release("v0.1.0", ["package-0.1.0.tar.gz"])
+        download_url: str = "https://github.com/namespace/name/releases/download/v0.1.0/package-0.1.0.tar.gz"
+        release["assets"][0]["browser_download_url"] = download_url
+        fake_github = FakeGithubServer([release])
+        fake_github.signed_urls = {
+            "package-0.1.0.tar.gz": "https://objects.example.com/0?se=2999-01-01T00:00:00Z&sig=a",
+        }
+        async with serve(fake_github) as base_url:
+            replicas: list[GithubRepositoryApi] = [
+                GithubRepositoryApi(GithubToken("token"), REPOSITORY, shared_cache=shared_cache) for _ in range(2)
+            ]
+            for replica in replicas:
+                monkeypatch.setattr(replica, "GITHUB_API_BASE_URL", base_url)
+            signed_urls: list[str | None] = [await replica.resolve_signed_url(download_url) for replica in replicas]
+            asset_url: str = await replicas[1].resolve_asset_url(download_url)
+            for replica in replicas:
+                await replica.close()
+
+        assert signed_urls == [fake_github.signed_urls["package-0.1.0.tar.gz"]] * 2
+        assert asset_url == "/assets/package-0.1.0.tar.gz"
+        assert [request.path for request in fake_github.requests] == [
+            "/repos/namespace/name/releases/tags/v0.1.0",
+            "/assets/package-0.1.0.tar.gz",
+        ]
+
+
+class TestGithubRepositoryApiPagination:
+    """Test Github repository API pagination."""
+
+    @pytest.mark.parametrize("parallel_pages", [False, True])
+    async def test_retrieve_releases_follows_pages(
+        self, monkeypatch: pytest.MonkeyPatch, parallel_pages: bool
+    ) -> None:
+        """Test all pages are retrieved in order."""
+        fake_github = FakeGithubServer(
+            [build_release(f"v0.{minor}.0", [f"package-0.{minor}.0.tar.gz"]) for minor in range(25)]
+        )
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(
+                GithubToken("token"), REPOSITORY, parallel_pages=parallel_pages
+            )
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            monkeypatch.setattr(github_repository_api, "RELEASES_PER_PAGE", 10)
+            releases = await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert [release.tag_name for release in releases] == [f"v0.{minor}.0" for minor in range(25)]
+        assert sorted(request.query["page"] for request in fake_github.requests) == ["1", "2", "3"]
+
+    async def test_retrieve_releases_forgets_removed_pages(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test pages no longer listed are not served from the cache."""
+        fake_github = FakeGithubServer(
+            [build_release(f"v0.{minor}.0", [f"package-0.{minor}.0.tar.gz"]) for minor in range(15)]
+        )
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(GithubToken("token"), REPOSITORY)
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            monkeypatch.setattr(github_repository_api, "RELEASES_PER_PAGE", 10)
+            await github_repository_api.retrieve_releases()
+            fake_github.releases = fake_github.releases[:5]
+            releases = await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert len(releases) == 5  # noqa: PLR2004
+
+
+class TestGithubRepositoryDownload:
+    """Test Github repository downloads."""
+
+    async def test_get_download_package_streams_fixed_chunks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test an asset is streamed in chunks of the configured size."""
+        asset: bytes = bytes(range(256)) * 1024
+        fake_github = FakeGithubServer(assets={"package-0.1.0.tar.gz": asset})
+        async with serve(fake_github) as base_url:
+            session_pool = GithubSessionPool(GithubSessionSettings(download_chunk_size=4096))
+            github_repository = GithubRepository(
+                GithubToken("token"), REPOSITORY, IntegrationId(uuid.uuid4()), session_pool
+            )
+            monkeypatch.setattr(github_repository._api, "GITHUB_API_BASE_URL", base_url)  # pylint: disable=protected-access
+            package_download = await github_repository.get_download_package(
+                {
+                    "filename": PackageVersion("package-0.1.0.tar.gz"),
+                    "url": "/assets/package-0.1.0.tar.gz",
+                    "digest": None,
+                    "content_type": "application/gzip",
+                    "size": None,
+                }
+            )
+            chunks: list[bytes] = [chunk async for chunk in package_download["content"]]
+            await session_pool.close()
+
+        assert b"".join(chunks) == asset
+        assert max(len(chunk) for chunk in chunks) <= 4096  # noqa: PLR2004
+        assert package_download["content_length"] == len(asset)
+        assert package_download["content_type"] == "application/gzip"
+
+    async def test_get_download_package_upstream_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test an upstream failure is reported as a bad gateway."""
+        fake_github = FakeGithubServer()
+        async with serve(fake_github) as base_url:
+            github_repository = GithubRepository(GithubToken("token"), REPOSITORY, IntegrationId(uuid.uuid4()))
+            monkeypatch.setattr(github_repository._api, "GITHUB_API_BASE_URL", base_url)  # pylint: disable=protected-access
+            with pytest.raises(HTTPException) as exception_info:
+                await github_repository.get_download_package(
+                    {
+                        "filename": PackageVersion("missing.tar.gz"),
+                        "url": "/assets/missing.tar.gz",
+                        "digest": None,
+                        "content_type": "application/gzip",
+                        "size": None,
+                    }
+                )
+            await github_repository.close()
+
+        assert exception_info.value.status_code == 502  # noqa: PLR2004
+
+
+class TestGithubRepositoryIndex:
+    """Test the index of a Github repository."""
+
+    # Memory held by the release pages and the index of a repository, per 10k files
+    MEMORY_BUDGET_PER_10K_FILES: int = 8 * 1024 * 1024
+
+    async def test_asset_pattern(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the asset pattern filters the files of the kept releases, which are shared with the index."""
+        fake_github = FakeGithubServer(
+            [build_release("v0.1.0", ["package-0.1.0-py3-none-any.whl", "package-0.1.0.tar.gz", "notes.txt"])]
+        )
+        async with serve(fake_github) as base_url:
+            github_repository = GithubRepository(
+                GithubToken("token"), {**REPOSITORY, "asset_pattern": "*.whl"}, IntegrationId(uuid.uuid4())
+            )
+            monkeypatch.setattr(github_repository._api, "GITHUB_API_BASE_URL", base_url)  # pylint: disable=protected-access
+            index = await github_repository.get_index()
+            releases = await github_repository._api.retrieve_releases()  # pylint: disable=protected-access
+            await github_repository.close()
+
+        assert index["package_version_list"] == ["package-0.1.0-py3-none-any.whl"]
+        assert [file["filename"] for file in releases[0].package_files] == [
+            "package-0.1.0-py3-none-any.whl",
+            "package-0.1.0.tar.gz",
+        ]
+        assert index["package_file_list"][0] is releases[0].package_files[0]
+
+    async def test_memory_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the release pages and the index of 10k files stay within the memory budget."""
+        fake_github = FakeGithubServer(
+            [
+                build_release(f"v{major}.0.0", [f"package-{major}.0.{patch}-py3-none-any.whl" for patch in range(10)])
+                for major in range(1000)
+            ]
+        )
+        async with serve(fake_github) as base_url:
+            github_repository = GithubRepository(GithubToken("token"), REPOSITORY, IntegrationId(uuid.uuid4()))
+            monkeypatch.setattr(github_repository._api, "GITHUB_API_BASE_URL", base_url)  # pylint: disable=protected-access
+            tracemalloc.start()
+            try:
+                index = await github_repository.get_index()
+                allocated: int = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            await github_repository.close()
+
+        assert len(index["package_file_list"]) == 10000  # noqa: PLR2004
+        assert allocated < self.MEMORY_BUDGET_PER_10K_FILES
+
+
+class TestGithubRepositoryApiRateLimit:
+    """Test Github repository API rate limiting."""
+
+    async def test_retrieve_releases_retries_server_errors(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test server errors and rate limits are retried."""
+        fake_github = FakeGithubServer([build_release("v0.1.0", ["package-0.1.0.tar.gz"])])
+        fake_github.failures = [(502, {}), (429, {"Retry-After": "0"})]
+        governor = GithubRateLimitGovernor(GithubRateLimitSettings(backoff_base=0.01))
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(
+                GithubToken("token"), REPOSITORY, rate_limit_governor=governor
+            )
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            releases = await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert [release.tag_name for release in releases] == ["v0.1.0"]
+        assert len(fake_github.requests) == 3  # noqa: PLR2004
+
+    async def test_retrieve_releases_raises_after_retries(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a persistent failure raises a Github API error."""
+        fake_github = FakeGithubServer()
+        fake_github.failures = [(503, {})] * 3
+        governor = GithubRateLimitGovernor(GithubRateLimitSettings(max_retries=2, backoff_base=0.01))
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(
+                GithubToken("token"), REPOSITORY, rate_limit_governor=governor
+            )
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            with pytest.raises(GithubApiError) as exception_info:
+                await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        assert exception_info.value.status == 503  # noqa: PLR2004
+
+    async def test_retrieve_releases_tracks_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the rate limit budget is tracked from the responses."""
+        fake_github = FakeGithubServer([build_release("v0.1.0", ["package-0.1.0.tar.gz"])])
+        fake_github.rate_limit_headers = {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4321",
+            "X-RateLimit-Reset": "1",
+        }
+        governor = GithubRateLimitGovernor()
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(
+                GithubToken("token"), REPOSITORY, rate_limit_governor=governor
+            )
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            await github_repository_api.retrieve_releases()
+            await github_repository_api.close()
+
+        budget = governor.get_budget(GithubToken("token"))
+        assert budget is not None
+        assert budget["remaining"] == 4321  # noqa: PLR2004
+
+
+class TestTransformRelease:
+    """Test the transformation of releases into package files."""
+
+    def test_asset_pattern(self) -> None:
+        """Test only the distributions matching the asset pattern are kept."""
+        release: GithubReleaseObject = GithubReleaseObject.model_validate(
+            build_release(
+                "v0.1.0",
+                ["package-0.1.0-py3-none-any.whl", "package-0.1.0.tar.gz", "package-0.1.0.zip"],
+            )
+        )
+
+        filenames: list[str] = [file["filename"] for file in transform_release_to_package_files(release)]
+        wheels: list[str] = [file["filename"] for file in transform_release_to_package_files(release, "*.whl")]
+
+        assert filenames == ["package-0.1.0-py3-none-any.whl", "package-0.1.0.tar.gz"]
+        assert wheels == ["package-0.1.0-py3-none-any.whl"]
+
+
+class TestGithubRepositoryApiResolveAssetUrl:
+    """Test Github repository API resolution of release download URLs."""
+
+    async def test_resolve_asset_url(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a release download URL is resolved once into the API URL of the asset."""
+        release = build_release("v0.1.0", ["package-0.1.0.tar.gz"])
+        download_url: str = "https://github.com/namespace/name/releases/download/v0.1.0/package-0.1.0.tar.gz"
+        release["assets"][0]["browser_download_url"] = download_url
+        fake_github = FakeGithubServer([release])
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(GithubToken("token"), REPOSITORY)
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            first: str = await github_repository_api.resolve_asset_url(download_url)
+            second: str = await github_repository_api.resolve_asset_url(download_url)
+            kept: str = await github_repository_api.resolve_asset_url("/assets/package-0.1.0.tar.gz")
+            with pytest.raises(HTTPException):
+                await github_repository_api.resolve_asset_url(download_url.replace("v0.1.0", "v9.9.9"))
+            await github_repository_api.close()
+
+        assert first == second == kept == "/assets/package-0.1.0.tar.gz"
+        assert [request.path for request in fake_github.requests] == [
+            "/repos/namespace/name/releases/tags/v0.1.0",
+            "/repos/namespace/name/releases/tags/v9.9.9",
+        ]
+
+    async def test_resolve_signed_url(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a signed URL is kept until shortly before it expires and missing without redirect."""
+        release = build_release("v0.1.0", ["package-0.1.0.tar.gz", "package-0.1.1.tar.gz", "package-0.1.2.tar.gz"])
+        fake_github = FakeGithubServer([release], assets={"package-0.1.2.tar.gz": b"content"})
+        signed_at: str = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        fake_github.signed_urls = {
+            "package-0.1.0.tar.gz": "https://objects.example.com/0?se=2999-01-01T00:00:00Z&sig=a",
+            # Expires within the margin, resolved on each download
+            "package-0.1.1.tar.gz": f"https://objects.example.com/1?X-Amz-Date={signed_at}&X-Amz-Expires=10",
+        }
+        async with serve(fake_github) as base_url:
+            github_repository_api = GithubRepositoryApi(GithubToken("token"), REPOSITORY)
+            monkeypatch.setattr(github_repository_api, "GITHUB_API_BASE_URL", base_url)
+            kept: list[str | None] = [
+                await github_repository_api.resolve_signed_url("/assets/package-0.1.0.tar.gz") for _ in range(2)
+            ]
+            expiring: list[str | None] = [
+                await github_repository_api.resolve_signed_url("/assets/package-0.1.1.tar.gz") for _ in range(2)
+            ]
+            proxied: str | None = await github_repository_api.resolve_signed_url("/assets/package-0.1.2.tar.gz")
+            await github_repository_api.close()
+
+        assert kept == [fake_github.signed_urls["package-0.1.0.tar.gz"]] * 2
+        assert expiring == [fake_github.signed_urls["package-0.1.1.tar.gz"]] * 2
+        assert proxied is None
+        assert [request.path for request in fake_github.requests] == [
+            "/assets/package-0.1.0.tar.gz",
+            "/assets/package-0.1.1.tar.gz",
+            "/assets/package-0.1.1.tar.gz",
+            "/assets/package-0.1.2.tar.gz",
+        ]
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("https://objects.example.com/a?se=2025-01-01T00%3A05%3A00Z&sig=a", 1735689900.0),
+            ("https://objects.example.com/a?X-Amz-Date=20250101T000000Z&X-Amz-Expires=300", 1735689900.0),
+            ("https://objects.example.com/a?jwt=e30.eyJleHAiOjE3MzU2ODk5MDB9.c2ln", 1735689900.0),
+            ("https://objects.example.com/a?jwt=invalid", None),
+            ("https://objects.example.com/a", None),
+        ],
+    )
+    def test_get_signed_url_expiry(self, url: str, expected: float | None) -> None:
+        """Test the expiry of signed URLs is read from their query."""
+        assert get_signed_url_expiry(url) == expected
+
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("https://github.com/namespace/name/releases/download/v0.1.0/a.whl", ("namespace", "name", "v0.1.0")),
+            (
+                "https://github.com/namespace/name/releases/download/team/v0.1.0/a.whl",
+                ("namespace", "name", "team/v0.1.0"),
+            ),
+            ("https://github.com/namespace/name/releases/download/a.whl", None),
+            ("https://github.com/namespace/name/archive/v0.1.0/a.whl", None),
+            ("https://example.com/namespace/name/releases/download/v0.1.0/a.whl", None),
+            ("/assets/a.whl", None),
+        ],
+    )
+    def test_parse_release_download_url(self, url: str, expected: tuple[str, str, str] | None) -> None:
+        """Test the repository and tag are read from release download URLs only."""
+        assert parse_release_download_url(url) == expected
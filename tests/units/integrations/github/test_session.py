@@ -0,0 +1,39 @@
+"""Test Github session pool."""
+
+from pep503_simple_repo_broker.integrations.github.session import (
+    GithubSessionPool,
+    GithubSessionSettings,
+)
+
+
+class TestGithubSessionPool:
+    """Test Github session pool."""
+
+    async def test_session_is_shared(self) -> None:
+        """Test the same session is returned until closed."""
+        pool = GithubSessionPool(GithubSessionSettings(limit_per_host=5))
+
+        session = pool.session
+
+        assert pool.session is session
+        assert session.connector is not None
+        assert session.connector.limit_per_host == 5  # noqa: PLR2004
+        await pool.close()
+        assert session.closed
+
+    async def test_session_is_recreated_after_close(self) -> None:
+        """Test a new session is created after the pool is closed."""
+        pool = GithubSessionPool()
+        session = pool.session
+        await pool.close()
+
+        new_session = pool.session
+
+        assert new_session is not session
+        assert not new_session.closed
+        await pool.close()
+
+    async def test_close_without_session(self) -> None:
+        """Test closing a pool that never opened a session."""
+        pool = GithubSessionPool()
+        await pool.close()
@@ -0,0 +1,195 @@
+"""Test index cache."""
+
+import asyncio
+
+import pytest
+
+from pep503_simple_repo_broker.integrations.abstracts import IntegrationPackageIndex, PackageName
+from pep503_simple_repo_broker.integrations.cache import (
+    CachedIntegration,
+    StaleWhileRevalidateCache,
+)
+
+from ..fixtures import FakeIntegration, PackageFakeIntegration
+
+
+class CountingLoader:
+    """Loader counting its calls."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        """Initialize counting loader."""
+        self.calls: int = 0
+        self.delay: float = delay
+        self.fail: bool = fail
+
+    async def __call__(self) -> int:
+        """Load a value."""
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("loader failure")
+        return self.calls
+
+
+class SourcePackageFakeIntegration(PackageFakeIntegration):
+    """Fake integration serving each package on its own and tracking the index of each package as a source."""
+
+    def __init__(self, packages: dict[str, list[str]]) -> None:
+        """Initialize source package fake integration."""
+        super().__init__(packages)
+        self.source_indexes: dict[str, IntegrationPackageIndex] = {
+            package_index["package_name"]: package_index for package_index in self.build_index()
+        }
+
+    def get_source_indexes(self) -> dict[str, IntegrationPackageIndex]:
+        """Get the package index of each source."""
+        return dict(self.source_indexes)
+
+    async def refresh_source(self, source: str) -> bool:
+        """Refresh the index of a single package."""
+        refreshed: bool = await super().refresh_source(source)
+        if refreshed:
+            self.source_indexes[source] = next(
+                package_index for package_index in self.build_index() if package_index["package_name"] == source
+            )
+        return refreshed
+
+
+class TestStaleWhileRevalidateCache:
+    """Test stale-while-revalidate cache."""
+
+    async def test_fresh_value_is_served_from_cache(self) -> None:
+        """Test a fresh value does not call the loader again."""
+        loader = CountingLoader()
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(loader, ttl=60)
+
+        assert await cache.get() == 1
+        assert await cache.get() == 1
+        assert loader.calls == 1
+        assert cache.statistics["misses"] == 1
+        assert cache.statistics["hits"] == 1
+
+    async def test_concurrent_misses_are_single_flight(self) -> None:
+        """Test concurrent misses share a single load."""
+        loader = CountingLoader(delay=0.01)
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(loader, ttl=60)
+
+        values = await asyncio.gather(*[cache.get() for _ in range(10)])
+
+        assert values == [1] * 10
+        assert loader.calls == 1
+        assert cache.statistics["refreshes"] == 1
+
+    async def test_stale_value_is_served_while_revalidating(self) -> None:
+        """Test a stale value is returned immediately and refreshed in background."""
+        loader = CountingLoader(delay=0.01)
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(loader, ttl=0)
+
+        assert await cache.get() == 1
+        assert await cache.get() == 1
+        assert cache.statistics["stale_hits"] == 1
+        await asyncio.sleep(0.05)
+        assert loader.calls == 2  # noqa: PLR2004
+        assert await cache.get() == 2  # noqa: PLR2004
+
+    async def test_too_stale_value_waits_for_refresh(self) -> None:
+        """Test a value older than max stale is not served."""
+        loader = CountingLoader()
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(loader, ttl=0, max_stale=0)
+
+        assert await cache.get() == 1
+        assert await cache.get() == 2  # noqa: PLR2004
+        assert cache.statistics["misses"] == 2  # noqa: PLR2004
+
+    async def test_background_failure_keeps_stale_value(self) -> None:
+        """Test a failed background refresh keeps serving the previous value."""
+        loader = CountingLoader()
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(loader, ttl=0)
+        assert await cache.get() == 1
+
+        loader.fail = True
+        assert await cache.get() == 1
+        await asyncio.sleep(0.01)
+        assert await cache.get() == 1
+        assert cache.statistics["refresh_errors"] >= 1
+
+    async def test_miss_failure_is_raised(self) -> None:
+        """Test a failed load without cached value is raised to the caller."""
+        cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(CountingLoader(fail=True), ttl=60)
+
+        with pytest.raises(RuntimeError):
+            await cache.get()
+
+
+class TestCachedIntegration:
+    """Test cached integration."""
+
+    async def test_get_index_is_cached(self) -> None:
+        """Test the wrapped integration index is only fetched once while fresh."""
+        integration = FakeIntegration({"package": ["package-0.1.0.tar.gz"]})
+        cached = CachedIntegration(integration, ttl=60)
+
+        first = await cached.get_index()
+        second = await cached.get_index()
+
+        assert first is second
+        assert integration.index_calls == 1
+        assert cached.id == integration.id
+        assert cached.statistics["hits"] == 1
+
+    async def test_get_package_is_cached_on_its_own(self) -> None:
+        """Test a package is fetched once while fresh, separately from the index, and unknown ones are not kept."""
+        integration = PackageFakeIntegration({"package": ["package-0.1.0.tar.gz"]})
+        cached = CachedIntegration(integration, ttl=60)
+
+        first = await cached.get_package(PackageName("Package"))
+        second = await cached.get_package(PackageName("package"))
+        unknown = await cached.get_package(PackageName("unknown"))
+
+        assert first is not None and first is second
+        assert unknown is None
+        assert integration.package_calls == ["package", "unknown"]
+        assert integration.index_calls == 0
+        assert list(cached._package_caches) == ["package"]  # pylint: disable=protected-access
+
+    async def test_get_package_searches_cached_index(self) -> None:
+        """Test an integration without its own package lookup is searched through the cached index."""
+        integration = FakeIntegration({"package": ["package-0.1.0.tar.gz"]})
+        cached = CachedIntegration(integration, ttl=60)
+
+        await cached.get_index()
+        package_index = await cached.get_package(PackageName("package"))
+
+        assert package_index is not None and package_index["package_name"] == "package"
+        assert integration.index_calls == 1
+
+    async def test_get_package_is_as_fresh_as_cached_index(self) -> None:
+        """Test a package of a fresh cached index is not fetched on its own."""
+        integration = PackageFakeIntegration({"package": ["package-0.1.0.tar.gz"]})
+        cached = CachedIntegration(integration, ttl=60)
+
+        index = await cached.get_index()
+        package_index = await cached.get_package(PackageName("package"))
+
+        assert package_index is index[0]
+        assert len(integration.package_calls) == 0
+
+    async def test_refresh_source_updates_cached_index(self) -> None:
+        """Test a refreshed source updates the cached index without fetching it again, keeping the other packages."""
+        integration = SourcePackageFakeIntegration(
+            {"package-a": ["package-a-0.1.0.tar.gz"], "package-b": ["package-b-0.1.0.tar.gz"]}
+        )
+        cached = CachedIntegration(integration, ttl=60)
+        await cached.get_index()
+        package_b = await cached.get_package(PackageName("package-b"))
+
+        integration.packages["package-a"].append("package-a-0.2.0.tar.gz")
+        assert await cached.refresh_source("package-a") is True
+        index = await cached.get_index()
+        package_a = await cached.get_package(PackageName("package-a"))
+
+        assert integration.index_calls == 1
+        assert len(integration.package_calls) == 0
+        assert [package_index["package_name"] for package_index in index] == ["package-a", "package-b"]
+        assert package_a is not None and package_a["package_version_list"][-1] == "package-a-0.2.0.tar.gz"
+        assert await cached.get_package(PackageName("package-b")) is package_b
@@ -0,0 +1,415 @@
+"""Test API."""
+
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pep503_simple_repo_broker.api import (
+    INDEX_ERRORS_HEADER,
+    SIMPLE_JSON_MEDIA_TYPE,
+    api_router,
+    dependency_artifact_cache,
+    dependency_github_webhook_secret,
+    dependency_index_registry,
+    dependency_readiness_max_index_age,
+)
+from pep503_simple_repo_broker.artifact_cache import ArtifactCache
+from pep503_simple_repo_broker.index import PackageIndexRegistry
+from pep503_simple_repo_broker.integrations.abstracts import AbstractIntegration
+
+from .fixtures import FakeIntegration, PackageFakeIntegration, build_wheel
+
+
+def build_client(integrations: list[AbstractIntegration], artifact_cache: ArtifactCache | None = None) -> TestClient:
+    """Build a test client serving the given integrations."""
+    app: FastAPI = FastAPI()
+    app.include_router(api_router)
+    index_registry: PackageIndexRegistry = PackageIndexRegistry(integrations)
+    app.dependency_overrides[dependency_index_registry] = lambda: index_registry
+    app.dependency_overrides[dependency_artifact_cache] = lambda: artifact_cache
+    return TestClient(app)
+
+
+class TestSimpleApi:
+    """Test simple API."""
+
+    def test_get_index(self) -> None:
+        """Test the root index lists all packages."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert "/simple/package-a" in response.text
+        assert INDEX_ERRORS_HEADER not in response.headers
+
+    def test_get_index_partial(self) -> None:
+        """Test a partial index is served and marked."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        integration.errors = [{"integration_id": integration.id, "source": "namespace/name", "message": "boom"}]
+        client: TestClient = build_client([integration, FakeIntegration({}, fail=True)])
+
+        response = client.get("/simple/")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert "/simple/package-a" in response.text
+        assert "namespace/name" in response.headers[INDEX_ERRORS_HEADER]
+
+    def test_get_index_package_not_found(self) -> None:
+        """Test an unknown package returns 404."""
+        client: TestClient = build_client([FakeIntegration({})])
+
+        response = client.get("/simple/unknown")
+
+        assert response.status_code == 404  # noqa: PLR2004
+
+    def test_get_index_package_normalizes_name(self) -> None:
+        """Test a package page is found by its normalized name."""
+        client: TestClient = build_client([FakeIntegration({"Package_A": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/package-a")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert "/simple/package-a/package_a-0.1.0.tar.gz" in response.text
+
+    def test_get_index_package_fetches_only_the_package(self) -> None:
+        """Test a package page and its downloads only fetch that package, not the whole index."""
+        integration: PackageFakeIntegration = PackageFakeIntegration(
+            {"package-a": ["package_a-0.1.0.tar.gz"], "package-b": ["package_b-0.1.0.tar.gz"]}
+        )
+        client: TestClient = build_client([integration])
+
+        page = client.get("/simple/package-a")
+        download = client.get("/simple/package-a/package_a-0.1.0.tar.gz")
+
+        assert page.status_code == download.status_code == 200  # noqa: PLR2004
+        assert integration.package_calls == ["package-a", "package-a"]
+        assert integration.index_calls == 0
+
+    def test_get_download_package(self) -> None:
+        """Test a package file is streamed by its integration."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/package-a/package_a-0.1.0.tar.gz")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.content == b"package-a/package_a-0.1.0.tar.gz"
+        assert response.headers["Content-Length"] == str(len(response.content))
+        assert response.headers["Content-Type"] == "application/octet-stream"
+        assert response.headers["Content-Disposition"] == 'attachment; filename="package_a-0.1.0.tar.gz"'
+
+    def test_get_download_package_version_not_found(self) -> None:
+        """Test an unknown package file returns 404."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/package-a/package_a-0.2.0.tar.gz")
+
+        assert response.status_code == 404  # noqa: PLR2004
+
+    def test_get_download_package_artifact_cache(self, tmp_path: Path) -> None:
+        """Test a downloaded package is served from the artifact cache afterwards."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        client: TestClient = build_client([integration], ArtifactCache(tmp_path, max_size=1024))
+
+        first = client.get("/simple/package-a/package_a-0.1.0.tar.gz")
+        second = client.get("/simple/package-a/package_a-0.1.0.tar.gz")
+
+        assert first.content == second.content == b"package-a/package_a-0.1.0.tar.gz"
+        assert integration.download_calls == 1
+        assert 'filename="package_a-0.1.0.tar.gz"' in second.headers["Content-Disposition"]
+
+    def test_get_index_package_not_modified(self) -> None:
+        """Test a package page is answered 304 when unchanged."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+        etag: str = client.get("/simple/package-a").headers["ETag"]
+
+        response = client.get("/simple/package-a", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304  # noqa: PLR2004
+
+    def test_get_index_json(self) -> None:
+        """Test the root index is served as PEP 691 JSON when requested."""
+        client: TestClient = build_client([FakeIntegration({"Package_A": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get(
+            "/simple/",
+            headers={"Accept": "application/vnd.pypi.simple.v1+json, application/vnd.pypi.simple.v1+html;q=0.1"},
+        )
+
+        assert response.headers["Content-Type"] == "application/vnd.pypi.simple.v1+json"
+        assert response.json()["projects"] == [{"name": "package-a"}]
+
+    def test_get_index_package_json(self) -> None:
+        """Test a package page is served as PEP 691 JSON with hashes."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/package-a/", headers={"Accept": "application/vnd.pypi.simple.latest+json"})
+        content = response.json()
+
+        assert content["name"] == "package-a"
+        assert content["versions"] == ["0.1.0"]
+        assert content["files"][0]["url"] == "/simple/package-a/package_a-0.1.0.tar.gz"
+        assert "sha256" in content["files"][0]["hashes"]
+
+    def test_get_index_not_acceptable(self) -> None:
+        """Test an unsupported media type is refused."""
+        client: TestClient = build_client([FakeIntegration({})])
+
+        response = client.get("/simple/", headers={"Accept": "application/xml"})
+
+        assert response.status_code == 406  # noqa: PLR2004
+
+    def test_get_index_html_by_default(self) -> None:
+        """Test browsers receive HTML."""
+        client: TestClient = build_client([FakeIntegration({})])
+
+        response = client.get("/simple/", headers={"Accept": "text/html,application/xhtml+xml,*/*;q=0.8"})
+
+        assert response.headers["Content-Type"].startswith("text/html")
+
+    def test_get_index_package_hashes_and_metadata(self) -> None:
+        """Test package links carry their hash fragment and wheels advertise their metadata."""
+        client: TestClient = build_client(
+            [FakeIntegration({"package-a": ["package_a-0.1.0-py3-none-any.whl", "package_a-0.1.0.tar.gz"]})]
+        )
+
+        html = client.get("/simple/package-a").text
+        files = client.get("/simple/package-a", headers={"Accept": SIMPLE_JSON_MEDIA_TYPE}).json()["files"]
+
+        assert "/simple/package-a/package_a-0.1.0.tar.gz#sha256=" in html
+        assert html.count("data-core-metadata='true'") == 1
+        assert files[0]["core-metadata"] is True
+        assert "core-metadata" not in files[1]
+
+    def test_get_package_metadata(self) -> None:
+        """Test the core metadata of a wheel is served."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0-py3-none-any.whl"]})
+        integration.contents["package_a-0.1.0-py3-none-any.whl"] = build_wheel(b"Name: package-a\n")
+        client: TestClient = build_client([integration])
+
+        response = client.get("/simple/package-a/package_a-0.1.0-py3-none-any.whl.metadata")
+        client.get("/simple/package-a/package_a-0.1.0-py3-none-any.whl.metadata")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.content == b"Name: package-a\n"
+        assert integration.download_calls == 1
+
+    def test_get_package_metadata_sdist(self) -> None:
+        """Test the metadata of a source distribution is not served."""
+        client: TestClient = build_client([FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+
+        response = client.get("/simple/package-a/package_a-0.1.0.tar.gz.metadata")
+
+        assert response.status_code == 404  # noqa: PLR2004
+
+
+class TestDownloadRedirect:
+    """Test downloads offloaded to a signed upstream URL."""
+
+    def test_redirect(self) -> None:
+        """Test the client is redirected and nothing is streamed through the broker."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        integration.redirect_url = "https://objects.example.com/signed"
+
+        response = build_client([integration]).get(
+            "/simple/package-a/package_a-0.1.0.tar.gz", follow_redirects=False
+        )
+
+        assert response.status_code == 302  # noqa: PLR2004
+        assert response.headers["Location"] == "https://objects.example.com/signed/package_a-0.1.0.tar.gz"
+        assert response.headers["Cache-Control"] == "no-store"
+        assert integration.download_calls == 0
+
+
+class TestDownloadRanges:
+    """Test byte ranges of package downloads."""
+
+    URL: str = "/simple/package-a/package_a-0.1.0.tar.gz"
+    # Content served for the file, see `build_content`
+    CONTENT: bytes = b"package-a/package_a-0.1.0.tar.gz"
+
+    def build_integration(self, known_sizes: bool = True, serve_ranges: bool = False) -> FakeIntegration:
+        """Build an integration serving a single package file."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        integration.known_sizes = known_sizes
+        integration.serve_ranges = serve_ranges
+        return integration
+
+    def test_single_range(self) -> None:
+        """Test a single range is served partially, even when ignored upstream."""
+        integration: FakeIntegration = self.build_integration()
+
+        response = build_client([integration]).get(self.URL, headers={"Range": "bytes=2-12"})
+
+        assert response.status_code == 206  # noqa: PLR2004
+        assert response.content == self.CONTENT[2:13]
+        assert response.headers["Content-Range"] == f"bytes 2-12/{len(self.CONTENT)}"
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert integration.range_headers == ["bytes=2-12"]
+
+    def test_suffix_range_forwarded(self) -> None:
+        """Test a range of a file of unknown size is forwarded as is."""
+        integration: FakeIntegration = self.build_integration(known_sizes=False, serve_ranges=True)
+
+        response = build_client([integration]).get(self.URL, headers={"Range": "bytes=-6"})
+
+        assert response.status_code == 206  # noqa: PLR2004
+        assert response.content == self.CONTENT[-6:]
+        assert integration.range_headers == ["bytes=-6"]
+
+    def test_multiple_ranges(self) -> None:
+        """Test multiple ranges are served as a multipart body, overlapping ones coalesced."""
+        integration: FakeIntegration = self.build_integration(serve_ranges=True)
+
+        response = build_client([integration]).get(self.URL, headers={"Range": "bytes=0-1, 20-24, 22-25"})
+
+        assert response.status_code == 206  # noqa: PLR2004
+        boundary: str = response.headers["Content-Type"].split("boundary=")[1]
+        parts: list[bytes] = response.content.split(f"--{boundary}".encode())
+        assert [part.split(b"\r\n\r\n")[1] for part in parts[1:-1]] == [b"pa\r\n", b"0.1.0.\r\n"]
+        assert parts[-1] == b"--\r\n"
+        assert response.headers["Content-Length"] == str(len(response.content))
+
+    def test_unsatisfiable_range(self) -> None:
+        """Test a range past the end of the file is refused."""
+        response = build_client([self.build_integration()]).get(self.URL, headers={"Range": "bytes=1000-"})
+
+        assert response.status_code == 416  # noqa: PLR2004
+        assert response.headers["Content-Range"] == f"bytes */{len(self.CONTENT)}"
+
+    def test_if_range(self) -> None:
+        """Test the range is only served while `If-Range` matches the entity tag of the file."""
+        client: TestClient = build_client([self.build_integration()])
+        etag: str = client.get(self.URL).headers["ETag"]
+
+        matching = client.get(self.URL, headers={"Range": "bytes=0-3", "If-Range": etag})
+        changed = client.get(self.URL, headers={"Range": "bytes=0-3", "If-Range": '"sha256:changed"'})
+
+        assert matching.status_code == 206  # noqa: PLR2004
+        assert changed.status_code == 200  # noqa: PLR2004
+        assert changed.content == self.CONTENT
+
+    def test_range_from_artifact_cache(self, tmp_path: Path) -> None:
+        """Test a range is served from the cached artifact, a range never fills the cache."""
+        integration: FakeIntegration = self.build_integration()
+        client: TestClient = build_client([integration], ArtifactCache(tmp_path, max_size=1024))
+
+        uncached = client.get(self.URL, headers={"Range": "bytes=0-3"})
+        client.get(self.URL)
+        cached = client.get(self.URL, headers={"Range": "bytes=0-3", "If-Range": uncached.headers["ETag"]})
+
+        assert uncached.content == cached.content == self.CONTENT[:4]
+        assert cached.status_code == 206  # noqa: PLR2004
+        assert integration.download_calls == 2  # noqa: PLR2004
+
+
+class TestGithubHook:
+    """Test Github webhook."""
+
+    SECRET: str = "secret"
+
+    def post_release(self, client: TestClient, full_name: str, secret: str = SECRET) -> httpx.Response:
+        """Post a signed release event."""
+        body: bytes = json.dumps({"action": "published", "repository": {"full_name": full_name}}).encode()
+        signature: str = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return client.post(
+            "/hooks/github",
+            content=body,
+            headers={"X-GitHub-Event": "release", "X-Hub-Signature-256": f"sha256={signature}"},
+        )
+
+    def build_client(self, integration: FakeIntegration) -> TestClient:
+        """Build a test client with the webhook enabled."""
+        client: TestClient = build_client([integration])
+        client.app.dependency_overrides[dependency_github_webhook_secret] = lambda: self.SECRET  # type: ignore[attr-defined]
+        return client
+
+    def test_release_refreshes_source(self) -> None:
+        """Test a release event refreshes only the affected source."""
+        integration: FakeIntegration = FakeIntegration({"namespace/name": [], "namespace/other": []})
+
+        response = self.post_release(self.build_client(integration), "Namespace/Name")
+
+        assert response.status_code == 202  # noqa: PLR2004
+        assert integration.refreshed_sources == ["namespace/name"]
+
+    def test_release_of_discovered_repository_is_accepted(self) -> None:
+        """Test a release of a repository of a discovered organization is accepted."""
+        integration: FakeIntegration = FakeIntegration({"namespace/*": []})
+
+        response = self.post_release(self.build_client(integration), "Namespace/discovered")
+
+        assert response.status_code == 202  # noqa: PLR2004
+
+    def test_unknown_source_is_ignored(self) -> None:
+        """Test a release of an unknown repository is ignored."""
+        integration: FakeIntegration = FakeIntegration({"namespace/name": []})
+
+        response = self.post_release(self.build_client(integration), "namespace/unknown")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert len(integration.refreshed_sources) == 0
+
+    def test_invalid_signature_is_refused(self) -> None:
+        """Test a delivery with an invalid signature is refused."""
+        integration: FakeIntegration = FakeIntegration({"namespace/name": []})
+
+        response = self.post_release(self.build_client(integration), "namespace/name", secret="wrong")
+
+        assert response.status_code == 401  # noqa: PLR2004
+        assert len(integration.refreshed_sources) == 0
+
+    def test_disabled_without_secret(self) -> None:
+        """Test the webhook is disabled when no secret is configured."""
+        response = self.post_release(build_client([FakeIntegration({})]), "namespace/name")
+
+        assert response.status_code == 404  # noqa: PLR2004
+
+
+class TestProbes:
+    """Test liveness and readiness probes."""
+
+    def test_livez(self) -> None:
+        """Test liveness does not depend on the index."""
+        response = build_client([FakeIntegration({}, fail=True)]).get("/livez")
+
+        assert response.status_code == 200  # noqa: PLR2004
+
+    def test_readyz_warms_index(self) -> None:
+        """Test readiness waits for the index, warmed in the background by the probe."""
+        integration: FakeIntegration = FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        with build_client([integration]) as client:
+            response = client.get("/readyz")
+
+            assert response.status_code == 503  # noqa: PLR2004
+            assert response.json()["integrations"] == [
+                {"integration_id": str(integration.id), "ready": False, "index_age": None, "errors": []}
+            ]
+
+            for _ in range(10):
+                response = client.get("/readyz")
+                if response.status_code == 200:  # noqa: PLR2004
+                    break
+                time.sleep(0.01)
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.json()["ready"] is True
+        assert integration.index_calls == 1
+
+    def test_readyz_stale_index(self) -> None:
+        """Test readiness is lost once the index is older than the maximum index age."""
+        integration: FakeIntegration = FakeIntegration({})
+        integration.fetched_at = time.time() - 120
+        client: TestClient = build_client([integration])
+        client.app.dependency_overrides[dependency_readiness_max_index_age] = lambda: 60.0  # type: ignore[attr-defined]
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 503  # noqa: PLR2004
+        assert response.json()["integrations"][0]["index_age"] >= 120  # noqa: PLR2004
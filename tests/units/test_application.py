@@ -0,0 +1,100 @@
+"""Test application."""
+
+import hashlib
+import hmac
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pep503_simple_repo_broker import application as application_module
+from pep503_simple_repo_broker.application import Application, ApplicationRole, run
+from pep503_simple_repo_broker.index_store import IndexRefreshRequests
+
+
+class FakeProcess:
+    """Process recording its lifecycle instead of running its target."""
+
+    def __init__(self, events: list[str]) -> None:
+        """Initialize fake process."""
+        self.events: list[str] = events
+
+    def start(self) -> None:
+        """Record the start."""
+        self.events.append("start")
+
+    def terminate(self) -> None:
+        """Record the termination."""
+        self.events.append("terminate")
+
+    def join(self) -> None:
+        """Record the join."""
+        self.events.append("join")
+
+
+class FakeContext:
+    """Multiprocessing context creating fake processes."""
+
+    def __init__(self, events: list[str]) -> None:
+        """Initialize fake context."""
+        self.events: list[str] = events
+
+    def Process(self, **_: Any) -> FakeProcess:  # noqa: N802 # pylint: disable=invalid-name
+        """Create a fake process."""
+        return FakeProcess(self.events)
+
+
+class TestRun:
+    """Test running the broker."""
+
+    def test_multi_worker_parent_builds_no_application(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the parent of the multi-worker mode only spawns the publisher and the workers."""
+        events: list[str] = []
+
+        def _application(*_: Any, **__: Any) -> Application:
+            raise AssertionError("The parent process must not build an application")
+
+        def _uvicorn_run(target: Any, **kwargs: Any) -> None:
+            events.append(f"uvicorn:{target}:{kwargs['workers']}")
+
+        monkeypatch.setenv("WORKERS", "2")
+        monkeypatch.setenv("INDEX_SNAPSHOT_PATH", str(tmp_path / "index.json"))
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        monkeypatch.setattr(application_module, "Application", _application)
+        monkeypatch.setattr(application_module.multiprocessing, "get_context", lambda _: FakeContext(events))
+        monkeypatch.setattr(application_module.uvicorn, "run", _uvicorn_run)
+
+        run()
+
+        assert events == [
+            "start",
+            "uvicorn:pep503_simple_repo_broker.application:create_worker_application:2",
+            "terminate",
+            "join",
+        ]
+
+
+class TestWorkerApplication:
+    """Test the application of a worker process of the multi-worker mode."""
+
+    def test_release_is_forwarded_to_publisher(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a worker forwards the refresh of a release to the publisher instead of querying Github."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        monkeypatch.setenv("GITHUB_NAMESPACE", "namespace")
+        monkeypatch.setenv("GITHUB_REPOSITORY_NAME", "name")
+        monkeypatch.setenv("GITHUB_WEBHOOK_SECRET", "secret")
+        monkeypatch.setenv("INDEX_SNAPSHOT_PATH", str(tmp_path / "index.json"))
+        application: Application = Application(role=ApplicationRole.WORKER)
+        body: bytes = json.dumps({"action": "published", "repository": {"full_name": "namespace/name"}}).encode()
+        signature: str = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+        response = TestClient(application.fastapi_app).post(
+            "/hooks/github",
+            content=body,
+            headers={"X-GitHub-Event": "release", "X-Hub-Signature-256": f"sha256={signature}"},
+        )
+
+        assert response.status_code == 202  # noqa: PLR2004
+        assert IndexRefreshRequests(tmp_path / "index.json.refresh").take() == ["namespace/name"]
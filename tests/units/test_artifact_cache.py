@@ -0,0 +1,123 @@
+"""Test artifact cache."""
+
+import asyncio
+import hashlib
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+
+from pep503_simple_repo_broker.artifact_cache import ArtifactCache, ArtifactFill
+
+
+def build_digest(content: bytes) -> str:
+    """Build the digest of a content."""
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+async def iterate(*chunks: bytes) -> AsyncGenerator[bytes, None]:
+    """Iterate over chunks."""
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+async def fill(artifact_cache: ArtifactCache, digest: str, *chunks: bytes) -> bytes:
+    """Fill the cache with an artifact and return the streamed content."""
+    artifact = await artifact_cache.acquire(digest)
+    assert isinstance(artifact, ArtifactFill)
+    return b"".join([chunk async for chunk in artifact.tee(iterate(*chunks))])
+
+
+class TestArtifactCache:
+    """Test artifact cache."""
+
+    async def test_fill_then_get(self, tmp_path: Path) -> None:
+        """Test a filled artifact is served from disk."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+        digest: str = build_digest(b"content")
+
+        streamed: bytes = await fill(artifact_cache, digest, b"con", b"tent")
+        path = await artifact_cache.acquire(digest)
+
+        assert streamed == b"content"
+        assert isinstance(path, Path)
+        assert path.read_bytes() == b"content"
+        assert artifact_cache.size == len(b"content")
+
+    async def test_digest_mismatch_is_not_cached(self, tmp_path: Path) -> None:
+        """Test an artifact not matching its digest is discarded."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+        digest: str = build_digest(b"expected")
+
+        await fill(artifact_cache, digest, b"corrupted")
+
+        assert artifact_cache.get(digest) is None
+        assert len(list(tmp_path.iterdir())) == 0
+
+    async def test_interrupted_fill_is_not_cached(self, tmp_path: Path) -> None:
+        """Test a partially streamed artifact is never stored."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+        digest: str = build_digest(b"content")
+        artifact = await artifact_cache.acquire(digest)
+        assert isinstance(artifact, ArtifactFill)
+
+        stream = artifact.tee(iterate(b"con", b"tent"))
+        assert await anext(stream) == b"con"
+        await stream.aclose()
+
+        assert artifact_cache.get(digest) is None
+        assert len(list(tmp_path.iterdir())) == 0
+
+    async def test_concurrent_acquire_waits_for_fill(self, tmp_path: Path) -> None:
+        """Test a second download waits for the first one and is served from disk."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+        digest: str = build_digest(b"content")
+        artifact = await artifact_cache.acquire(digest)
+        assert isinstance(artifact, ArtifactFill)
+
+        waiter: asyncio.Task[Path | ArtifactFill] = asyncio.create_task(artifact_cache.acquire(digest))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        _ = [chunk async for chunk in artifact.tee(iterate(b"content"))]
+
+        assert isinstance(await waiter, Path)
+
+    async def test_least_recently_used_is_evicted(self, tmp_path: Path) -> None:
+        """Test the least recently used artifact is evicted when the cache is full."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=10)
+        first: str = build_digest(b"first")
+        second: str = build_digest(b"second")
+        third: str = build_digest(b"third")
+
+        await fill(artifact_cache, first, b"first")
+        await fill(artifact_cache, second, b"second")
+        assert artifact_cache.get(first) is None
+        await fill(artifact_cache, third, b"third")
+
+        assert artifact_cache.get(second) is None
+        assert artifact_cache.get(third) is not None
+
+    async def test_load_existing_artifacts(self, tmp_path: Path) -> None:
+        """Test artifacts on disk are reused and temporary files removed."""
+        digest: str = build_digest(b"content")
+        await fill(ArtifactCache(tmp_path, max_size=1024), digest, b"content")
+        (tmp_path / ".leftover.tmp").write_bytes(b"partial")
+
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+
+        assert artifact_cache.get(digest) is not None
+        assert not (tmp_path / ".leftover.tmp").exists()
+
+    def test_unsupported_digest(self, tmp_path: Path) -> None:
+        """Test artifacts without a usable digest are not cached."""
+        artifact_cache = ArtifactCache(tmp_path, max_size=1024)
+
+        assert not artifact_cache.accepts(None)
+        assert not artifact_cache.accepts("unknown:abc")
+        assert artifact_cache.accepts(build_digest(b"content"))
+
+    def test_negative_max_size(self, tmp_path: Path) -> None:
+        """Test a negative maximum size is refused."""
+        with pytest.raises(ValueError):
+            ArtifactCache(tmp_path, max_size=-1)
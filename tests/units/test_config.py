@@ -0,0 +1,177 @@
+"""Test integrations configuration."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from pep503_simple_repo_broker.config import IntegrationConfigFile, IntegrationConfigWatcher
+from pep503_simple_repo_broker.integrations.github import GithubIntegration
+from pep503_simple_repo_broker.integrations.github.types import (
+    GithubNamespace,
+    GithubRepositoryName,
+    GithubRepositoryReference,
+    GithubRepositorySlug,
+)
+
+YAML_CONFIG: str = """
+github:
+  defaults:
+    asset_pattern: "*.whl"
+  repositories:
+    - namespace: namespace
+      name: first
+      refresh_interval: 600
+    - namespace: namespace
+      name: second
+      package_name: package
+      asset_pattern: null
+"""
+
+TOML_CONFIG: str = """
+[[github.repositories]]
+namespace = "namespace"
+name = "first"
+"""
+
+
+def write_config(path: Path, content: str) -> None:
+    """Write a configuration, with a modification time differing from the previous one."""
+    path.write_text(content)
+    os.utime(path, ns=(path.stat().st_mtime_ns, path.stat().st_mtime_ns + 10**9))
+
+
+class TestIntegrationConfigFile:
+    """Test integration configuration file."""
+
+    def test_load_yaml(self, tmp_path: Path) -> None:
+        """Test repositories are loaded from YAML, with the defaults applied."""
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text(YAML_CONFIG)
+
+        repositories: list[GithubRepositoryReference] = IntegrationConfigFile(path).load_github_repositories()
+
+        assert repositories == [
+            {
+                "namespace": "namespace",
+                "name": "first",
+                "package_name": None,
+                "asset_pattern": "*.whl",
+                "refresh_interval": 600,
+            },
+            {
+                "namespace": "namespace",
+                "name": "second",
+                "package_name": "package",
+                "asset_pattern": None,
+                "refresh_interval": None,
+            },
+        ]
+
+    def test_load_toml(self, tmp_path: Path) -> None:
+        """Test repositories are loaded from TOML."""
+        path: Path = tmp_path / "integrations.toml"
+        path.write_text(TOML_CONFIG)
+
+        repositories: list[GithubRepositoryReference] = IntegrationConfigFile(path).load_github_repositories()
+
+        assert [repository["name"] for repository in repositories] == ["first"]
+
+    def test_invalid_repository_keeps_previous_settings(self, tmp_path: Path) -> None:
+        """Test an invalid repository keeps its previous settings and does not affect the others."""
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text(
+            """
+github:
+  repositories:
+    - {namespace: namespace, name: first, refresh_interval: -1}
+    - {namespace: namespace, name: second}
+    - {namespace: namespace, name: unknown, refresh_interval: -1}
+    - {name: nameless}
+"""
+        )
+        previous: GithubRepositoryReference = {
+            "namespace": GithubNamespace("namespace"),
+            "name": GithubRepositoryName("first"),
+            "package_name": None,
+        }
+
+        repositories: list[GithubRepositoryReference] = IntegrationConfigFile(path).load_github_repositories(
+            {GithubRepositorySlug("namespace/first"): previous}
+        )
+
+        assert [repository["name"] for repository in repositories] == ["first", "second"]
+        assert repositories[0] is previous
+
+    def test_invalid_document(self, tmp_path: Path) -> None:
+        """Test an invalid document is refused."""
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text("github: [")
+
+        with pytest.raises(ValueError):
+            IntegrationConfigFile(path).load_github_repositories()
+
+
+class TestIntegrationConfigWatcher:
+    """Test integration configuration watcher."""
+
+    async def test_reload_updates_changed_repositories(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a reload only reports the repositories added or changed."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text(YAML_CONFIG)
+        config_file: IntegrationConfigFile = IntegrationConfigFile(path)
+        integration: GithubIntegration = GithubIntegration(config_file.load_github_repositories())
+        reloads: list[list[str]] = []
+
+        async def _on_reload(sources: list[str]) -> None:
+            reloads.append(sources)
+
+        watcher: IntegrationConfigWatcher = IntegrationConfigWatcher(config_file, integration, on_reload=_on_reload)
+
+        assert not await watcher.reload()
+
+        write_config(path, YAML_CONFIG.replace("refresh_interval: 600", "refresh_interval: 300"))
+
+        assert await watcher.reload()
+        assert reloads == [["namespace/first"]]
+        assert integration.get_source_refresh_interval("namespace/first") == 300  # noqa: PLR2004
+        assert integration.get_sources() == ["namespace/first", "namespace/second"]
+
+    async def test_reload_keeps_repositories_on_invalid_document(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test an invalid document leaves the repositories as they are."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text(YAML_CONFIG)
+        config_file: IntegrationConfigFile = IntegrationConfigFile(path)
+        integration: GithubIntegration = GithubIntegration(config_file.load_github_repositories())
+        watcher: IntegrationConfigWatcher = IntegrationConfigWatcher(config_file, integration)
+
+        write_config(path, "github: [")
+
+        assert not await watcher.reload()
+        assert integration.get_sources() == ["namespace/first", "namespace/second"]
+
+
+class TestIntegrationConfigFileOrganizations:
+    """Test organizations of the integration configuration file."""
+
+    def test_load_organizations(self, tmp_path: Path) -> None:
+        """Test organizations are loaded with the defaults they support, invalid ones skipped."""
+        path: Path = tmp_path / "integrations.yaml"
+        path.write_text(
+            YAML_CONFIG
+            + """
+  organizations:
+    - namespace: organization
+      refresh_interval: 900
+    - namespace: invalid
+      refresh_interval: 0
+"""
+        )
+
+        organizations = IntegrationConfigFile(path).load_github_organizations()
+
+        assert organizations == [{"namespace": "organization", "asset_pattern": "*.whl", "refresh_interval": 900}]
@@ -0,0 +1,24 @@
+"""Test distribution file names."""
+
+import pytest
+
+from pep503_simple_repo_broker.distributions import get_distribution_version
+
+
+class TestGetDistributionVersion:
+    """Test the version of distribution file names."""
+
+    @pytest.mark.parametrize(
+        ("filename", "expected"),
+        [
+            ("package_a-0.1.0-1-py3-none-any.whl", "0.1.0"),
+            ("package_a-0.1.0-py3-none-any.whl", "0.1.0"),
+            ("package-a-0.1.0.tar.gz", "0.1.0"),
+            ("package.tar.gz", None),
+            ("package-0.1.0.whl", None),
+            ("package-0.1.0.exe", None),
+        ],
+    )
+    def test_get_distribution_version(self, filename: str, expected: str | None) -> None:
+        """Test the version is read from wheels and source distributions only."""
+        assert get_distribution_version(filename) == expected
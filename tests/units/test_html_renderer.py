@@ -104,6 +104,14 @@ class TestHtmlListRenderer:
         expected = "<a href='https://item1.com'>Item 1</a><a href='https://item2.com'>Item 2</a>"
         assert body == expected
 
+    def test_build_body_item_attributes(self) -> None:
+        """Test building body with item attributes."""
+        renderer = HtmlListRenderer()
+        renderer.add_item({"name": "Item", "url": "https://item.com", "attributes": {"data-core-metadata": "true"}})
+
+        body = renderer.build_body()
+        assert body == "<a href='https://item.com' data-core-metadata='true'>Item</a>"
+
     def test_build_head_with_title(self) -> None:
         """Test building head with title."""
         renderer = HtmlListRenderer(title="Test Title")
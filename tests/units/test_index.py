@@ -0,0 +1,86 @@
+"""Test package index registry."""
+
+from pep503_simple_repo_broker.index import PackageIndexRegistry
+from pep503_simple_repo_broker.integrations.abstracts import AbstractIntegration
+from pep503_simple_repo_broker.integrations.cache import CachedIntegration
+
+from .fixtures import FakeIntegration, PackageFakeIntegration
+
+
+class TestPackageIndexRegistry:
+    """Test package index registry."""
+
+    async def test_snapshot_merges_integrations(self) -> None:
+        """Test all integrations indexes are merged into the lookup."""
+        integrations: list[AbstractIntegration] = [
+            FakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]}),
+            FakeIntegration({"Package.B": ["package_b-0.1.0.tar.gz"]}),
+        ]
+        index_registry = PackageIndexRegistry(integrations, max_concurrency=1)
+
+        snapshot = await index_registry.get_snapshot()
+
+        assert list(snapshot.lookup.packages.keys()) == ["package-a", "package-b"]
+        assert snapshot.lookup.get_file("package_b", "package_b-0.1.0.tar.gz") is not None
+        assert snapshot.errors == []
+
+    async def test_snapshot_reports_failing_integration(self) -> None:
+        """Test a failing integration does not fail the whole index."""
+        failing: FakeIntegration = FakeIntegration({}, fail=True)
+        index_registry = PackageIndexRegistry([FakeIntegration({"package-a": []}), failing])
+
+        snapshot = await index_registry.get_snapshot()
+
+        assert list(snapshot.lookup.packages.keys()) == ["package-a"]
+        assert len(snapshot.errors) == 1
+        assert snapshot.errors[0]["integration_id"] == failing.id
+
+    async def test_snapshot_is_reused_while_index_is_unchanged(self) -> None:
+        """Test the lookup is only rebuilt when an integration index changes."""
+        index_registry = PackageIndexRegistry([CachedIntegration(FakeIntegration({"package-a": []}), ttl=60)])
+
+        first = await index_registry.get_snapshot()
+        second = await index_registry.get_snapshot()
+
+        assert second is first
+        assert first.generation == 1
+
+    async def test_package_snapshot_replaces_changed_package(self) -> None:
+        """Test a package is fetched on its own and served from its own revision only when changed."""
+        integration: PackageFakeIntegration = PackageFakeIntegration(
+            {"package-a": ["package_a-0.1.0.tar.gz"], "package-b": ["package_b-0.1.0.tar.gz"]}
+        )
+        index_registry = PackageIndexRegistry([integration])
+        snapshot = await index_registry.get_snapshot()
+
+        unchanged = await index_registry.get_package_snapshot("Package_A")
+        integration.packages["package-a"].append("package_a-0.2.0.tar.gz")
+        changed = await index_registry.get_package_snapshot("package-a")
+        again = await index_registry.get_package_snapshot("package-a")
+        other = await index_registry.get_package_snapshot("package-b")
+
+        assert unchanged is snapshot
+        assert changed.generation == snapshot.generation
+        assert changed.revision > snapshot.revision
+        assert list(changed.lookup.packages) == ["package-a"]
+        assert changed.lookup.get_file("package-a", "package_a-0.2.0.tar.gz") is not None
+        assert again is changed
+        assert other is snapshot
+        assert index_registry.snapshot is snapshot
+        assert integration.package_calls == ["package-a", "package-a", "package-a", "package-b"]
+        assert integration.index_calls == 1
+
+    async def test_package_snapshot_keeps_package_of_failing_integration(self) -> None:
+        """Test a package is kept while its integration fails, and removed once it is gone."""
+        integration: PackageFakeIntegration = PackageFakeIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})
+        index_registry = PackageIndexRegistry([integration])
+        snapshot = await index_registry.get_snapshot()
+
+        integration.fail = True
+        failing = await index_registry.get_package_snapshot("package-a")
+        integration.fail = False
+        integration.packages = {}
+        removed = await index_registry.get_package_snapshot("package-a")
+
+        assert failing is snapshot
+        assert removed.lookup.get_package("package-a") is None
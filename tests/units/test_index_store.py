@@ -0,0 +1,235 @@
+"""Test index snapshot store."""
+
+import asyncio
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from pep503_simple_repo_broker.index import PackageIndexRegistry
+from pep503_simple_repo_broker.index_store import (
+    IndexRefreshRequests,
+    IndexRefreshRequestWatcher,
+    IndexSnapshotStore,
+    IndexSnapshotWatcher,
+    restore_source_indexes,
+)
+from pep503_simple_repo_broker.integrations.abstracts import (
+    IntegrationId,
+    IntegrationPackageIndex,
+    PackageName,
+    PackageVersion,
+)
+from pep503_simple_repo_broker.integrations.cache import CachedIntegration
+
+from .fixtures import FakeIntegration
+
+
+def build_package_index(integration_id: IntegrationId, package_name: str) -> IntegrationPackageIndex:
+    """Build a package index with a single file."""
+    filename: PackageVersion = PackageVersion(f"{package_name}-0.1.0.tar.gz")
+    return {
+        "integration_id": integration_id,
+        "package_name": PackageName(package_name),
+        "package_version_list": [filename],
+        "package_file_list": [
+            {
+                "filename": filename,
+                "url": f"https://example.com/{filename}",
+                "digest": "sha256:00",
+                "content_type": "application/octet-stream",
+                "size": 10,
+            }
+        ],
+    }
+
+
+class SourceIntegration(FakeIntegration):
+    """Fake integration exposing its packages as sources."""
+
+    def __init__(self, packages: dict[str, list[str]], fail: bool = False) -> None:
+        """Initialize source integration."""
+        super().__init__(packages, fail)
+        self.source_indexes: dict[str, IntegrationPackageIndex] = {}
+        self.fetched_at: float | None = None
+
+    def get_source_indexes(self) -> dict[str, IntegrationPackageIndex]:
+        """Get the package index of each source."""
+        return self.source_indexes
+
+    def restore_source_indexes(
+        self, sources: dict[str, IntegrationPackageIndex], overwrite: bool = False, fetched_at: float | None = None
+    ) -> None:
+        """Restore the package indexes of the owned sources, recording when they were fetched."""
+        self.fetched_at = fetched_at
+        self.source_indexes.update(
+            {
+                source: index
+                for source, index in sources.items()
+                if source in self.packages and (overwrite or source not in self.source_indexes)
+            }
+        )
+
+
+class TestIndexSnapshotStore:
+    """Test index snapshot store."""
+
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        """Test a saved snapshot is loaded without its integration id."""
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        store.save({"namespace/name": build_package_index(IntegrationId(uuid.uuid4()), "package-a")})
+
+        sources = store.load()
+
+        assert sources is not None
+        assert sources["namespace/name"]["package_name"] == "package-a"
+        assert "integration_id" not in sources["namespace/name"]
+        assert [path.name for path in tmp_path.iterdir()] == ["index.json"]
+
+    def test_load_missing(self, tmp_path: Path) -> None:
+        """Test a missing snapshot is ignored."""
+        assert IndexSnapshotStore(tmp_path / "index.json").load() is None
+
+    def test_load_corrupted(self, tmp_path: Path) -> None:
+        """Test a snapshot with an invalid checksum is ignored."""
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        store.save({"namespace/name": build_package_index(IntegrationId(uuid.uuid4()), "package-a")})
+        document = json.loads(store.path.read_bytes())
+        document["sources"]["namespace/name"]["package_name"] = "package-b"
+        store.path.write_text(json.dumps(document))
+
+        assert store.load() is None
+
+    def test_load_truncated(self, tmp_path: Path) -> None:
+        """Test a truncated snapshot is ignored."""
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        store.path.write_text('{"format": 1, "sources": {')
+
+        assert store.load() is None
+
+
+class TestIndexSnapshotRestore:
+    """Test restoring integrations from a snapshot."""
+
+    async def test_registry_saves_snapshot(self, tmp_path: Path) -> None:
+        """Test the registry persists the indexes when the lookup is rebuilt."""
+        integration: SourceIntegration = SourceIntegration({"package-a": ["package-a-0.1.0.tar.gz"]})
+        integration.source_indexes = {"package-a": build_package_index(integration.id, "package-a")}
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+
+        registry: PackageIndexRegistry = PackageIndexRegistry(
+            [integration], snapshot_store=store, snapshot_save_delay=0.01
+        )
+        await registry.get_snapshot()
+        await asyncio.sleep(0.05)
+
+        sources = store.load()
+        assert sources is not None
+        assert list(sources) == ["package-a"]
+
+    async def test_registry_coalesces_snapshot_saves(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the rebuilds within the save delay are saved once, and a pending save is flushed."""
+        integration: SourceIntegration = SourceIntegration({"package-a": ["package-a-0.1.0.tar.gz"]})
+        integration.source_indexes = {"package-a": build_package_index(integration.id, "package-a")}
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        saves: list[dict[str, IntegrationPackageIndex]] = []
+        monkeypatch.setattr(store, "save", saves.append)
+        registry: PackageIndexRegistry = PackageIndexRegistry([integration], snapshot_store=store)
+
+        for _ in range(3):
+            # The fake integration builds a new index on each call, rebuilding the lookup
+            await registry.get_snapshot()
+        await registry.flush_snapshot()
+        await registry.flush_snapshot()
+
+        assert integration.index_calls == 3  # noqa: PLR2004
+        assert [list(sources) for sources in saves] == [["package-a"]]
+
+    async def test_registry_saves_snapshot_after_package_refresh(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a package fetched on its own persists the refreshed sources."""
+        integration: SourceIntegration = SourceIntegration({"package-a": ["package-a-0.1.0.tar.gz"]})
+        integration.source_indexes = {"package-a": build_package_index(integration.id, "package-a")}
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        saves: list[dict[str, IntegrationPackageIndex]] = []
+        monkeypatch.setattr(store, "save", saves.append)
+        registry: PackageIndexRegistry = PackageIndexRegistry([integration], snapshot_store=store)
+
+        unchanged = await registry.get_package_snapshot("package-b")
+        await registry.flush_snapshot()
+        changed = await registry.get_package_snapshot("package-a")
+        await registry.flush_snapshot()
+
+        assert unchanged.revision == 0
+        assert changed.revision == 1
+        assert [list(sources) for sources in saves] == [["package-a"]]
+
+    async def test_restored_index_is_served_while_refreshing(self, tmp_path: Path) -> None:
+        """Test a cold integration serves the restored index before its first refresh."""
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        store.save({"package-a": build_package_index(IntegrationId(uuid.uuid4()), "package-a")})
+        integration: SourceIntegration = SourceIntegration({"package-a": []}, fail=True)
+        cached: CachedIntegration = CachedIntegration(integration, ttl=60)
+
+        sources = store.load()
+        assert sources is not None
+        restore_source_indexes([cached], sources)
+        index = await cached.get_index()
+
+        assert [package_index["package_name"] for package_index in index] == ["package-a"]
+        assert index[0]["integration_id"] == integration.id
+
+
+class TestIndexSnapshotWatcher:
+    """Test index snapshot watcher."""
+
+    async def test_reload_follows_published_snapshots(self, tmp_path: Path) -> None:
+        """Test a worker reloads the snapshots replaced by the publisher."""
+        store: IndexSnapshotStore = IndexSnapshotStore(tmp_path / "index.json")
+        integration: SourceIntegration = SourceIntegration({"package-a": []})
+        watcher: IndexSnapshotWatcher = IndexSnapshotWatcher(store, [integration])
+
+        assert await watcher.reload() is False
+        store.save({"package-a": build_package_index(IntegrationId(uuid.uuid4()), "package-a")})
+        assert await watcher.reload() is True
+        assert await watcher.reload() is False
+        store.save({"package-a": build_package_index(IntegrationId(uuid.uuid4()), "package-b")})
+        assert await watcher.reload() is True
+
+        assert integration.source_indexes["package-a"]["package_name"] == "package-b"
+        assert integration.source_indexes["package-a"]["integration_id"] == integration.id
+        assert integration.fetched_at == store.path.stat().st_mtime_ns / 1e9
+
+
+class TestIndexRefreshRequests:
+    """Test index refresh requests."""
+
+    def test_take_requested_sources(self, tmp_path: Path) -> None:
+        """Test the requested sources are taken once each, in order, ignoring invalid requests."""
+        refresh_requests: IndexRefreshRequests = IndexRefreshRequests(tmp_path / "refresh")
+
+        assert len(refresh_requests.take()) == 0
+        refresh_requests.request(["namespace/first"])
+        (tmp_path / "refresh" / "invalid.json").write_text('{"source": "namespace/other"}')
+        refresh_requests.request(["namespace/second", "namespace/first"])
+
+        assert refresh_requests.take() == ["namespace/first", "namespace/second"]
+        assert len(refresh_requests.take()) == 0
+        assert len(list((tmp_path / "refresh").iterdir())) == 0
+
+    async def test_watcher_refreshes_requested_sources(self, tmp_path: Path) -> None:
+        """Test the publisher refreshes the sources requested by the workers."""
+        refresh_requests: IndexRefreshRequests = IndexRefreshRequests(tmp_path / "refresh")
+        refreshed: list[list[str]] = []
+
+        async def _on_request(sources: list[str]) -> None:
+            refreshed.append(sources)
+
+        watcher: IndexRefreshRequestWatcher = IndexRefreshRequestWatcher(refresh_requests, _on_request)
+
+        assert await watcher.poll() is False
+        refresh_requests.request(["namespace/name"])
+        assert await watcher.poll() is True
+        assert refreshed == [["namespace/name"]]
@@ -0,0 +1,49 @@
+"""Test JSON Renderer."""
+
+import json
+
+from pep503_simple_repo_broker.json_renderer import (
+    JsonProjectListRenderer,
+    JsonProjectRenderer,
+)
+
+
+class TestJsonProjectListRenderer:
+    """Test JSON Project List Renderer."""
+
+    def test_build(self) -> None:
+        """Test building the project list."""
+        renderer = JsonProjectListRenderer().add_projects([{"name": "package-a"}, {"name": "package-b"}])
+
+        content = json.loads(renderer.build())
+
+        assert content == {
+            "meta": {"api-version": "1.1"},
+            "projects": [{"name": "package-a"}, {"name": "package-b"}],
+        }
+
+
+class TestJsonProjectRenderer:
+    """Test JSON Project Renderer."""
+
+    def test_build(self) -> None:
+        """Test building a project with its files and versions."""
+        renderer = JsonProjectRenderer(name="package-a").add_files(
+            [
+                {
+                    "filename": "package_a-0.1.0-py3-none-any.whl",
+                    "url": "/simple/package-a/package_a-0.1.0-py3-none-any.whl",
+                    "hashes": {"sha256": "abc"},
+                    "size": 10,
+                },
+                {"filename": "package_a-0.1.0.tar.gz", "url": "/simple/package-a/package_a-0.1.0.tar.gz", "hashes": {}},
+                {"filename": "package_a-0.2.0.tar.gz", "url": "/simple/package-a/package_a-0.2.0.tar.gz", "hashes": {}},
+            ]
+        )
+
+        content = json.loads(renderer.build())
+
+        assert content["name"] == "package-a"
+        assert content["versions"] == ["0.1.0", "0.2.0"]
+        assert content["files"][0]["hashes"] == {"sha256": "abc"}
+        assert content["files"][0]["size"] == 10  # noqa: PLR2004
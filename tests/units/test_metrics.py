@@ -0,0 +1,116 @@
+"""Test metrics."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from pep503_simple_repo_broker.api import api_router, dependency_index_registry, dependency_integrations
+from pep503_simple_repo_broker.index import PackageIndexRegistry
+from pep503_simple_repo_broker.integrations.abstracts import AbstractIntegration, IntegrationMetric
+from pep503_simple_repo_broker.metrics import IntegrationCollector, count_download
+from pep503_simple_repo_broker.page_cache import RenderedPage, RenderedPageCache
+
+from .fixtures import FakeIntegration
+
+
+class MeteredIntegration(FakeIntegration):
+    """Fake integration reporting a metric."""
+
+    def get_metrics(self) -> list[IntegrationMetric]:
+        """Get a fixed index age."""
+        return [
+            {
+                "name": "index_age_seconds",
+                "description": "Seconds since the index of a source was last refreshed.",
+                "labels": {"integration_id": str(self.id), "source": "namespace/name"},
+                "value": 42.0,
+            }
+        ]
+
+
+def get_sample_value(name: str, labels: dict[str, str] | None = None) -> float:
+    """Get the value of a sample of the default registry, 0 when absent."""
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def build_client(integrations: list[AbstractIntegration]) -> TestClient:
+    """Build a test client serving the given integrations."""
+    app: FastAPI = FastAPI()
+    app.include_router(api_router)
+    index_registry: PackageIndexRegistry = PackageIndexRegistry(integrations)
+    app.dependency_overrides[dependency_index_registry] = lambda: index_registry
+    app.dependency_overrides[dependency_integrations] = lambda: integrations
+    return TestClient(app)
+
+
+class TestCountDownload:
+    """Test download counting."""
+
+    def test_count_download(self) -> None:
+        """Test the bytes of a download are counted and the download is no longer in flight once done."""
+
+        async def _content() -> AsyncIterator[bytes]:
+            yield b"abc"
+            yield b"defg"
+
+        async def _consume() -> bytes:
+            return b"".join([chunk async for chunk in count_download(_content(), "test")])
+
+        before: float = get_sample_value("pep503_download_bytes_total", {"origin": "test"})
+
+        content: bytes = asyncio.run(_consume())
+
+        assert content == b"abcdefg"
+        assert get_sample_value("pep503_download_bytes_total", {"origin": "test"}) - before == 7  # noqa: PLR2004
+        assert get_sample_value("pep503_downloads_in_flight") == 0
+
+
+class TestIntegrationCollector:
+    """Test integration collector."""
+
+    def test_collect(self) -> None:
+        """Test integration metrics are exported as gauges."""
+        integration: MeteredIntegration = MeteredIntegration({})
+        registry: CollectorRegistry = CollectorRegistry(auto_describe=False)
+        registry.register(IntegrationCollector([integration]))
+
+        value: float | None = registry.get_sample_value(
+            "pep503_index_age_seconds", {"integration_id": str(integration.id), "source": "namespace/name"}
+        )
+
+        assert value == 42.0  # noqa: PLR2004
+
+
+class TestPageCacheMetrics:
+    """Test page cache metrics."""
+
+    def test_hit_and_miss(self) -> None:
+        """Test page cache lookups are counted."""
+        page_cache: RenderedPageCache = RenderedPageCache()
+        hits: float = get_sample_value("pep503_cache_requests_total", {"cache": "page", "result": "hit"})
+        misses: float = get_sample_value("pep503_cache_requests_total", {"cache": "page", "result": "miss"})
+
+        page_cache.get(0, ("key",), lambda: RenderedPage(b"body", "text/html"))
+        page_cache.get(0, ("key",), lambda: RenderedPage(b"body", "text/html"))
+
+        assert get_sample_value("pep503_cache_requests_total", {"cache": "page", "result": "hit"}) - hits == 1
+        assert get_sample_value("pep503_cache_requests_total", {"cache": "page", "result": "miss"}) - misses == 1
+
+
+class TestMetricsApi:
+    """Test metrics API."""
+
+    def test_get_metrics(self) -> None:
+        """Test the metrics expose route latencies and integration metrics."""
+        client: TestClient = build_client([MeteredIntegration({"package-a": ["package_a-0.1.0.tar.gz"]})])
+        client.get("/simple/package-a")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'pep503_http_request_duration_seconds_count{method="GET",route="/{package_name}"' in response.text
+        assert "pep503_index_age_seconds{" in response.text
@@ -0,0 +1,116 @@
+"""Test rendered page cache."""
+
+import gzip
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from pep503_simple_repo_broker.page_cache import (
+    RenderedPage,
+    RenderedPageCache,
+    parse_quality_values,
+)
+
+BODY: bytes = b"<a href='/simple/package'>package</a>" * 100
+
+
+def build_client(page: RenderedPage) -> TestClient:
+    """Build a test client serving a rendered page."""
+    app: FastAPI = FastAPI()
+
+    @app.get("/")
+    async def _get_page(request: Request) -> Response:
+        return page.to_response(request)
+
+    return TestClient(app)
+
+
+class TestParseQualityValues:
+    """Test quality values parsing."""
+
+    def test_parse_accept_encoding(self) -> None:
+        """Test qualities are parsed."""
+        assert parse_quality_values("gzip, br;q=0.5, identity;q=0") == {"gzip": 1.0, "br": 0.5, "identity": 0.0}
+
+    def test_parse_quality_values_invalid_quality(self) -> None:
+        """Test an invalid quality disables the encoding."""
+        assert parse_quality_values("gzip;q=abc") == {"gzip": 0.0}
+
+
+class TestRenderedPage:
+    """Test rendered page."""
+
+    def test_gzip_variant(self) -> None:
+        """Test a gzip client receives the precompressed variant."""
+        page = RenderedPage(BODY, media_type="text/html")
+
+        response = build_client(page).get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.content == BODY
+        assert gzip.decompress(page.contents["gzip"]) == BODY
+
+    def test_identity_variant(self) -> None:
+        """Test a client without Accept-Encoding receives the plain page."""
+        page = RenderedPage(BODY, media_type="text/html")
+
+        response = build_client(page).get("/", headers={"Accept-Encoding": ""})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.content == BODY
+        assert response.headers["ETag"] == page.etags["identity"]
+
+    def test_not_modified(self) -> None:
+        """Test a client holding the page receives 304 Not Modified."""
+        page = RenderedPage(BODY, media_type="text/html")
+        client: TestClient = build_client(page)
+        etag: str = client.get("/").headers["ETag"]
+
+        response = client.get("/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304  # noqa: PLR2004
+        assert response.content == b""
+
+    def test_small_body_is_not_compressed(self) -> None:
+        """Test compression is skipped when it does not save bytes."""
+        page = RenderedPage(b"a", media_type="text/html")
+
+        assert list(page.contents.keys()) == ["identity"]
+
+
+class TestRenderedPageCache:
+    """Test rendered page cache."""
+
+    def test_page_is_rendered_once_per_generation(self) -> None:
+        """Test a page is rendered once and again after a generation change."""
+        page_cache = RenderedPageCache()
+        renders: list[int] = []
+
+        def _render() -> RenderedPage:
+            renders.append(1)
+            return RenderedPage(BODY, media_type="text/html")
+
+        first = page_cache.get(1, ("html",), _render)
+        second = page_cache.get(1, ("html",), _render)
+        third = page_cache.get(2, ("html",), _render)
+
+        assert first is second
+        assert third is not first
+        assert len(renders) == 2  # noqa: PLR2004
+
+    def test_page_is_rendered_again_after_a_revision_change(self) -> None:
+        """Test only the page of a changed revision is rendered again within a generation."""
+        page_cache = RenderedPageCache()
+        renders: list[tuple[str, ...]] = []
+
+        def _render(key: tuple[str, ...]) -> RenderedPage:
+            renders.append(key)
+            return RenderedPage(BODY, media_type="text/html")
+
+        page_cache.get(1, ("html", "package-a"), lambda: _render(("html", "package-a")))
+        page_cache.get(1, ("html", "package-b"), lambda: _render(("html", "package-b")))
+        page_cache.get(1, ("html", "package-a"), lambda: _render(("html", "package-a")), revision=1)
+        page_cache.get(1, ("html", "package-b"), lambda: _render(("html", "package-b")))
+        page_cache.get(1, ("html", "package-a"), lambda: _render(("html", "package-a")), revision=1)
+
+        assert renders == [("html", "package-a"), ("html", "package-b"), ("html", "package-a")]
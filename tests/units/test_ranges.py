@@ -0,0 +1,74 @@
+"""Test HTTP byte ranges."""
+
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from pep503_simple_repo_broker.ranges import (
+    MAX_RANGES,
+    RangeNotSatisfiableError,
+    if_range_matches,
+    parse_range_header,
+    resolve_ranges,
+    slice_content,
+)
+
+
+class TestParseRangeHeader:
+    """Test parsing of `Range` headers."""
+
+    def test_parse(self) -> None:
+        """Test closed, open and suffix ranges are parsed."""
+        assert parse_range_header("bytes=0-9, 20-, -5") == [(0, 9), (20, None), (None, 5)]
+
+    @pytest.mark.parametrize(
+        "range_header",
+        [None, "items=0-9", "bytes=", "bytes=9-0", "bytes=-", "bytes=a-b", "bytes=0-1" + ",0-1" * MAX_RANGES],
+    )
+    def test_ignored(self, range_header: str | None) -> None:
+        """Test invalid, foreign or abusive headers are ignored."""
+        assert parse_range_header(range_header) is None
+
+
+class TestResolveRanges:
+    """Test resolution of ranges against a file size."""
+
+    def test_resolve(self) -> None:
+        """Test ranges are clamped to the file, sorted and coalesced."""
+        assert resolve_ranges([(90, None), (None, 5), (0, 9), (5, 12), (200, 300)], 100) == [(0, 12), (90, 99)]
+
+    def test_not_satisfiable(self) -> None:
+        """Test ranges out of the file are refused."""
+        with pytest.raises(RangeNotSatisfiableError):
+            resolve_ranges([(100, None), (None, 0)], 100)
+
+
+class TestIfRange:
+    """Test `If-Range` conditions."""
+
+    def test_if_range_matches(self) -> None:
+        """Test only a missing condition or the same strong entity tag matches."""
+        assert if_range_matches(None, None)
+        assert if_range_matches('"sha256:a"', '"sha256:a"')
+        assert not if_range_matches('W/"sha256:a"', '"sha256:a"')
+        assert not if_range_matches("Wed, 21 Oct 2015 07:28:00 GMT", '"sha256:a"')
+
+
+class TestSliceContent:
+    """Test slicing of streamed contents."""
+
+    async def test_slice_content(self) -> None:
+        """Test the range is cut across chunks and the content closed once streamed."""
+        closed: list[bool] = []
+
+        async def _content() -> AsyncGenerator[bytes, None]:
+            try:
+                for chunk in (b"0123", b"4567", b"89ab"):
+                    yield chunk
+            finally:
+                closed.append(True)
+
+        sliced: list[bytes] = [chunk async for chunk in slice_content(_content(), 2, (3, 8))]
+
+        assert b"".join(sliced) == b"123456"
+        assert closed == [True]
@@ -0,0 +1,85 @@
+"""Test index refresher."""
+
+import asyncio
+
+import pytest
+
+from pep503_simple_repo_broker.refresher import IndexRefresher
+
+from .fixtures import FakeIntegration
+
+
+class TestIndexRefresher:
+    """Test index refresher."""
+
+    async def test_start_refreshes_every_source(self) -> None:
+        """Test every source is refreshed at start, then on its interval."""
+        integration: FakeIntegration = FakeIntegration({"package-a": [], "package-b": []})
+        refresher: IndexRefresher = IndexRefresher([integration], interval=0.01)
+
+        refresher.start()
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+        assert not refresher.running
+        assert integration.refreshed_sources.count("package-a") >= 2  # noqa: PLR2004
+        assert integration.refreshed_sources.count("package-b") >= 2  # noqa: PLR2004
+
+    async def test_failing_source_is_retried(self) -> None:
+        """Test a failing source is retried without stopping the refresher."""
+        integration: FakeIntegration = FakeIntegration({"package-a": []}, fail=True)
+        refresher: IndexRefresher = IndexRefresher([integration], interval=60, retry_delay=0.01)
+
+        refresher.start()
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+        assert len(integration.refreshed_sources) >= 2  # noqa: PLR2004
+
+    async def test_sync_follows_sources(self) -> None:
+        """Test added sources are refreshed at once and removed ones are no longer refreshed."""
+        integration: FakeIntegration = FakeIntegration({"package-a": []})
+        refresher: IndexRefresher = IndexRefresher([integration], interval=60)
+
+        refresher.start()
+        await asyncio.sleep(0.01)
+        integration.packages = {"package-b": []}
+        refresher.sync()
+        await asyncio.sleep(0.01)
+        integration.packages = {"package-b": [], "package-a": []}
+        integration.refreshed_sources.clear()
+        refresher.sync(["package-b"])
+        await asyncio.sleep(0.01)
+        await refresher.stop()
+
+        assert sorted(integration.refreshed_sources) == ["package-a", "package-b"]
+
+    async def test_source_refresh_interval(self) -> None:
+        """Test the refresh interval set by the integration for a source overrides the default one."""
+        integration: FakeIntegration = FakeIntegration({"package-a": [], "package-b": []})
+        integration.refresh_intervals = {"package-a": 0.01}
+        refresher: IndexRefresher = IndexRefresher([integration], interval=60)
+
+        refresher.start()
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+        assert integration.refreshed_sources.count("package-a") >= 2  # noqa: PLR2004
+        assert integration.refreshed_sources.count("package-b") == 1
+
+    def test_get_delay_backs_off(self) -> None:
+        """Test the delay grows with failures up to the maximum backoff."""
+        refresher: IndexRefresher = IndexRefresher([], interval=60, jitter=0, retry_delay=1, max_backoff=4)
+
+        assert [refresher.get_delay(failures) for failures in range(5)] == [60, 1, 2, 4, 4]
+
+    def test_get_delay_is_jittered(self) -> None:
+        """Test the delay stays within the jitter bounds."""
+        refresher: IndexRefresher = IndexRefresher([], interval=10, jitter=0.5)
+
+        assert all(5 <= refresher.get_delay(0) <= 15 for _ in range(100))  # noqa: PLR2004
+
+    def test_invalid_interval(self) -> None:
+        """Test a non positive interval is refused."""
+        with pytest.raises(ValueError):
+            IndexRefresher([], interval=0)
@@ -0,0 +1,157 @@
+"""Test shared cache."""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from pep503_simple_repo_broker.shared_cache import (
+    MemorySharedCache,
+    RedisSharedCache,
+    SharedCache,
+    SharedCacheError,
+    redis_asyncio,
+)
+
+
+class UnavailableSharedCache(SharedCache):
+    """Shared cache failing on every call."""
+
+    async def read(self, key: str) -> bytes | None:
+        """Fail to read."""
+        raise SharedCacheError("unavailable")
+
+    async def write(self, key: str, value: bytes, ttl: float) -> None:
+        """Fail to write."""
+        raise SharedCacheError("unavailable")
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        """Fail to acquire."""
+        raise SharedCacheError("unavailable")
+
+    async def release(self, key: str, token: str) -> None:
+        """Fail to release."""
+        raise SharedCacheError("unavailable")
+
+
+async def hold_lock(shared_cache: SharedCache, events: list[str], name: str) -> None:
+    """Record entering and leaving the lock, holding it a moment."""
+    async with shared_cache.lock("key", ttl=5):
+        events.append(f"{name}:enter")
+        await asyncio.sleep(0.05)
+        events.append(f"{name}:leave")
+
+
+class TestMemorySharedCache:
+    """Test memory shared cache."""
+
+    async def test_get_set(self) -> None:
+        """Test values are kept until they expire."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        await shared_cache.set("kept", b"value", ttl=60)
+        await shared_cache.set("expired", b"value", ttl=0.01)
+        await shared_cache.set_json("json", {"value": 1}, ttl=60)
+        await asyncio.sleep(0.02)
+
+        assert await shared_cache.get("kept") == b"value"
+        assert await shared_cache.get("expired") is None
+        assert await shared_cache.get("missing") is None
+        assert await shared_cache.get_json("json") == {"value": 1}
+
+    async def test_set_evicts_oldest(self) -> None:
+        """Test the oldest values are evicted when full."""
+        shared_cache: MemorySharedCache = MemorySharedCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            await shared_cache.set(key, key.encode(), ttl=60)
+
+        assert [await shared_cache.get(key) for key in ("a", "b", "c")] == [None, b"b", b"c"]
+
+    async def test_lock_is_exclusive(self) -> None:
+        """Test a lock is held by a single holder at a time."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        events: list[str] = []
+
+        await asyncio.gather(hold_lock(shared_cache, events, "first"), hold_lock(shared_cache, events, "second"))
+
+        assert events == ["first:enter", "first:leave", "second:enter", "second:leave"]
+
+    async def test_lock_timeout(self) -> None:
+        """Test the context is entered without the lock once the timeout elapsed."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        async with shared_cache.lock("key", ttl=60) as first:
+            started_at: float = time.monotonic()
+            async with shared_cache.lock("key", ttl=60, timeout=0.05) as second:
+                waited: float = time.monotonic() - started_at
+
+        assert first is True
+        assert second is False
+        assert waited >= 0.05  # noqa: PLR2004
+
+    async def test_lock_expires(self) -> None:
+        """Test a lock never released is acquired again once expired."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        assert await shared_cache.acquire("key", "dead", ttl=0.01) is True
+        async with shared_cache.lock("key", ttl=60, timeout=1) as acquired:
+            pass
+
+        assert acquired is True
+
+
+class TestUnavailableSharedCache:
+    """Test an unavailable shared cache."""
+
+    async def test_unavailable(self) -> None:
+        """Test an unavailable cache behaves as an empty cache granting no lock but never blocking."""
+        shared_cache: UnavailableSharedCache = UnavailableSharedCache()
+        await shared_cache.set("key", b"value", ttl=60)
+        async with shared_cache.lock("key", ttl=60) as acquired:
+            pass
+
+        assert await shared_cache.get("key") is None
+        assert await shared_cache.get_json("key") is None
+        assert acquired is False
+
+
+@pytest.fixture(name="redis_shared_cache")
+async def redis_shared_cache_fixture() -> AsyncIterator[RedisSharedCache]:
+    """Redis shared cache backed by a Redis container."""
+    redis_module = pytest.importorskip("testcontainers.redis")
+    with redis_module.RedisContainer() as container:
+        host: str = container.get_container_host_ip()
+        port: int = container.get_exposed_port(container.port)
+        shared_cache: RedisSharedCache = RedisSharedCache(f"redis://{host}:{port}/0")
+        yield shared_cache
+        await shared_cache.close()
+
+
+@pytest.mark.skipif(redis_asyncio is None, reason="redis is not installed")
+@pytest.mark.skipif(
+    not Path("/var/run/docker.sock").exists() and os.getenv("DOCKER_HOST", "") == "", reason="Docker is not available"
+)
+class TestRedisSharedCache:
+    """Test Redis shared cache."""
+
+    async def test_get_set(self, redis_shared_cache: RedisSharedCache) -> None:
+        """Test values are kept until they expire."""
+        await redis_shared_cache.set("kept", b"value", ttl=60)
+        await redis_shared_cache.set("expired", b"value", ttl=0.01)
+        await asyncio.sleep(0.05)
+
+        assert await redis_shared_cache.get("kept") == b"value"
+        assert await redis_shared_cache.get("expired") is None
+
+    async def test_lock_is_exclusive(self, redis_shared_cache: RedisSharedCache) -> None:
+        """Test a lock is held by a single holder at a time and released by its owner only."""
+        events: list[str] = []
+
+        await asyncio.gather(
+            hold_lock(redis_shared_cache, events, "first"), hold_lock(redis_shared_cache, events, "second")
+        )
+        assert await redis_shared_cache.acquire("key", "owner", ttl=60) is True
+        await redis_shared_cache.release("key", "other")
+
+        assert events == ["first:enter", "first:leave", "second:enter", "second:leave"]
+        assert await redis_shared_cache.acquire("key", "other", ttl=60) is False
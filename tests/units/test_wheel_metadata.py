@@ -0,0 +1,124 @@
+"""Test wheel metadata."""
+
+import asyncio
+import zipfile
+
+import pytest
+
+from pep503_simple_repo_broker.shared_cache import MemorySharedCache
+from pep503_simple_repo_broker.wheel_metadata import (
+    WheelMetadataCache,
+    WheelMetadataError,
+    parse_content_range,
+    read_metadata_from_ranges,
+    read_metadata_from_zip,
+)
+
+from .fixtures import build_wheel
+
+METADATA: bytes = b"Metadata-Version: 2.1\nName: package\nVersion: 0.1.0\n"
+
+
+class RangeServer:
+    """In-memory file served with range reads."""
+
+    def __init__(self, data: bytes, honor_ranges: bool = True) -> None:
+        """Initialize range server."""
+        self.data: bytes = data
+        self.honor_ranges: bool = honor_ranges
+        self.transferred: int = 0
+
+    async def __call__(self, range_header: str) -> tuple[bytes, int, int]:
+        """Read a range of the file."""
+        if not self.honor_ranges:
+            self.transferred += len(self.data)
+            return parse_content_range(None, self.data)
+        first, last = range_header.removeprefix("bytes=").split("-")
+        if first == "":
+            start, end = max(0, len(self.data) - int(last)), len(self.data)
+        else:
+            start, end = int(first), min(len(self.data), int(last) + 1)
+        self.transferred += end - start
+        return parse_content_range(f"bytes {start}-{end - 1}/{len(self.data)}", self.data[start:end])
+
+
+class TestReadMetadata:
+    """Test wheel metadata extraction."""
+
+    def test_read_metadata_from_zip(self) -> None:
+        """Test the metadata is read from a whole wheel."""
+        assert read_metadata_from_zip(build_wheel(METADATA)) == METADATA
+
+    def test_read_metadata_from_zip_invalid(self) -> None:
+        """Test an invalid wheel is refused."""
+        with pytest.raises(WheelMetadataError):
+            read_metadata_from_zip(b"not a zip")
+
+    @pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+    async def test_read_metadata_from_ranges(self, compression: int) -> None:
+        """Test only the end of a large wheel and its METADATA entry are transferred."""
+        wheel: bytes = build_wheel(METADATA, compression=compression, padding=2**20)
+        server: RangeServer = RangeServer(wheel)
+
+        assert await read_metadata_from_ranges(server, tail_size=1024) == METADATA
+        assert server.transferred < 4096  # noqa: PLR2004
+
+    async def test_read_metadata_from_ranges_ignored(self) -> None:
+        """Test a remote ignoring ranges falls back to the whole wheel."""
+        server: RangeServer = RangeServer(build_wheel(METADATA, padding=2**16), honor_ranges=False)
+
+        assert await read_metadata_from_ranges(server, tail_size=1024) == METADATA
+
+    async def test_read_metadata_from_ranges_invalid(self) -> None:
+        """Test a file without central directory is refused."""
+        with pytest.raises(WheelMetadataError):
+            await read_metadata_from_ranges(RangeServer(b"\0" * 4096), tail_size=1024)
+
+
+class TestWheelMetadataCache:
+    """Test wheel metadata cache."""
+
+    async def test_get_is_single_flight(self) -> None:
+        """Test concurrent gets share a single extraction."""
+        cache: WheelMetadataCache = WheelMetadataCache()
+        calls: list[None] = []
+
+        async def _extract() -> bytes:
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return METADATA
+
+        values = await asyncio.gather(*[cache.get("key", _extract) for _ in range(5)])
+
+        assert values == [METADATA] * 5
+        assert len(calls) == 1
+
+    async def test_get_evicts_least_recently_used(self) -> None:
+        """Test the least recently used metadata is evicted."""
+        cache: WheelMetadataCache = WheelMetadataCache(max_entries=1)
+        calls: list[str] = []
+
+        async def _extract() -> bytes:
+            calls.append("extract")
+            return METADATA
+
+        await cache.get("a", _extract)
+        await cache.get("b", _extract)
+        await cache.get("a", _extract)
+
+        assert len(calls) == 3  # noqa: PLR2004
+
+    async def test_get_reuses_metadata_of_other_replicas(self) -> None:
+        """Test metadata extracted by a replica is reused through the shared cache."""
+        shared_cache: MemorySharedCache = MemorySharedCache()
+        calls: list[str] = []
+
+        async def _extract() -> bytes:
+            calls.append("extract")
+            return METADATA
+
+        first: bytes = await WheelMetadataCache(shared_cache=shared_cache).get("key", _extract)
+        second: bytes = await WheelMetadataCache(shared_cache=shared_cache).get("key", _extract)
+
+        assert first == second == METADATA
+        assert calls == ["extract"]